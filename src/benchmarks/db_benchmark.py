@@ -0,0 +1,126 @@
+#
+# Author: Robert Patel
+# Benchmarks the login and dashboard queries and checks their query plans.
+# By default it seeds a temporary SQLite database; --backend runs the plan
+# check against another database (e.g. "sqlserver") without writing to it.
+#
+#   python -m benchmarks.db_benchmark [--lots 200000] [--runs 500]
+#   python -m benchmarks.db_benchmark --backend sqlserver --email someone@example.com
+#
+# Exits with status 1 if any hot query is not answered with index seeks.
+# BUDDYTRADE_QUERY_STATS=1 also prints the query statistics of the run.
+#
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.db_service import DatabaseService
+from services.storage_backend import SQLiteBackend, create_backend
+
+TICKERS = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "BRK-B", "JPM", "V",
+           "UNH", "XOM", "JNJ", "PG", "MA", "HD", "COST", "ABBV", "MRK", "PEP"]
+
+
+# Creates users with portfolios and random lots. Returns the email of the first user.
+def seed(db_service: DatabaseService, users: int, lots: int) -> str:
+    with db_service.connection() as conn:
+        cursor = conn.cursor()
+        for i in range(users):
+            cursor.execute(
+                "INSERT INTO Users (first_name, last_name, email, hashed_password) VALUES (?, ?, ?, ?)",
+                (f"User{i}", "Benchmark", f"user{i}@example.com", "x"),
+            )
+        conn.commit()
+        cursor.close()
+
+    rng = random.Random(0)
+    start = datetime(2015, 1, 2)
+    for i in range(users):
+        user_id = db_service.get_user_id(f"user{i}@example.com")
+        with db_service.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO Portfolios (user_id) VALUES (?)", (user_id,))
+            conn.commit()
+            cursor.close()
+        portfolio_id = db_service.get_portfolio_id(user_id)
+        db_service.add_holdings_bulk(portfolio_id, (
+            (rng.choice(TICKERS), round(rng.uniform(5, 900), 2), rng.randint(1, 50), start + timedelta(hours=n))
+            for n in range(lots // users)
+        ), batch_size=5000)
+    return "user0@example.com"
+
+
+# Times each hot query and returns {name: median microseconds}.
+def time_queries(db_service: DatabaseService, values: dict, runs: int) -> dict[str, float]:
+    timings = {}
+    with db_service.connection() as conn:
+        cursor = conn.cursor()
+        for name, (query, param_names) in DatabaseService.HOT_QUERIES.items():
+            params = tuple(values[p] for p in param_names)
+            samples = []
+            for _ in range(runs):
+                t = time.perf_counter()
+                cursor.execute(query, params)
+                cursor.fetchall()
+                samples.append((time.perf_counter() - t) * 1e6)
+            timings[name] = statistics.median(samples)
+        cursor.close()
+    return timings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark and EXPLAIN-check the dashboard queries.")
+    parser.add_argument("--backend", help="database spec (sqlserver, sqlite:<path>); default: a seeded temporary SQLite file")
+    parser.add_argument("--email", help="user to query when --backend is given")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--lots", type=int, default=200_000)
+    parser.add_argument("--runs", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    if args.backend:
+        if not args.email:
+            parser.error("--email is required with --backend")
+        db_service = DatabaseService(backend=create_backend(args.backend))
+        email = args.email
+    else:
+        path = os.path.join(tempfile.mkdtemp(prefix="buddytrade-bench-"), "bench.db")
+        db_service = DatabaseService(backend=SQLiteBackend(path))
+        t = time.perf_counter()
+        email = seed(db_service, args.users, args.lots)
+        print(f"Seeded {args.lots:,} lots for {args.users} users in {time.perf_counter() - t:.2f}s ({path})")
+
+    print(f"Schema version {db_service.migrate()}")
+    user_id = db_service.get_user_id(email)
+    portfolio_id = db_service.get_portfolio_id(user_id)
+    values = {"email": email, "user_id": user_id, "portfolio_id": portfolio_id, "ticker": "AAPL"}
+
+    timings = time_queries(db_service, values, args.runs)
+    plans = db_service.explain_hot_queries(values)
+
+    failures = 0
+    print(f"\n{'query':<20} {'median':>10}  plan")
+    for name, plan in plans.items():
+        status = "seek" if plan["index_seek"] else "NOT AN INDEX SEEK"
+        failures += not plan["index_seek"]
+        print(f"{name:<20} {timings[name]:>8.1f}us  {status}")
+        for line in plan["plan"]:
+            print(f"{'':<34}{line}")
+
+    db_service.get_query_monitor().print_report()
+    db_service.close()
+    if failures:
+        print(f"\n{failures} hot query(s) scan instead of seeking.")
+        return 1
+    print("\nAll hot queries use index seeks.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
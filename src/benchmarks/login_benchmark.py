@@ -0,0 +1,96 @@
+#
+# Author: Robert Patel
+# Measures login throughput: how many AuthService.authenticate() calls per second
+# a thread pool sustains at a given bcrypt cost, and how long each one takes.
+# bcrypt releases the GIL, so throughput scales with cores until they are saturated;
+# past that point extra threads only make each login slower.
+#
+#   python -m benchmarks.login_benchmark [--rounds 10,12] [--threads 1,2,4,8] [--seconds 3]
+#
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.auth_service import AuthService
+from services.db_service import DatabaseService
+from services.storage_backend import SQLiteBackend
+
+PASSWORD = "correct horse battery staple"
+
+
+# Creates users whose passwords are hashed at the given cost. Returns their emails.
+def seed(db_service: DatabaseService, auth_service: AuthService, users: int) -> list[str]:
+    hashed = auth_service.hash_password(PASSWORD)
+    emails = [f"login{i}@example.com" for i in range(users)]
+    with db_service.connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO Users (first_name, last_name, email, hashed_password) VALUES (?, ?, ?, ?)",
+            [(f"User{i}", "Benchmark", email, hashed) for i, email in enumerate(emails)],
+        )
+        conn.commit()
+        cursor.close()
+    return emails
+
+
+# Runs logins on threads workers for seconds. Returns (logins per second, latencies in ms).
+def run(auth_service: AuthService, emails: list[str], threads: int, seconds: float) -> tuple[float, list[float]]:
+    deadline = time.perf_counter() + seconds
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(offset: int):
+        samples = []
+        i = offset
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            auth_service.authenticate(emails[i % len(emails)], PASSWORD)
+            samples.append((time.perf_counter() - start) * 1000)
+            i += threads
+        with lock:
+            latencies.extend(samples)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for n in range(threads):
+            pool.submit(worker, n)
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, latencies
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark login throughput at different bcrypt costs.")
+    parser.add_argument("--rounds", default=None, help="comma-separated bcrypt costs (default: the current policy)")
+    parser.add_argument("--threads", default="1,2,4,8", help="comma-separated thread counts")
+    parser.add_argument("--seconds", type=float, default=3.0, help="duration of each measurement")
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    rounds_list = [int(r) for r in args.rounds.split(",")] if args.rounds else [AuthService.load_rounds()]
+    thread_counts = [int(t) for t in args.threads.split(",")]
+    print(f"{os.cpu_count()} CPUs; policy cost {AuthService.load_rounds()}")
+    print(f"\n{'cost':>4} {'threads':>7} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+
+    for rounds in rounds_list:
+        path = os.path.join(tempfile.mkdtemp(prefix="buddytrade-login-"), "login.db")
+        db_service = DatabaseService(backend=SQLiteBackend(path), max_pool_size=max(thread_counts))
+        auth_service = AuthService(db_service, rounds=rounds)
+        emails = seed(db_service, auth_service, args.users)
+
+        for threads in thread_counts:
+            rate, latencies = run(auth_service, emails, threads, args.seconds)
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) >= 2 else latencies[0]
+            print(f"{rounds:>4} {threads:>7} {rate:>9.1f} {statistics.median(latencies):>8.1f} {p95:>8.1f}")
+        db_service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+#
+# Author: Robert Patel
+# Measures how long the screener takes for a large universe once its bars are
+# stored: loading the BarPanel from the bar store and computing every signal.
+# Bars are synthetic, so no network access is needed.
+#
+#   python -m benchmarks.screener_benchmark [--tickers 500] [--lookback 300] [--repeat 5]
+#
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.bar_panel import BarPanel
+from services.bar_store import BarStore
+from services.market_data_provider import ReplayProvider
+from services.screener import Screener
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized screener.")
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--lookback", type=int, default=300, help="bars per ticker")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    universe = [f"SYN{i:04d}" for i in range(args.tickers)]
+    bar_store = BarStore(tempfile.mkdtemp(prefix="buddytrade-screener-"), max_bytes=1 << 34)
+    start = time.perf_counter()
+    Screener(bar_store, ReplayProvider(), universe).update_bars()
+    print(f"Stored daily bars for {args.tickers} tickers in {time.perf_counter() - start:.2f} s")
+
+    screener = Screener(bar_store, None, universe, lookback=args.lookback)
+    loads, computes = [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        panel = BarPanel.from_store(bar_store, universe, screener.interval, screener.lookback)
+        loaded = time.perf_counter()
+        result = screener.screen_panel(panel)
+        result.top_movers("Day")
+        result.signal_hits()
+        loads.append((loaded - start) * 1000)
+        computes.append((time.perf_counter() - loaded) * 1000)
+
+    print(f"panel {len(panel.get_tickers())} x {panel.get_length()} bars")
+    print(f"load     {statistics.median(loads):8.1f} ms (median of {args.repeat})")
+    print(f"screen   {statistics.median(computes):8.1f} ms")
+    print(f"total    {statistics.median(loads) + statistics.median(computes):8.1f} ms")
+    print(f"{len(result.signal_hits())} tickers with signals; top mover {result.top_movers('Day', 1)[0]['ticker']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,15 +9,17 @@ from controllers.user_controller import UserController
 from services.auth_service import AuthService
 from services.db_service import DatabaseService
 from services.app_state import AppState
+from services.api_service import APIService
+from services.task_runner import TaskRunner
 from PyQt6.QtWidgets import QMainWindow
 from controllers.screen_manager import ScreenManager
 from controllers.portfolio_controller import PortfolioController
+from views.price_chart import PriceChart
 from PyQt6.QtGui import QDesktopServices
 from PyQt6.QtCore import QUrl
-import yfinance as yf
 
 class AnalysisController:
-    def __init__(self, ui, main_window: QMainWindow, db_service: DatabaseService, auth_service: AuthService, app_state: AppState, user_controller: UserController, screen_manager: ScreenManager, portfolio_controller: PortfolioController):
+    def __init__(self, ui, main_window: QMainWindow, db_service: DatabaseService, auth_service: AuthService, app_state: AppState, user_controller: UserController, screen_manager: ScreenManager, portfolio_controller: PortfolioController, api_service: APIService, task_runner: TaskRunner):
         super().__init__()
         self.ui = ui
         self.main_window = main_window
@@ -27,6 +29,13 @@ class AnalysisController:
         self.user_controller = user_controller
         self.screen_manager = screen_manager
         self.portfolio_controller = portfolio_controller
+        self.api_service = api_service
+        self.task_runner = task_runner
+
+        # The indicator frame moves left to make room for the price chart.
+        self.ui.loginFrame.move(20, 220)
+        self.chart = PriceChart(parent=self.ui.backgroundFrame)
+        self.chart.setGeometry(601, 135, 420, 515)
 
         self.connect_signals()
 
@@ -52,35 +61,70 @@ class AnalysisController:
             self.show_error("Invalid User", "Please log in or register to access the dashboard tab.")
             self.screen_manager.show_login()
     
+    # Analyses a ticker in the background and opens the analysis page when the result arrives.
+    # A newer request supersedes one that is still running. Errors go to show_error(title, message).
+    def analyze(self, ticker: str, show_error=None):
+        show_error = show_error or self.show_error
+
+        def on_success(result):
+            self.render_analysis(result)
+            self.screen_manager.show_analysis()
+
+        def on_error(e):
+            if isinstance(e, ValueError):
+                show_error("Invalid Ticker", str(e))
+            else:
+                show_error("Error", f"An unexpected error occurred: {str(e)}")
+
+        self.task_runner.submit(self.fetch_analysis, ticker, key="analysis", on_success=on_success, on_error=on_error)
+
+    # Loads the analysis for a ticker synchronously.
     def load_analysis(self, ticker: str):
-        stock = yf.Ticker(ticker)
-        try:
-            info = stock.fast_info  # faster than .info
-        except Exception:
+        self.render_analysis(self.fetch_analysis(ticker))
+
+    # Fetches everything the analysis page shows. Runs on a worker thread; touches no widgets.
+    def fetch_analysis(self, ticker: str) -> dict:
+        # Served from the shared quote cache when the ticker was priced recently.
+        if not self.api_service.validate_ticker(ticker):
             raise ValueError("Ticker does not exist.")
         price_data = self.portfolio_controller.get_price_data(ticker)
 
-        self.ui.txtEma10.setText(f"${self.portfolio_controller.get_ema(price_data, 10):.2f}")
-        self.ui.txtEma34.setText(f"${self.portfolio_controller.get_ema(price_data, 34):.2f}")
-        self.ui.txtEma50.setText(f"${self.portfolio_controller.get_ema(price_data, 50):.2f}")
-        self.ui.txtSma20.setText(f"${self.portfolio_controller.get_sma(price_data, 20):.2f}")
-        self.ui.txtSma50.setText(f"${self.portfolio_controller.get_sma(price_data, 50):.2f}")
-        self.ui.txtSma100.setText(f"${self.portfolio_controller.get_sma(price_data, 100):.2f}")
-        self.ui.txtSma200.setText(f"${self.portfolio_controller.get_sma(price_data, 200):.2f}")
-        self.ui.txtAdx.setText(f"{self.portfolio_controller.get_adx(price_data):.2f}")
-        self.ui.txtRsi.setText(f"{self.portfolio_controller.get_rsi(price_data):.2f}")
-        self.ui.txtRsiVolume.setText(f"{self.portfolio_controller.get_rsi_volume(price_data):.2f}")
-
-        market_cap = self.portfolio_controller.get_market_cap(ticker)
+        return {
+            "chart": self.portfolio_controller.get_chart_data(ticker),
+            "ticker": ticker,
+            "indicators": self.portfolio_controller.get_indicators(ticker, price_data),
+            "market_cap": self.portfolio_controller.get_market_cap(ticker),
+            "pe_ratio": self.portfolio_controller.get_pe_ratio(ticker),
+            "eps": self.portfolio_controller.get_eps(ticker),
+            "dividend_yield": self.portfolio_controller.get_dividend_yield(ticker),
+        }
+
+    # Fills the analysis page from a fetch_analysis result. Runs on the GUI thread.
+    def render_analysis(self, result: dict):
+        indicator_set = result["indicators"]
+        self.chart.set_data(result["chart"], result["ticker"].strip().upper())
+
+        self.ui.txtEma10.setText(self.format_value(indicator_set.latest("EMA_10"), "$"))
+        self.ui.txtEma34.setText(self.format_value(indicator_set.latest("EMA_34"), "$"))
+        self.ui.txtEma50.setText(self.format_value(indicator_set.latest("EMA_50"), "$"))
+        self.ui.txtSma20.setText(self.format_value(indicator_set.latest("SMA_20"), "$"))
+        self.ui.txtSma50.setText(self.format_value(indicator_set.latest("SMA_50"), "$"))
+        self.ui.txtSma100.setText(self.format_value(indicator_set.latest("SMA_100"), "$"))
+        self.ui.txtSma200.setText(self.format_value(indicator_set.latest("SMA_200"), "$"))
+        self.ui.txtAdx.setText(self.format_value(indicator_set.latest("ADX")))
+        self.ui.txtRsi.setText(self.format_value(indicator_set.latest("RSI")))
+        self.ui.txtRsiVolume.setText(self.format_value(indicator_set.latest("RSI_Volume")))
+
+        market_cap = result["market_cap"]
         self.ui.txtMarketCap.setText(self.format_large_number(market_cap) if market_cap else "N/A")
 
-        pe_ratio = self.portfolio_controller.get_pe_ratio(ticker)
+        pe_ratio = result["pe_ratio"]
         self.ui.txtPriceToEarningsRatio.setText(f"{pe_ratio:.2f}" if isinstance(pe_ratio, (float, int)) else "N/A")
 
-        eps = self.portfolio_controller.get_eps(ticker)
+        eps = result["eps"]
         self.ui.txtEps.setText(f"{eps:.2f}" if isinstance(eps, (float, int)) else "N/A")
 
-        dividend_yield = self.portfolio_controller.get_dividend_yield(ticker)
+        dividend_yield = result["dividend_yield"]
         self.ui.txtDividendYield.setText(dividend_yield if isinstance(dividend_yield, str) else "N/A")
 
     # Opens the login window for user to log into application.
@@ -132,6 +176,14 @@ class AnalysisController:
     def show_info(self, title, message):
         QMessageBox.information(self.main_window, title, message)
 
+    # Helper method that formats an indicator value with two decimals, or "N/A" when it has none
+    # (e.g. SMA 200 of a ticker with fewer than 200 bars).
+    def format_value(self, value, prefix: str = "") -> str:
+        try:
+            return f"{prefix}{float(value):.2f}"
+        except (ValueError, TypeError):
+            return "N/A"
+
     # Helper method for market cap.
     def format_large_number(self, n: float) -> str:
         if n is None:
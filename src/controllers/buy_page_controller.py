@@ -11,16 +11,18 @@ from services.app_state import AppState
 from controllers.screen_manager import ScreenManager
 from PyQt6.QtWidgets import QMainWindow
 from datetime import datetime
+from services.task_runner import TaskRunner
 
 class BuyPageController:
 
-    def __init__(self, ui, main_window: QMainWindow, db_service: DatabaseService, screen_manager: ScreenManager, app_state: AppState):
+    def __init__(self, ui, main_window: QMainWindow, db_service: DatabaseService, screen_manager: ScreenManager, app_state: AppState, task_runner: TaskRunner):
         super().__init__()
         self.ui = ui
         self.main_window = main_window
         self.db_service = db_service
         self.screen_manager = screen_manager
         self.app_state = app_state
+        self.task_runner = task_runner
 
         self.connect_signals()
 
@@ -66,24 +68,30 @@ class BuyPageController:
             quantity = int(self.ui.txtQuantity.text())
             date_time = datetime.now()
 
-            portfolio = self.app_state.get_current_portfolio()
+            # Resolved once at login.
+            portfolio_id = self.app_state.get_portfolio_id()
 
-            if portfolio is None:
+            if portfolio_id is None:
                 self.show_error("Error!", "Portfolio could not be loaded as it does not exist.")
+                return
             
-            portfolio_tuple_id = portfolio.get_portfolio_id()
-            portfolio_id = portfolio_tuple_id[0]
-            
-            success = self.db_service.add_holding(ticker, purchase_price, quantity, date_time, portfolio_id)
-
-            if success:
-                self.show_info("Success!", "Stock successfully purchased and added to portfolio.")
-                self.screen_manager.show_dashboard()
-            else:
-                self.show_error("Database Error", "Failed to add holding to the database.")
+            # Inserts the holding in the background.
+            self.task_runner.submit(
+                self.db_service.add_holding, ticker, purchase_price, quantity, date_time, portfolio_id,
+                on_success=self._on_purchase_done,
+                on_error=lambda e: self.show_error("Error!", "Could not add stock to database."),
+            )
         except Exception as e:
             self.show_error("Error!", "Could not add stock to database.")
 
+    # Reports the result of add_holding. Runs on the GUI thread.
+    def _on_purchase_done(self, success: bool):
+        if success:
+            self.show_info("Success!", "Stock successfully purchased and added to portfolio.")
+            self.screen_manager.show_dashboard()
+        else:
+            self.show_error("Database Error", "Failed to add holding to the database.")
+
     # Helper method that shows error box with given title and message.
     def show_error(self, title, message):
         QMessageBox.warning(self.main_window, title, message)
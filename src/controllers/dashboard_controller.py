@@ -2,21 +2,23 @@
 # Author: Robert Patel
 # This class represents the controller for the dashboard GUI.
 #
-from PyQt6.QtWidgets import QMessageBox, QVBoxLayout, QToolTip, QMainWindow, QTableWidgetItem, QInputDialog
+from PyQt6.QtWidgets import QMessageBox, QVBoxLayout, QToolTip, QMainWindow, QTableWidgetItem, QInputDialog, QComboBox
 from services.auth_service import AuthService
 from services.db_service import DatabaseService
 from services.app_state import AppState
+from services.api_service import APIService
+from services.task_runner import TaskRunner
+from services.quote_poller import QuotePoller
 from PyQt6 import QtGui, QtCore
 from controllers.portfolio_controller import PortfolioController
 from PyQt6.QtGui import QDesktopServices, QCursor
 from PyQt6.QtCore import QUrl
 from PyQt6.QtCharts import QChart, QChartView, QPieSeries, QPieSlice
 from datetime import datetime
-import yfinance as yf
 
 
 class DashboardController:
-    def __init__(self, ui, main_window: QMainWindow, db_service: DatabaseService, auth_service: AuthService, app_state: AppState, screen_manager, user_controller, portfolio_controller):
+    def __init__(self, ui, main_window: QMainWindow, db_service: DatabaseService, auth_service: AuthService, app_state: AppState, screen_manager, user_controller, portfolio_controller, api_service: APIService, task_runner: TaskRunner, quote_poller: QuotePoller | None = None, batch_analyzer=None):
         super().__init__()
         self.ui = ui
         self.main_window = main_window
@@ -26,16 +28,35 @@ class DashboardController:
         self.screen_manager = screen_manager
         self.user_controller = user_controller
         self.portfolio_controller = portfolio_controller
+        self.api_service = api_service
+        self.task_runner = task_runner
+        # Fills the Recommendation column of every position in the background (optional).
+        self.batch_analyzer = batch_analyzer
         self._pie_view = None
+
+        # Live mode: the poller refreshes the quotes of the rendered positions while the dashboard is open.
+        self.quote_poller = quote_poller if quote_poller is not None else QuotePoller(api_service, task_runner)
+        self.quote_poller.watch(self.main_window)
+        self.quote_poller.quotes_updated.connect(self._apply_quotes)
+        # ticker -> marked-to-market row currently shown, and its table row.
+        self._rows = {}
+        self._row_index = {}
+        self._totals = {"total_value": 0.0, "total_cost": 0.0, "day_change": 0.0}
         
         # pie chart plumbing
         self._pie_view = None
+        self._pie_series = None
+        self._pie_names = []
         layout = self.ui.pieChartContainer.layout()
         if layout is None:
             layout = QVBoxLayout(self.ui.pieChartContainer)
             layout.setContentsMargins(0, 0, 0, 0)
         self._pie_layout = layout
 
+        # Bar interval of the analyzer; every interval is resampled from the same stored bars.
+        self.cmbIntervals = self._build_interval_combo()
+        self._analyzed_ticker = None
+
         self.setup_connections()
 
     # Sets up the connections used within the class.
@@ -51,6 +72,10 @@ class DashboardController:
         self.ui.btnAnalyze.clicked.connect(
             lambda: self.load_recommendations(self.ui.txtTickerAnalyzer.text())
             )
+        self.cmbIntervals.currentTextChanged.connect(self.handle_interval_changed)
+        # Ctrl+Shift+Q shows how many queries each action made and how long they took.
+        self._query_stats_shortcut = QtGui.QShortcut(QtGui.QKeySequence("Ctrl+Shift+Q"), self.main_window)
+        self._query_stats_shortcut.activated.connect(self.handle_query_stats)
 
     # Loads the users portfolio from the class.
     def load_portfolio(self):
@@ -58,78 +83,161 @@ class DashboardController:
         if not user:
             return
 
-        user_email = user.get_email()
-        user_id = self.db_service.get_user_id(user_email)
-        portfolio_id = self.db_service.get_portfolio_id(user_id)
+        # SQL and quotes are fetched in the background; the table is filled on the GUI thread.
+        self.task_runner.submit(
+            self._fetch_portfolio, user.get_email(), self.app_state.get_portfolio_id(), key="portfolio",
+            on_success=self._render_portfolio,
+            on_error=lambda e: self.show_error("Error", f"Could not load portfolio: {str(e)}"),
+        )
+
+    # Fetches the positions and values them with one batch of quotes. Runs on a worker thread.
+    def _fetch_portfolio(self, email: str, portfolio_id: int | None = None) -> dict:
+        # --- 1) one round trip: per-ticker quantity / cost basis ----
+        if portfolio_id is not None:
+            # The portfolio id was resolved at login.
+            positions = self.db_service.get_positions(portfolio_id) or []
+        else:
+            snapshot = self.db_service.get_portfolio_snapshot(email)
+            positions = snapshot["positions"] if snapshot else []
 
-        # --- 1) get holdings: ticker -> quantity --------------------------------
-        holdings = self.db_service.get_tickers(portfolio_id) or []
+        # One batched request for price, previous close and day change of every held ticker.
+        quotes = self.api_service.get_quotes([p["ticker"] for p in positions])
+        return self.portfolio_controller.value_portfolio(positions, quotes)
 
-        # normalize into a list of (ticker, quantity)
-        if isinstance(holdings, dict):
-            items = [(str(t).upper(), float(q or 0)) for t, q in holdings.items()]
-        else:  # assume list of dicts [{'ticker':..., 'quantity':...}]
-            items = [(str(h.get("ticker","")).upper(), float(h.get("quantity") or 0)) for h in holdings]
+    # Fills the portfolio table, totals and pie from one valuation. Runs on the GUI thread.
+    def _render_portfolio(self, valuation: dict):
+        rows = valuation["rows"]
 
-        # --- 2) fill the table ---------------------------------------------------
+        # --- 2) fill the table (only cells whose text changed are touched) ------
         table = self.ui.tblPortfolio
-        table.setRowCount(len(items))
-
-        value_by_ticker = {}
-
-        for row_index, (ticker, shares) in enumerate(items):
-            if not ticker or shares <= 0:
-                # fill row with N/A and continue
-                for col_index, v in enumerate([ticker or "N/A", "N/A", "0", "N/A", "N/A", ""]):
-                    table.setItem(row_index, col_index, self.make_table_item(str(v)))
+        table.setRowCount(len(rows))
+        self._rows = {row["ticker"]: row for row in rows}
+        self._row_index = {row["ticker"]: i for i, row in enumerate(rows)}
+        for row_index, row in enumerate(rows):
+            self._render_row(row_index, row)
+
+        # --- 3) totals are derived from the same result set ----------------------
+        self._totals = {k: valuation[k] for k in ("total_value", "total_cost", "day_change")}
+        self._render_totals()
+
+        # --- 4) draw/update pie --------------------------------------------------
+        self._render_pie(self._pie_slices())
+
+        # --- 5) recommendations stream in one ticker at a time -----------------
+        self.load_portfolio_recommendations()
+
+        # Keeps these prices live until the positions change again.
+        self.quote_poller.set_tickers(list(self._rows))
+        if not self.quote_poller.is_running():
+            self.quote_poller.start()
+
+    # Applies a poll of fresh quotes to the rows, totals and pie. Runs on the GUI thread.
+    def _apply_quotes(self, quotes: dict):
+        changed = False
+        for ticker, quote in quotes.items():
+            old = self._rows.get(ticker)
+            if old is None or quote.get("price") is None or quote.get("price") == old["current_price"]:
                 continue
+            new = self.portfolio_controller.mark_position(old, quote)
+            # Totals move by the difference of this row only.
+            self._totals["total_value"] += (new["market_value"] or 0.0) - (old["market_value"] or 0.0)
+            self._totals["day_change"] += (new["day_change"] or 0.0) - (old["day_change"] or 0.0)
+            self._rows[ticker] = new
+            self._render_row(self._row_index[ticker], new)
+            changed = True
+
+        if changed:
+            self._render_totals()
+            self._render_pie(self._pie_slices())
+
+    # Helper method that writes one position into its table row.
+    def _render_row(self, row_index: int, row: dict):
+        current_price = row["current_price"] or 0.0
+
+        # Ticker | Entry Price | Shares | Current Price | Gain/Loss | Recommendation
+        cells = [
+            row["ticker"],
+            f"${row['avg_buy_price']:.2f}",
+            f"{int(row['quantity']):d}",
+            f"${current_price:,.2f}",
+            f"${row['unrealized_pl'] or 0.0:,.2f}",
+        ]
+        table = self.ui.tblPortfolio
+        previous_ticker = table.item(row_index, 0).text() if table.item(row_index, 0) else None
+        for col_index, text in enumerate(cells):
+            self._set_cell(row_index, col_index, text)
+        # The recommendation belongs to the ticker; it is cleared when another ticker takes the row.
+        if previous_ticker != row["ticker"] or table.item(row_index, 5) is None:
+            table.setItem(row_index, 5, self.make_table_item(""))
+
+        if row["previous_close"]:
+            change = current_price - row["previous_close"]
+            table.item(row_index, 3).setToolTip(
+                f"Day change: {change:+,.2f} ({change / row['previous_close'] * 100:+.2f}%)"
+            )
 
-            current_price = float(self.portfolio_controller.get_current_price(ticker) or 0.0)
-
-            # If you still want Gain/Loss, you need a buy price.
-            # Option A: have get_tickers() also return buy_price
-            # Option B: fetch per-ticker avg buy price from DB:
-            buy_price = self.db_service.get_avg_buy_price(portfolio_id, ticker)  # implement this; see SQL below
-
-            # Format cells
-            entry_str   = "N/A" if buy_price is None else f"${float(buy_price):.2f}"
-            curr_str    = f"${current_price:,.2f}"
-            shares_str  = f"{int(shares):d}"
-
-            if buy_price is None:
-                gl_str = "N/A"
-            else:
-                gl = shares * (current_price - float(buy_price))
-                gl_str = f"${gl:,.2f}"
-
-            # Ticker | Entry Price | Shares | Current Price | Gain/Loss | Recommendation
-            row_values = [ticker, entry_str, shares_str, curr_str, gl_str, ""]
-            for col_index, v in enumerate(row_values):
-                table.setItem(row_index, col_index, self.make_table_item(str(v)))
-
-            # accumulate for pie/total
-            value_by_ticker[ticker] = value_by_ticker.get(ticker, 0.0) + shares * current_price
-
-        # Displays the totals value of the portfolio.
-        total = sum(value_by_ticker.values())
+    # Helper method that shows the totals.
+    def _render_totals(self):
+        total = self._totals["total_value"]
+        day_change = self._totals["day_change"]
+        opening = total - day_change
         self.ui.txtPortfolioTotal.setText(f"${total:,.2f}")
+        self.ui.txtTotalProfit.setText(f"${total - self._totals['total_cost']:,.2f}")
+        self.ui.txtDaysChange.setText(f"${day_change:,.2f}")
+        self.ui.txtDaysChange.setToolTip(f"{day_change / opening * 100:+.2f}% today" if opening else "")
+
+    # Helper method that returns the pie slices of the shown positions.
+    def _pie_slices(self) -> list[tuple[str, float]]:
+        slices = [(ticker, row["market_value"]) for ticker, row in self._rows.items() if row["market_value"]]
+        return slices or [("No Data", 1.0)]
+
+    # Helper method that sets a cell's text, creating the item only if the cell is empty.
+    def _set_cell(self, row_index: int, col_index: int, text: str):
+        item = self.ui.tblPortfolio.item(row_index, col_index)
+        if item is None:
+            self.ui.tblPortfolio.setItem(row_index, col_index, self.make_table_item(text))
+        elif item.text() != text:
+            item.setText(text)
+
+    # Analyses every shown position in worker processes, without the wait cursor; each Recommendation cell is
+    # filled as its ticker finishes.
+    def load_portfolio_recommendations(self):
+        if self.batch_analyzer is None or not self._rows:
+            return
+        self.task_runner.submit(
+            self.batch_analyzer.analyze_many, list(self._rows), key="portfolio_recommendations",
+            on_item=lambda item: self._render_recommendation(*item),
+            on_error=lambda e: print("Portfolio recommendations failed:", e), background=True,
+        )
+
+    # Helper method that writes one ticker's recommendation into its Recommendation cell.
+    def _render_recommendation(self, ticker: str, summary):
+        row_index = self._row_index.get(ticker)
+        if row_index is None:
+            return
+        item = self.ui.tblPortfolio.item(row_index, 5)
+        if item is None:
+            item = self.make_table_item("")
+            self.ui.tblPortfolio.setItem(row_index, 5, item)
+
+        if isinstance(summary, Exception):
+            item.setText("N/A")
+            item.setToolTip(str(summary))
+            item.setBackground(QtGui.QBrush())
+            return
 
-        # Displays the total profit for the portfolio.
-        profit = self.db_service.get_portfolio_profit(portfolio_id) or 0.0
-        self.ui.txtTotalProfit.setText(f"${profit:,.2f}")
-
-        # --- 4) (optional) draw/update pie if you added the helper earlier -------
-        if hasattr(self, "_render_pie"):
-            slices = [(t, v) for t, v in value_by_ticker.items() if v > 0]
-            self._render_pie(slices or [("No Data", 1.0)])
-
-            # Loads the portfolio value into the designated textbox.
-            total = self.db_service.get_portfolio_value(portfolio_id) or 0.0
-            self.ui.txtPortfolioTotal.setText(f"${total:,.2f}")
-
-            # Loads the portfolios current total profit.
-            current_total = self.db_service.get_portfolio_profit(portfolio_id) or 0.0
-            self.ui.txtTotalProfit.setText(f"${current_total:,.2f}")
+        recommendation = summary["recommendation"]
+        item.setText(recommendation)
+        signals = [name for name, value in summary["signals"].items() if value is True]
+        signals.append(f"{summary['signals']['Momentum']} momentum")
+        item.setToolTip(f"{ticker}: {recommendation} as of {summary['as_of']:%Y-%m-%d %H:%M}\n"
+                        f"Signals: {', '.join(signals)}")
+        if recommendation == "Buy":
+            item.setBackground(QtGui.QColor("lightgreen"))
+        elif recommendation == "Sell":
+            item.setBackground(QtGui.QColor("lightcoral"))
+        else:
+            item.setBackground(QtGui.QBrush())
 
     # Loads the recommendations into the corresponding table.
     def load_recommendations(self, ticker: str | None = None):
@@ -147,76 +255,105 @@ class DashboardController:
             self.show_error("Invalid Input", "Please enter a ticker symbol.")
             return
 
-        # If an analysis controller exists, try to open the analysis page
-        try:
-            if hasattr(self, "analysis_controller") and self.analysis_controller is not None:
-                self.analysis_controller.load_analysis(ticker)
-                self.screen_manager.show_analysis()
-        except ValueError as e:
-            self.show_error("Invalid Ticker", str(e))
-            return
-        except Exception as e:
-            self.show_error("Error", f"An unexpected error occurred: {str(e)}")
-            return
-
-        # Pull indicators and recommendations
-        try:
-            price_data = self.portfolio_controller.get_price_data(ticker)
-
-            # Indicators -> tblIndicators
-            indicators = [
-                self.portfolio_controller.get_ema(price_data, 10),
-                self.portfolio_controller.get_ema(price_data, 34),
-                self.portfolio_controller.get_ema(price_data, 50),
-                self.portfolio_controller.get_sma(price_data, 20),
-                self.portfolio_controller.get_sma(price_data, 50),
-                self.portfolio_controller.get_sma(price_data, 100),
-                self.portfolio_controller.get_sma(price_data, 200),
-                self.portfolio_controller.get_adx(price_data),
-                self.portfolio_controller.get_rsi(price_data),
-                self.portfolio_controller.get_rsi_volume(price_data),
-            ]
-
-            for row, value in enumerate(indicators):
-                try:
-                    display_value = f"{float(value):.2f}"
-                except (ValueError, TypeError):
-                    display_value = str(value)
-                self.ui.tblIndicators.setItem(row, 0, QTableWidgetItem(display_value))
-
-            # Recommendations -> tblTechnicalAnalysis
-            recommendations = [
-                self.portfolio_controller.get_datetime(),
-                self.portfolio_controller.is_golden_cross(ticker, price_data),
-                self.portfolio_controller.get_short_momentum(price_data),
-                self.portfolio_controller.is_price_over_200_ema(price_data),
-                self.portfolio_controller.get_rsi_strength(price_data),
-                self.portfolio_controller.is_rsi_oversold(price_data),
-                self.portfolio_controller.is_adx_strong(price_data),
-                self.portfolio_controller.pullback_opportunity(ticker, price_data),
-                self.portfolio_controller.volume_spike(price_data),
-                self.portfolio_controller.high_volume(price_data),
-            ]
-
-            table = self.ui.tblTechnicalAnalysis
-            row_idx = table.rowCount()
-            table.insertRow(row_idx)
-
-            for col_idx, value in enumerate(recommendations):
-                item = QTableWidgetItem(str(value))
-
-                # Conditional coloring
-                val_str = str(value).lower()
-                if val_str in ["true", "bullish", "yes"]:
-                    item.setBackground(QtGui.QColor("lightgreen"))
-                elif val_str in ["false", "bearish", "no"]:
-                    item.setBackground(QtGui.QColor("lightcoral"))
-
-                table.setItem(row_idx, col_idx, item)
-
-        except ValueError as e:
+        # If an analysis controller exists, open the analysis page as well
+        if getattr(self, "analysis_controller", None) is not None:
+            self.analysis_controller.analyze(ticker, self.show_error)
+
+        self._analyzed_ticker = ticker
+        self._submit_recommendations(ticker)
+
+    # Re-analyses the last ticker at the newly selected interval.
+    def handle_interval_changed(self, *_):
+        if self._analyzed_ticker:
+            self._submit_recommendations(self._analyzed_ticker)
+
+    # Helper method that pulls indicators and recommendations in the background.
+    def _submit_recommendations(self, ticker: str):
+        self.task_runner.submit(
+            self._fetch_recommendations, ticker, self.cmbIntervals.currentText(), key="recommendations",
+            on_success=self._render_recommendations,
+            on_error=lambda e: self._show_recommendation_error(ticker, e),
+        )
+
+    # Fetches the indicator set and live price for a ticker. Runs on a worker thread.
+    def _fetch_recommendations(self, ticker: str, interval: str = "1h"):
+        price_data = self.portfolio_controller.get_price_data(ticker, interval)
+        # Every indicator and signal is read from one memoized pass over the bars.
+        indicator_set = self.portfolio_controller.get_indicators(ticker, price_data, interval)
+        return indicator_set, self.portfolio_controller.get_current_price(ticker), interval
+
+    # Fills tblIndicators and tblTechnicalAnalysis. Runs on the GUI thread.
+    def _render_recommendations(self, result):
+        indicator_set, current_price, interval = result
+
+        # Indicators -> tblIndicators
+        indicators = [
+            indicator_set.latest("EMA_10"),
+            indicator_set.latest("EMA_34"),
+            indicator_set.latest("EMA_50"),
+            indicator_set.latest("SMA_20"),
+            indicator_set.latest("SMA_50"),
+            indicator_set.latest("SMA_100"),
+            indicator_set.latest("SMA_200"),
+            indicator_set.latest("ADX"),
+            indicator_set.latest("RSI"),
+            indicator_set.latest("RSI_Volume"),
+        ]
+
+        for row, value in enumerate(indicators):
+            # Series that have not warmed up on this interval (e.g. SMA 200 of a young ticker) have no value.
+            display_value = "N/A" if value is None else f"{float(value):.2f}"
+            self.ui.tblIndicators.setItem(row, 0, QTableWidgetItem(display_value))
+
+        # Recommendations -> tblTechnicalAnalysis. Undefined signals show N/A instead of a False colored as Bearish.
+        signals = [
+            ("is_golden_cross", indicator_set.is_golden_cross()),
+            ("get_short_momentum", indicator_set.get_short_momentum()),
+            ("is_price_over_200_ema", indicator_set.is_price_over_200_ema()),
+            ("get_rsi_strength", indicator_set.get_rsi_strength()),
+            ("is_rsi_oversold", indicator_set.is_rsi_oversold()),
+            ("is_adx_strong", indicator_set.is_adx_strong()),
+            ("pullback_opportunity", indicator_set.pullback_opportunity(current_price)),
+            ("volume_spike", indicator_set.volume_spike()),
+            ("high_volume", indicator_set.high_volume()),
+        ]
+        recommendations = [f"{self.portfolio_controller.get_datetime()} {interval}"]
+        recommendations += [value if indicator_set.is_defined(name) else "N/A" for name, value in signals]
+
+        table = self.ui.tblTechnicalAnalysis
+        row_idx = table.rowCount()
+        table.insertRow(row_idx)
+
+        for col_idx, value in enumerate(recommendations):
+            item = QTableWidgetItem(str(value))
+
+            # Conditional coloring
+            val_str = str(value).lower()
+            if val_str in ["true", "bullish", "yes"]:
+                item.setBackground(QtGui.QColor("lightgreen"))
+            elif val_str in ["false", "bearish", "no"]:
+                item.setBackground(QtGui.QColor("lightcoral"))
+
+            table.setItem(row_idx, col_idx, item)
+
+    # Helper method that adds the interval combo box to the analyzer footer.
+    def _build_interval_combo(self) -> QComboBox:
+        combo = QComboBox(parent=self.ui.analyzerFooter)
+        combo.setGeometry(QtCore.QRect(440, 0, 81, 21))
+        font = QtGui.QFont()
+        font.setFamily("Futura")
+        combo.setFont(font)
+        combo.setStyleSheet("background-color:#BCBCBC;\nborder: 2px solid black;\ncolor:black;")
+        combo.setObjectName("cmbIntervals")
+        combo.setToolTip("Bar interval of the indicators")
+        combo.addItems(list(PortfolioController.INTERVALS))
+        return combo
+
+    # Helper method that reports a failed recommendation fetch.
+    def _show_recommendation_error(self, ticker: str, e: Exception):
+        if isinstance(e, ValueError):
             self.show_error("Invalid Ticker", f"Ticker '{ticker}' is not valid. {str(e)}")
-        except Exception as e:
+        else:
             self.show_error("Error", f"Unexpected error while analyzing '{ticker}': {str(e)}")
 
     # Opens the home window for a logged-in user.
@@ -271,31 +408,48 @@ class DashboardController:
 
         ticker = ticker.strip().upper()
 
-        try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-
-            # Validate shortName and currentPrice
-            name = info.get("shortName")
-            price = info.get("currentPrice") or info.get("regularMarketPrice")
-
-            if not name or price is None:
-                raise ValueError("Invalid ticker")
-
-            # Add to watchlist table
-            row_idx = self.ui.tblWatchlist.rowCount()
-            self.ui.tblWatchlist.insertRow(row_idx)
-            self.ui.tblWatchlist.setItem(row_idx, 0, QTableWidgetItem(ticker))
-            self.ui.tblWatchlist.setItem(row_idx, 1, QTableWidgetItem(name))
-            self.ui.tblWatchlist.setItem(row_idx, 2, QTableWidgetItem(f"${float(price):.2f}"))
-
-        except Exception:
-            QMessageBox.critical(self.main_window, "Invalid Ticker", f"'{ticker}' is not a valid stock ticker.")
+        # Validates the ticker in the background.
+        self.task_runner.submit(
+            self._fetch_watchlist_quote, ticker,
+            on_success=self._add_watchlist_row,
+            on_error=lambda e: QMessageBox.critical(self.main_window, "Invalid Ticker", f"'{ticker}' is not a valid stock ticker."),
+        )
+
+    # Fetches the name and price of a watchlist ticker. Runs on a worker thread.
+    def _fetch_watchlist_quote(self, ticker: str) -> tuple[str, str, float]:
+        fundamentals = self.api_service.get_fundamentals(ticker)
+
+        # Validate shortName and currentPrice
+        name = fundamentals.get_short_name()
+        price = fundamentals.get_current_price()
+
+        if not name or price is None:
+            raise ValueError("Invalid ticker")
+        return ticker, name, float(price)
+
+    # Adds a validated ticker to the watchlist table. Runs on the GUI thread.
+    def _add_watchlist_row(self, result: tuple[str, str, float]):
+        ticker, name, price = result
+        row_idx = self.ui.tblWatchlist.rowCount()
+        self.ui.tblWatchlist.insertRow(row_idx)
+        self.ui.tblWatchlist.setItem(row_idx, 0, QTableWidgetItem(ticker))
+        self.ui.tblWatchlist.setItem(row_idx, 1, QTableWidgetItem(name))
+        self.ui.tblWatchlist.setItem(row_idx, 2, QTableWidgetItem(f"${price:.2f}"))
 
     # Adds value to a table.
     def make_table_item(self, value: str) -> QTableWidgetItem:
         return QTableWidgetItem(value)
     
+    # Shows the query statistics and the slow-query log.
+    def handle_query_stats(self):
+        report = self.db_service.get_query_monitor().report()
+        print(report)
+        box = QMessageBox(self.main_window)
+        box.setWindowTitle("Query statistics")
+        box.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont))
+        box.setText(report)
+        box.exec()
+
     # Helper method that shows error box with given title and message.
     def show_error(self, title, message):
         QMessageBox.warning(self.main_window, title, message)
@@ -304,12 +458,25 @@ class DashboardController:
     def show_info(self, title, message):
         QMessageBox.information(self.main_window, title, message)
 
-    # Renders the pie chart.
+    # Renders the pie chart. Slices of an existing chart with the same tickers are updated in place.
     def _render_pie(self, slices: list[tuple[str, float]]):
         """
         slices: [('AAPL', 1356.06), ('SPY', 1276.22), ...]
         Renders into self.ui.pieChartContainer with hover tooltips only (no labels/leader lines).
         """
+        # Clean data
+        data = [(str(name).strip() or "Unknown", max(0.0, float(val or 0)))
+                for name, val in (slices or [])]
+        if not data:
+            data = [("No Data", 1.0)]
+
+        # Same tickers: only the slice values change.
+        if self._pie_series is not None and [name for name, _ in data] == self._pie_names:
+            for pie_slice, (_, value) in zip(self._pie_series.slices(), data):
+                if pie_slice.value() != value:
+                    pie_slice.setValue(value)
+            return
+
         # Ensure the container has a layout
         layout = self.ui.pieChartContainer.layout()
         if layout is None:
@@ -322,13 +489,6 @@ class DashboardController:
             self._pie_view.deleteLater()
             self._pie_view = None
 
-        # Clean data
-        data = [(str(name).strip() or "Unknown", max(0.0, float(val or 0)))
-                for name, val in (slices or [])]
-        if not data:
-            data = [("No Data", 1.0)]
-        total = sum(v for _, v in data) or 1.0
-
         # Build series (no labels -> no leader lines)
         series = QPieSeries()
         for name, value in data:
@@ -354,7 +514,7 @@ class DashboardController:
         chart.setMargins(QtCore.QMargins(2, 2, 2, 2))
         chart.legend().setVisible(False)
 
-        # Hover tooltip (full text on hover)
+        # Hover tooltip (full text on hover); values are read live so in-place updates show up.
         def on_hover(slice_obj, state: bool):
             if not state:
                 QToolTip.hideText()
@@ -363,11 +523,11 @@ class DashboardController:
                 idx = series.slices().index(slice_obj)
             except ValueError:
                 return
-            name, value = data[idx]
-            pct = value / total
+            value = slice_obj.value()
+            pct = value / (series.sum() or 1.0)
             QToolTip.showText(
                 QtGui.QCursor.pos(),
-                f"{name}: ${value:,.2f} ({pct:.1%})",
+                f"{self._pie_names[idx]}: ${value:,.2f} ({pct:.1%})",
                 self.ui.pieChartContainer
             )
 
@@ -378,3 +538,5 @@ class DashboardController:
         view.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
         layout.addWidget(view)
         self._pie_view = view
+        self._pie_series = series
+        self._pie_names = [name for name, _ in data]
@@ -12,13 +12,16 @@ from services.app_state import AppState
 from PyQt6.QtWidgets import QMainWindow
 from controllers.screen_manager import ScreenManager
 from controllers.analysis_controller import AnalysisController
+from controllers.market_overview_controller import MarketOverviewController
+from services.task_runner import TaskRunner
+from services.screener import Screener
 from PyQt6.QtGui import QDesktopServices
 from PyQt6.QtCore import QUrl
 import webbrowser
 
 
 class HomeLoggedInController:
-    def __init__(self, ui, main_window: QMainWindow, db_service: DatabaseService, auth_service: AuthService, app_state: AppState, user_controller: UserController, screen_manager: ScreenManager, analysis_controller: AnalysisController):
+    def __init__(self, ui, main_window: QMainWindow, db_service: DatabaseService, auth_service: AuthService, app_state: AppState, user_controller: UserController, screen_manager: ScreenManager, analysis_controller: AnalysisController, task_runner: TaskRunner | None = None, screener: Screener | None = None):
         super().__init__()
         self.ui = ui
         self.main_window = main_window
@@ -29,6 +32,12 @@ class HomeLoggedInController:
         self.screen_manager = screen_manager
         self.analysis_controller = analysis_controller
 
+        # Market strips are filled by the screener once the window is up.
+        self.market_overview = None
+        if task_runner is not None and screener is not None:
+            self.market_overview = MarketOverviewController(task_runner, screener, signals_table=self.ui.tblTickers)
+            self.market_overview.start()
+
         self.connect_signals()
 
     def connect_signals(self):
@@ -78,18 +87,8 @@ class HomeLoggedInController:
             self.show_error("Invalid Input", "Please enter a ticker symbol.")
             return
 
-        try:
-            # Attempt to load analysis page.
-            self.analysis_controller.load_analysis(ticker)
-            self.screen_manager.show_analysis()
-
-        except ValueError as e:
-            # Catches invalid ticker / no price data
-            self.show_error("Invalid Ticker", str(e))
-
-        except Exception as e:
-            # Catches unexpected errors
-            self.show_error("Error", f"An unexpected error occurred: {str(e)}")
+        # Loads the analysis page in the background; errors are shown on this window.
+        self.analysis_controller.analyze(ticker, self.show_error)
 
     def handle_faqs(self):
         None
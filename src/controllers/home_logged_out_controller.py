@@ -4,19 +4,27 @@
 # and the backend logic for registering a user.
 #
 # registration_controller.py
+from __future__ import annotations
+from typing import TYPE_CHECKING
 from PyQt6.QtWidgets import QMessageBox
-from controllers.user_controller import UserController
-from services.auth_service import AuthService
-from services.db_service import DatabaseService
 from services.app_state import AppState
 from PyQt6.QtWidgets import QMainWindow
 from controllers.screen_manager import ScreenManager
-from controllers.analysis_controller import AnalysisController
+from controllers.market_overview_controller import MarketOverviewController
+from services.task_runner import TaskRunner
 from PyQt6.QtGui import QDesktopServices
 from PyQt6.QtCore import QUrl
 
+# Only needed for type hints; importing them would pull yfinance, pandas and pyodbc into the guest start-up.
+if TYPE_CHECKING:
+    from controllers.user_controller import UserController
+    from services.auth_service import AuthService
+    from services.db_service import DatabaseService
+    from controllers.analysis_controller import AnalysisController
+    from services.screener import Screener
+
 class HomeLoggedOutController:
-    def __init__(self, ui, main_window: QMainWindow, db_service: DatabaseService, auth_service: AuthService, app_state: AppState, user_controller: UserController, screen_manager: ScreenManager, analysis_controller: AnalysisController):
+    def __init__(self, ui, main_window: QMainWindow, db_service: DatabaseService, auth_service: AuthService, app_state: AppState, user_controller: UserController, screen_manager: ScreenManager, analysis_controller: AnalysisController, task_runner: TaskRunner | None = None, screener: Screener | None = None):
         super().__init__()
         self.ui = ui
         self.main_window = main_window
@@ -27,6 +35,12 @@ class HomeLoggedOutController:
         self.screen_manager = screen_manager
         self.analysis_controller = analysis_controller
 
+        # Market strips are filled by the screener once the window is up.
+        self.market_overview = None
+        if task_runner is not None and screener is not None:
+            self.market_overview = MarketOverviewController(task_runner, screener, self.ui.tblMarketMovers, self.ui.tblTickers, self.ui.cmbIntervals)
+            self.market_overview.start()
+
         self.connect_signals()
 
     def connect_signals(self):
@@ -98,18 +112,8 @@ class HomeLoggedOutController:
             self.show_error("Invalid Input", "Please enter a ticker symbol.")
             return
 
-        try:
-            # Attempt to load analysis page.
-            self.analysis_controller.load_analysis(ticker)
-            self.screen_manager.show_analysis()
-
-        except ValueError as e:
-            # Catches invalid ticker / no price data
-            self.show_error("Invalid Ticker", str(e))
-
-        except Exception as e:
-            # Catches unexpected errors
-            self.show_error("Error", f"An unexpected error occurred: {str(e)}")
+        # Loads the analysis page in the background; errors are shown on this window.
+        self.analysis_controller.analyze(ticker, self.show_error)
 
     # Helper method that shows error box with given title and message.
     def show_error(self, title, message):
@@ -15,9 +15,10 @@ from controllers.portfolio_controller import PortfolioController
 from controllers.dashboard_controller import DashboardController
 from PyQt6.QtGui import QDesktopServices
 from PyQt6.QtCore import QUrl
+from services.task_runner import TaskRunner
 
 class LoginController:
-    def __init__(self, ui, main_window: QMainWindow, db_service: DatabaseService, auth_service: AuthService, app_state: AppState, user_controller: UserController, screen_manager: ScreenManager, portfolio_controller: PortfolioController, dashboard_controller: DashboardController):
+    def __init__(self, ui, main_window: QMainWindow, db_service: DatabaseService, auth_service: AuthService, app_state: AppState, user_controller: UserController, screen_manager: ScreenManager, portfolio_controller: PortfolioController, dashboard_controller: DashboardController, task_runner: TaskRunner):
         super().__init__()
         self.ui = ui
         self.main_window = main_window
@@ -28,6 +29,7 @@ class LoginController:
         self.screen_manager = screen_manager
         self.portfolio_controller = portfolio_controller
         self.dashboard_controller = dashboard_controller
+        self.task_runner = task_runner
 
         self.connect_signals()
 
@@ -44,20 +46,30 @@ class LoginController:
         email = self.ui.txtEmail.text().strip()
         password = self.ui.txtPassword.text().strip()
 
-        try:
-            success = self.user_controller.login_user(email, password)
-            if success:
-                user = self.db_service.get_user_by_email(email)
-                portfolio = self.portfolio_controller.get_portfolio_by_user_id(self.db_service.get_user_id(email))
+        # Password verification and the lookups run in the background.
+        self.task_runner.submit(
+            self._authenticate, email, password, key="login",
+            on_success=self._on_login_success, on_error=self._on_login_error,
+        )
 
-                self.app_state.set_current_user(user)
-                self.app_state.set_current_portfolio(portfolio)
+    # Verifies the credentials and loads the user and portfolio id in one query. Runs on a worker thread.
+    def _authenticate(self, email: str, password: str):
+        return self.user_controller.login_user(email, password)
 
-                self.screen_manager.show_dashboard()
-                self.screen_manager.dashboard_controller.load_portfolio()
-        except ValueError as e:
+    # Stores the logged-in user and their ids and opens the dashboard. Runs on the GUI thread.
+    def _on_login_success(self, result):
+        user, portfolio = result
+        self.app_state.set_current_user(user)
+        self.app_state.set_current_portfolio(portfolio)
+
+        self.screen_manager.show_dashboard()
+        self.screen_manager.dashboard_controller.load_portfolio()
+
+    # Shows a failed login. Runs on the GUI thread.
+    def _on_login_error(self, e: Exception):
+        if isinstance(e, ValueError):
             self.show_error("Login Error", str(e))
-        except Exception as e:
+        else:
             self.show_error("Unexpected Error", str(e))
 
     # Opens the home window (guest version)
@@ -0,0 +1,125 @@
+#
+# Author: Robert Patel
+# This class fills the market strips of the home windows from the screener:
+# tblMarketMovers with the biggest movers over the horizon picked in cmbIntervals
+# and tblTickers with the tickers that fired a signal. The screen runs on the
+# TaskRunner after the window is painted and is repeated every refresh period.
+#
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from PyQt6 import QtGui
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QAbstractItemView, QHeaderView, QTableWidget, QTableWidgetItem, QComboBox
+from services.task_runner import TaskRunner
+
+# Only needed for type hints; the screener pulls numpy, pandas and yfinance into the guest start-up.
+if TYPE_CHECKING:
+    from services.screener import Screener, ScreenResult
+
+
+class MarketOverviewController:
+
+    # Constructs a new controller. Any table or combo box may be None when a window does not have it.
+    def __init__(self, task_runner: TaskRunner, screener: Screener, movers_table: QTableWidget | None = None,
+                 signals_table: QTableWidget | None = None, interval_combo: QComboBox | None = None,
+                 count: int = 10, refresh_seconds: float = 15 * 60.0):
+        self.task_runner = task_runner
+        self.screener = screener
+        self.movers_table = movers_table
+        self.signals_table = signals_table
+        self.interval_combo = interval_combo
+        self.count = count
+        self.result = None
+        self._timer = QTimer()
+        self._timer.timeout.connect(self.refresh)
+        self._timer.setInterval(int(refresh_seconds * 1000))
+
+        for table in (movers_table, signals_table):
+            if table is not None:
+                self._prepare_table(table)
+        if interval_combo is not None:
+            interval_combo.currentTextChanged.connect(self.render_movers)
+
+    # Screens once the event loop is running (after the first paint) and then every refresh period.
+    def start(self):
+        QTimer.singleShot(0, self.refresh)
+        self._timer.start()
+
+    # Stops the periodic refresh.
+    def stop(self):
+        self._timer.stop()
+
+    # Runs the screener in the background. The refresh is timed, so it does not show the wait cursor.
+    def refresh(self):
+        self.task_runner.submit(self._screen, key="market_overview", on_success=self._on_result, on_error=self._on_error,
+                                background=True)
+
+    # Shows the biggest movers over the horizon selected in the combo box (Day if there is none).
+    def render_movers(self, *_):
+        if self.movers_table is None or self.result is None:
+            return
+        horizon = self.interval_combo.currentText() if self.interval_combo is not None else "Day"
+        cells = []
+        for row in self.result.top_movers(horizon, self.count):
+            cells.append((f"{row['ticker']} {row['change_pct']:+.1f}%", row["change_pct"], self._tooltip(row)))
+        self._fill(self.movers_table, cells)
+
+    # Shows the tickers that fired a signal on the latest bar.
+    def render_signals(self):
+        if self.signals_table is None or self.result is None:
+            return
+        cells = []
+        for row in self.result.signal_hits(self.count):
+            cells.append((f"{row['ticker']} {', '.join(row['signals'])}", row["change_pct"], self._tooltip(row)))
+        self._fill(self.signals_table, cells)
+
+    # Helper method that screens the universe. Runs on a pool thread.
+    def _screen(self) -> ScreenResult:
+        return self.screener.screen()
+
+    # Helper method that stores and shows a finished screen. Runs on the GUI thread.
+    def _on_result(self, result: ScreenResult):
+        self.result = result
+        self.render_movers()
+        self.render_signals()
+
+    # Helper method that reports a failed screen; the strips keep the last result.
+    def _on_error(self, e: Exception):
+        print("Market screen failed:", e)
+
+    # Helper method that turns a table into a one-row strip of read-only cells.
+    @staticmethod
+    def _prepare_table(table: QTableWidget):
+        table.setRowCount(1)
+        table.horizontalHeader().setVisible(False)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setShowGrid(True)
+
+    # Helper method that fills a strip with (text, change_pct, tooltip) cells, coloured by direction.
+    @staticmethod
+    def _fill(table: QTableWidget, cells: list[tuple[str, float, str]]):
+        table.setColumnCount(len(cells))
+        for column, (text, change, tooltip) in enumerate(cells):
+            item = table.item(0, column)
+            if item is None:
+                item = QTableWidgetItem()
+                table.setItem(0, column, item)
+            item.setText(text)
+            item.setToolTip(tooltip)
+            if change > 0:
+                item.setBackground(QtGui.QColor("lightgreen"))
+            elif change < 0:
+                item.setBackground(QtGui.QColor("lightcoral"))
+            else:
+                item.setBackground(QtGui.QBrush())
+
+    # Helper method that describes a screened ticker for its tooltip.
+    @staticmethod
+    def _tooltip(row: dict) -> str:
+        rsi = "N/A" if row["rsi"] is None else f"{row['rsi']:.0f}"
+        trend = "SMA 50 above SMA 200" if row["golden_cross"] else "SMA 50 below SMA 200"
+        return f"{row['ticker']}: ${row['close']:,.2f} ({row['change_pct']:+.2f}%)\nRSI {rsi}, {trend}"
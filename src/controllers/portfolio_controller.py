@@ -6,60 +6,128 @@
 
 from models.portfolio import Portfolio
 from services.db_service import DatabaseService
-import yfinance as yf
-import warnings
-warnings.filterwarnings("ignore", category=UserWarning)
-import pandas_ta as ta
+from services.api_service import APIService
+from services.bar_store import BarStore
+from services.indicator_engine import IndicatorEngine, IndicatorSet
+from services.streaming_indicators import StreamingIndicatorSet
+from services.market_data_provider import MarketDataProvider, period_offset
+from services.file_service import FileService
+from services.bar_resampler import resample
+from services.chart_data import ChartData
 import pandas as pd
+import time
 from datetime import datetime
 
+# Interval of the stored intraday bars, also used for the chart and the streaming indicators.
+BASE_INTERVAL = "1h"
+
 
 
 
 class PortfolioController:
 
+    # How far back each interval looks, and the stored bars it is built from. Yahoo Finance keeps hourly
+    # bars for only 730 days, so 1d and 1wk come from daily bars; 5 years gives the 200-bar averages on 1wk.
+    INTERVALS = {"1h": "3mo", "4h": "6mo", "1d": "1y", "1wk": "5y"}
+    SOURCES = {"1h": BASE_INTERVAL, "4h": BASE_INTERVAL, "1d": "1d", "1wk": "1d"}
+
     # Contructor for the portfolio controller.
-    def __init__(self, db_service: DatabaseService):
+    def __init__(self, db_service: DatabaseService, api_service: APIService | None = None, bar_store: BarStore | None = None, indicator_engine: IndicatorEngine | None = None, provider: MarketDataProvider | None = None, file_service: FileService | None = None, bar_max_age: float = 5 * 60.0):
         self.db_service = db_service
+        self.api_service = api_service if api_service is not None else db_service.api_service
+        # Bars come from the same provider as quotes unless one is passed in.
+        self.provider = provider if provider is not None else self.api_service.provider
+        self.bar_store = bar_store if bar_store is not None else BarStore()
+        self.indicator_engine = indicator_engine if indicator_engine is not None else IndicatorEngine()
+        self.file_service = file_service if file_service is not None else FileService()
+        # Stored bars younger than bar_max_age seconds are used without asking the provider for newer ones.
+        self.bar_max_age = bar_max_age
+        # (ticker, base interval) -> monotonic time of the last download of newer bars, and oldest start already requested.
+        self._updated_at = {}
+        self._history_start = {}
 
     # Creates a new portfolio.
     def create_portfolio(self, user_id: int) -> bool:
         try:
-            conn = self.db_service.connect()
-            # Creates cursor to push queries to db.
-            cursor = conn.cursor()
-            # Executes query to db.
-            cursor.execute("""
-                        INSERT INTO Portfolios (user_id) VALUES (?)
-            """, (user_id,))
-            conn.commit()
-            # Closes connection to db and returns True for successful portfolio creation.
-            cursor.close()
-            conn.close()
+            with self.db_service.connection() as conn:
+                # Creates cursor to push queries to db.
+                cursor = conn.cursor()
+                # Executes query to db.
+                cursor.execute("""
+                            INSERT INTO Portfolios (user_id) VALUES (?)
+                """, (user_id,))
+                conn.commit()
+                # Closes cursor (connection returns to the pool) and returns True for successful portfolio creation.
+                cursor.close()
             return True
         # Catches exceptions and returns False for failed portfolio creation.
         except Exception as e:
             print(e)
             return False
         
-    # Exports a user's portfolio as a file.
-    def export_portfolio(self, user_id: int) -> bool:
-        # IN PROGRESS
-        pass
+    # Columns written by export_portfolio for each kind of export.
+    EXPORT_COLUMNS = {
+        "lots": ["id", "ticker", "quantity", "buy_price", "date_added",
+                 "current_price", "market_value", "unrealized_pl", "unrealized_pl_pct"],
+        "positions": ["ticker", "quantity", "avg_buy_price", "cost_basis", "lots", "first_bought", "last_bought",
+                      "current_price", "previous_close", "market_value", "unrealized_pl", "unrealized_pl_pct", "day_change"],
+    }
+
+    # Exports a user's portfolio as a file, marked to market.
+    # kind is "lots" (every purchase) or "positions" (one row per ticker); the format comes from
+    # file_format or the extension of path (.csv, .jsonl, .parquet). Rows are streamed from the
+    # database in chunks of chunk_size and quotes are fetched once for all tickers.
+    def export_portfolio(self, user_id: int, path: str, kind: str = "positions", file_format: str | None = None, chunk_size: int = 1000) -> bool:
+        try:
+            if kind not in self.EXPORT_COLUMNS:
+                raise ValueError(f"Unknown export '{kind}'. Use 'lots' or 'positions'.")
+            portfolio_id = self.db_service.get_portfolio_id(user_id)
+            if portfolio_id is None:
+                raise ValueError(f"No portfolio found for user {user_id}.")
+
+            # Lots of sold tickers are still exported; positions only cover tickers still held.
+            quotes = self.api_service.get_quotes(self.db_service.get_distinct_tickers(portfolio_id, open_only=kind == "positions"))
+            chunks = (self.db_service.stream_lots(portfolio_id, chunk_size) if kind == "lots"
+                      else self.db_service.stream_positions(portfolio_id, chunk_size))
+
+            with self.file_service.open_writer(path, self.EXPORT_COLUMNS[kind], file_format) as writer:
+                for rows in chunks:
+                    writer.write_rows([self._mark_to_market(row, quotes.get(row["ticker"], {})) for row in rows])
+            return True
+        except Exception as e:
+            print("Export failed:", e)
+            return False
+
+    # Marks open positions ({"ticker", "quantity", "cost_basis"}) to market with one set of quotes.
+    # Returns {"rows", "total_value", "total_cost", "total_profit", "day_change"} so that every
+    # view of the portfolio (table, pie, totals) is computed from the same prices.
+    def value_portfolio(self, positions: list[dict], quotes: dict[str, dict]) -> dict:
+        rows = [self.mark_position(p, quotes.get(p["ticker"], {})) for p in positions]
+        total_value = sum(row["market_value"] or 0.0 for row in rows)
+        total_cost = sum(row["cost_basis"] for row in rows)
+        return {
+            "rows": rows,
+            "total_value": total_value,
+            "total_cost": total_cost,
+            "total_profit": total_value - total_cost,
+            "day_change": sum(row["day_change"] or 0.0 for row in rows),
+        }
+
+    # Marks one position (or a row returned by value_portfolio) to market with a new quote.
+    def mark_position(self, position: dict, quote: dict) -> dict:
+        return self._mark_to_market(dict(position), quote)
 
     # Retrieves a portfolio given the user_id.
     def get_portfolio_by_user_id(self, user_id: int) -> Portfolio | None:
         try:
-            conn = self.db_service.connect()
-            cursor = conn.cursor()
-            cursor.execute("SELECT id FROM Portfolios WHERE user_id = ?", (user_id,))
-            row = cursor.fetchone()
-            cursor.close()
-            conn.close()
+            with self.db_service.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT id FROM Portfolios WHERE user_id = ?", (user_id,))
+                row = cursor.fetchone()
+                cursor.close()
 
             if row:
-                portfolio_id = row
-                return Portfolio(portfolio_id, user_id)
+                return Portfolio(row[0], self.db_service)
             return None
         except Exception as e:
             print(e)
@@ -67,73 +135,41 @@ class PortfolioController:
         
     # Retrieves current price for a ticker.
     def get_current_price(self, ticker: str) -> float:
-        __ticker__ = yf.Ticker(ticker)
-        live_price = __ticker__.info["regularMarketPrice"]
-        return live_price
-
-    # Retrieves the EMA for given dataframe.
-    def get_ema(self, price_data: pd.DataFrame, leng: int):
-        # Fetches the EMA
-        price_data[f'EMA_{leng}'] = ta.ema(price_data['Close'], length=leng)
-        # Retrieves the last piece of data which contains the EMA.
-        latest_ema = price_data[f'EMA_{leng}'].dropna().iloc[-1]
-        # Returns the EMA.
-        return latest_ema
-
-    # Retrieves the SMA for given dataframe.
-    def get_sma(self, price_data: pd.DataFrame, leng: int):
-        # Fetches the 50 day SMA
-        price_data[f'SMA_{leng}'] = ta.sma(price_data['Close'], length=leng)
-        # Retrieves the last piece of data which contains the SMA.
-        latest_sma = price_data[f'SMA_{leng}'].dropna().iloc[-1]
-        # Returns the SMA.
-        return latest_sma
-
-    # Retrieves the ADX for a given ticker.
-    def get_adx(self, price_data: pd.DataFrame):
-        length = 14
-        lensig = 10
-
-        adx_data = ta.adx(
-            high=price_data['High'],
-            low=price_data['Low'],
-            close=price_data['Close'],
-            length=length,
-            lensig=lensig
-        )
-
-        adx_col = f'ADX_{lensig}'  # e.g., ADX_10
-
-        if adx_col not in adx_data.columns:
-            return None
+        return self.api_service.get_current_price(ticker)
+
+    # Retrieves every indicator for a ticker's price data in one pass (memoized per last bar).
+    def get_indicators(self, ticker: str, price_data: pd.DataFrame, interval: str = "1h") -> IndicatorSet:
+        return self.indicator_engine.compute(price_data, ticker, interval)
+
+    # Retrieves the latest indicator values for every stored BASE_INTERVAL bar, feeding only bars that
+    # are new since the last call into the streaming state persisted in the bar store. The bar refresh
+    # calls this after every download, so the saved state never falls behind the stored bars.
+    # rebuild=True starts over, e.g. after older bars were added in front of the ones the state saw.
+    def get_streaming_indicators(self, ticker: str, rebuild: bool = False) -> dict[str, float | None]:
+        ticker = ticker.strip().upper()
+        interval = BASE_INTERVAL
+        price_data = self.bar_store.load(ticker, interval)
+        if price_data is None or price_data.empty:
+            raise ValueError("No price data found.")
+
+        state = None if rebuild else self.bar_store.load_state(ticker, interval, "indicators")
+        # States saved in an older format are rebuilt from the stored bars.
+        if state and state.get("version") != StreamingIndicatorSet.STATE_VERSION:
+            state = None
+        indicators = StreamingIndicatorSet.restore(state) if state else StreamingIndicatorSet()
+        # Rebuilds from scratch if the stored bars no longer contain the bar the state ended on.
+        if indicators.last_timestamp is not None and indicators.last_timestamp not in price_data.index:
+            indicators = StreamingIndicatorSet()
+
+        # The newest bar may still be forming, so the saved state stops one bar short of it.
+        indicators.update_frame(price_data.iloc[:-1])
+        self.bar_store.save_state(ticker, interval, "indicators", indicators.snapshot())
+        return indicators.update(price_data.iloc[-1], price_data.index[-1])
 
-        price_data['ADX'] = adx_data[adx_col]
-        latest_adx = price_data['ADX'].dropna().iloc[-1]
-        return latest_adx
-
-    # Retrieves the RSI for a given ticker.
-    def get_rsi(self, price_data: pd.DataFrame):
-        # Fetches the RSI
-        price_data['RSI'] = ta.rsi(price_data['Close'], length=14)
-        # Retrieves the last piece of data which contains the RSI
-        latest_rsi = price_data['RSI'].dropna().iloc[-1]
-        # Returns the RSI
-        return latest_rsi
-
-    # Retrieves RSI Volume for a given ticker.
-    def get_rsi_volume(self, price_data: pd.DataFrame):
-        # Fetches the RSI Volume
-        price_data['RSI_Volume'] = ta.rsi(price_data['Volume'], length=14)
-        # Retrieves the last piece of data which contains the RSI Volume
-        latest_rsi_volume = price_data['RSI_Volume'].dropna().iloc[-1]
-        # Returns the rsi_volume
-        return latest_rsi_volume
-    
     # Retrieves the market cap for given ticker.
     def get_market_cap(self, ticker: str) -> float | None:
         try:
-            ticker_obj = yf.Ticker(ticker.strip().upper())
-            market_cap = ticker_obj.info.get("marketCap")
+            market_cap = self.api_service.get_fundamentals(ticker).get_market_cap()
             if market_cap is None:
                 raise ValueError("Market cap not available for this ticker.")
             return market_cap
@@ -143,8 +179,7 @@ class PortfolioController:
     # Returns the p/e ratio for given ticker.
     def get_pe_ratio(self, ticker: str) -> float | None:
         try:
-            ticker_obj = yf.Ticker(ticker.strip().upper())
-            pe_ratio = ticker_obj.info.get("trailingPE")
+            pe_ratio = self.api_service.get_fundamentals(ticker).get_pe_ratio()
             if pe_ratio is None:
                 raise ValueError("P/E ratio not available for this ticker.")
             return pe_ratio
@@ -154,12 +189,10 @@ class PortfolioController:
     # Returns the dividend yield for given ticker.
     def get_dividend_yield(self, ticker: str) -> str:
         try:
-            ticker = ticker.strip().upper()
-            ticker_obj = yf.Ticker(ticker)
-            info = ticker_obj.info
+            fundamentals = self.api_service.get_fundamentals(ticker)
 
-            current_price = info.get("currentPrice")
-            trailing_dividend = info.get("trailingAnnualDividendRate")
+            current_price = fundamentals.get_current_price()
+            trailing_dividend = fundamentals.get_dividend_rate()
 
             if current_price and trailing_dividend:
                 dividend_yield = (trailing_dividend / current_price) * 100
@@ -167,7 +200,7 @@ class PortfolioController:
                     return f"{dividend_yield:.2f}%"
 
             # Fallback to Yahoo's dividendYield if primary fails
-            raw_yield = info.get("dividendYield")
+            raw_yield = fundamentals.get_dividend_yield()
             if isinstance(raw_yield, (int, float)) and 0 < raw_yield <= 0.2:  # 0.2 = 20%
                 return f"{raw_yield * 100:.2f}%"
 
@@ -179,9 +212,7 @@ class PortfolioController:
     # Returns the earnings per share for given ticker.
     def get_eps(self, ticker: str) -> float | None:
         try:
-            ticker_obj = yf.Ticker(ticker.strip().upper())
-            eps = ticker_obj.info.get("trailingEps")  # or "forwardEps"
-            return eps
+            return self.api_service.get_fundamentals(ticker).get_eps()
         except Exception:
             raise ValueError("Invalid ticker or EPS unavailable.")
                 
@@ -192,123 +223,183 @@ class PortfolioController:
     
     # Returns true if a golden_cross is present, false otherwise.
     def is_golden_cross(self, ticker: str, price_data: pd.DataFrame) -> bool:
-        sma50 = price_data["Close"].rolling(50).mean()
-        sma200 = price_data["Close"].rolling(200).mean()
-        if pd.isna(sma50.iloc[-1]) or pd.isna(sma200.iloc[-1]):
-            return False
-        return sma50.iloc[-1] > sma200.iloc[-1]
+        return self.get_indicators(ticker, price_data).is_golden_cross()
 
-    
     # Returns short-term momentum signal: "Bullish", "Bearish", or "Neutral"
-    def get_short_momentum(self, price_data: pd.DataFrame) -> str:
-        if price_data is None or price_data.empty:
-            return "N/A"
-        if "Close" not in price_data.columns:
+    def get_short_momentum(self, ticker: str, price_data: pd.DataFrame) -> str:
+        if price_data is None or price_data.empty or "Close" not in price_data.columns:
             return "N/A"
-        if len(price_data) < 20:  # not enough for short EMAs
-            return "N/A"
-
-        ema_10 = price_data["Close"].ewm(span=10, adjust=False).mean()
-        ema_20 = price_data["Close"].ewm(span=20, adjust=False).mean()
+        return self.get_indicators(ticker, price_data).get_short_momentum()
 
-        # Compare latest values
-        if ema_10.iloc[-1] > ema_20.iloc[-1]:
-            return "Bullish"
-        elif ema_10.iloc[-1] < ema_20.iloc[-1]:
-            return "Bearish"
-        else:
-            return "Neutral"
-        
     # Returns True if the current price is above the 200 EMA, False otherwise
-    def is_price_over_200_ema(self, price_data: pd.DataFrame) -> bool:
-        latest_ema_200 = self.get_ema(price_data, 200)
-        if latest_ema_200 is None:
-            return False
-        latest_close = price_data["Close"].iloc[-1]
-        return latest_close > latest_ema_200
+    def is_price_over_200_ema(self, ticker: str, price_data: pd.DataFrame) -> bool:
+        return self.get_indicators(ticker, price_data).is_price_over_200_ema()
 
     # Returns True if RSI is strong, False otherwise.
-    def get_rsi_strength(self, price_data: pd.DataFrame, threshold: float = 70) -> bool:
-        latest_rsi = self.get_rsi(price_data)
-        if latest_rsi is None:
-            return False
-        return latest_rsi >= threshold
+    def get_rsi_strength(self, ticker: str, price_data: pd.DataFrame, threshold: float = 70) -> bool:
+        return self.get_indicators(ticker, price_data).get_rsi_strength(threshold)
 
     # Returns True is RSI is oversold, False otherise.
-    def is_rsi_oversold(self, price_data: pd.DataFrame, threshold: float = 30) -> bool:
-        latest_rsi = self.get_rsi(price_data)
-        if latest_rsi is None:
-            return False
-        return latest_rsi <= threshold
+    def is_rsi_oversold(self, ticker: str, price_data: pd.DataFrame, threshold: float = 30) -> bool:
+        return self.get_indicators(ticker, price_data).is_rsi_oversold(threshold)
 
     # Returns True if ADX is above 25 (strong trend)
-    def is_adx_strong(self, price_data: pd.DataFrame) -> bool:
-        latest_adx = self.get_adx(price_data)
-        if latest_adx is None:
-            return False
-        return latest_adx > 25
+    def is_adx_strong(self, ticker: str, price_data: pd.DataFrame) -> bool:
+        return self.get_indicators(ticker, price_data).is_adx_strong()
     
     # Detects if current price is in a pullback during an uptrend
     def pullback_opportunity(self, ticker: str, price_data: pd.DataFrame) -> bool:
         if price_data is None or price_data.empty:
             return False
-
-        current_price = self.get_current_price(ticker)
-        ema_200 = self.get_ema(price_data, 200)
-        rsi = self.get_rsi(price_data)
-
-        if ema_200 is None or rsi is None:
-            return False
-
-        # In uptrend AND RSI in pullback range
-        return current_price > ema_200 and 40 <= rsi <= 50
+        return self.get_indicators(ticker, price_data).pullback_opportunity(self.get_current_price(ticker))
     
     # Detects if current volume is significantly higher than recent average
-    def volume_spike(self, price_data: pd.DataFrame, multiplier: float = 1.5) -> bool:
-        if price_data is None or price_data.empty:
+    def volume_spike(self, ticker: str, price_data: pd.DataFrame, multiplier: float = 1.5) -> bool:
+        if price_data is None or price_data.empty or "Volume" not in price_data.columns:
             return False
-        if "Volume" not in price_data.columns:
-            return False
-        if len(price_data) < 20:  # need enough data for average
-            return False
-
-        avg_volume = price_data["Volume"].rolling(20).mean().iloc[-1]
-        current_volume = price_data["Volume"].iloc[-1]
-
-        if pd.isna(avg_volume) or pd.isna(current_volume):
-            return False
-
-        return current_volume > avg_volume * multiplier
+        return self.get_indicators(ticker, price_data).volume_spike(multiplier)
     
     # Checks if the current volume is in the top X% of the last N periods
-    def high_volume(self, price_data: pd.DataFrame, percentile: float = 0.9) -> bool:
-        if price_data is None or price_data.empty:
-            return False
-        if "Volume" not in price_data.columns:
+    def high_volume(self, ticker: str, price_data: pd.DataFrame, percentile: float = 0.9) -> bool:
+        if price_data is None or price_data.empty or "Volume" not in price_data.columns:
             return False
-        if len(price_data) < 20:
-            return False
-
-        # Get volume threshold at the given percentile
-        threshold = price_data["Volume"].quantile(percentile)
-        current_volume = price_data["Volume"].iloc[-1]
-
-        if pd.isna(threshold) or pd.isna(current_volume):
-            return False
-
-        return current_volume >= threshold
+        return self.get_indicators(ticker, price_data).high_volume(percentile)
 
     # Helper method to fetch price_data for given ticker.
-    def get_price_data(self, ticker: str):
+    # Bars are kept in the on-disk bar store; only bars newer than the stored ones are downloaded.
+    def get_price_data(self, ticker: str, interval: str = BASE_INTERVAL):
         ticker = ticker.strip().upper()
-        price_data = yf.download(ticker, period="3mo", interval="1h", auto_adjust=True)
-
-        if price_data.empty or len(price_data) < 15:
-            raise ValueError("No price data found.")
-
-        # Flatten MultiIndex if needed
-        if isinstance(price_data.columns, pd.MultiIndex):
-            price_data.columns = price_data.columns.get_level_values(0)
-        
+        price_data = self.get_price_data_many([ticker], interval)[ticker]
+        if isinstance(price_data, Exception):
+            raise price_data
         return price_data
 
+    # Fetches price_data for several tickers at once in any of INTERVALS. Every interval is resampled
+    # from its stored SOURCES bars, so switching interval downloads nothing while they are fresh.
+    # Returns {ticker: price_data, or the ValueError raised for it}.
+    def get_price_data_many(self, tickers: list[str], interval: str = BASE_INTERVAL) -> dict[str, pd.DataFrame | Exception]:
+        if interval not in self.INTERVALS:
+            raise ValueError(f"Unsupported interval '{interval}'.")
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers))
+        period = self.INTERVALS[interval]
+        base = self.SOURCES[interval]
+        result = self._update_bars(tickers, base, period)
+
+        for ticker in tickers:
+            if ticker in result:
+                continue
+            price_data = self.bar_store.load(ticker, base)
+            if price_data is None or price_data.empty:
+                result[ticker] = ValueError("No price data found.")
+                continue
+
+            # Keeps the window the indicators of this interval were tuned on.
+            price_data = price_data[price_data.index >= price_data.index[-1] - period_offset(period)]
+            if interval != base:
+                price_data = resample(price_data, interval)
+            if len(price_data) < 15:
+                result[ticker] = ValueError("No price data found.")
+                continue
+            result[ticker] = price_data
+        return result
+
+    # Returns every stored bar of ticker at full resolution, with the chart's indicators, or None.
+    # Call get_price_data first to bring the stored bars up to date.
+    def get_chart_data(self, ticker: str) -> ChartData | None:
+        price_data = self.bar_store.load(ticker.strip().upper(), BASE_INTERVAL)
+        if price_data is None or len(price_data) < 2:
+            return None
+        return ChartData.from_frame(price_data)
+
+    # Helper method that adds current price, market value and unrealized profit to an exported row.
+    @staticmethod
+    def _mark_to_market(row: dict, quote: dict) -> dict:
+        quantity = float(row.get("quantity") or 0)
+        if "cost_basis" in row:
+            cost_basis = float(row["cost_basis"] or 0)
+            row["cost_basis"] = cost_basis
+            row["avg_buy_price"] = cost_basis / quantity if quantity else None
+        else:
+            row["buy_price"] = float(row.get("buy_price") or 0)
+            cost_basis = quantity * row["buy_price"]
+        row["quantity"] = quantity
+
+        price = quote.get("price")
+        previous_close = quote.get("previous_close")
+        row["current_price"] = price
+        row["previous_close"] = previous_close
+        if price is None:
+            row["market_value"] = row["unrealized_pl"] = row["unrealized_pl_pct"] = row["day_change"] = None
+            return row
+
+        row["market_value"] = round(quantity * price, 2)
+        row["unrealized_pl"] = round(quantity * price - cost_basis, 2)
+        row["unrealized_pl_pct"] = round((quantity * price - cost_basis) / cost_basis * 100, 2) if cost_basis else None
+        row["day_change"] = round(quantity * (price - previous_close), 2) if previous_close is not None else None
+        return row
+
+    # Helper method that downloads the base interval bars each ticker is missing for period: all of them for new
+    # tickers, older ones when the stored history is shorter than period, and newer ones once the stored
+    # bars are older than bar_max_age. Tickers needing the same range share one download. Returns
+    # {ticker: ValueError} for new tickers whose download failed.
+    def _update_bars(self, tickers: list[str], base: str, period: str) -> dict[str, Exception]:
+        # (start, end) -> tickers; (None, None) downloads the whole period.
+        ranges = {}
+        for ticker in tickers:
+            first = self.bar_store.first_timestamp(ticker, base)
+            if first is None:
+                ranges.setdefault((None, None), []).append(ticker)
+                continue
+            last = self.bar_store.last_timestamp(ticker, base)
+            wanted = (last - period_offset(period)).normalize()
+            # Weekends and holidays leave a few days at the start of the window without bars.
+            if first - wanted > pd.Timedelta(days=5) and self._history_start.get((ticker, base), first) > wanted:
+                ranges.setdefault((wanted, first), []).append(ticker)
+            updated_at = self._updated_at.get((ticker, base))
+            if updated_at is None or time.monotonic() - updated_at >= self.bar_max_age:
+                # Starts at the newest stored bar, which may still have been forming when it was saved.
+                ranges.setdefault((last, None), []).append(ticker)
+
+        failed = {}
+        # Tickers whose stored hourly bars changed, and those that got older bars in front of the stored ones.
+        updated, backfilled = set(), set()
+        for (start, end), group in ranges.items():
+            try:
+                if start is None:
+                    new_bars = self._download_bars_many(group, base, period=period)
+                else:
+                    new_bars = self._download_bars_many(group, base, start=start.to_pydatetime(),
+                                                        end=None if end is None else end.to_pydatetime())
+                self.bar_store.append_many(new_bars, base)
+            except Exception as e:
+                # Falls back to whatever is stored if the download fails.
+                if start is not None:
+                    print(f"Bar download failed for {', '.join(group)}:", e)
+                    continue
+                for ticker in group:
+                    failed[ticker] = ValueError("No price data found.")
+                    failed[ticker].__cause__ = e
+                continue
+
+            for ticker in group:
+                if end is None:
+                    self._updated_at[(ticker, base)] = time.monotonic()
+                else:
+                    # Older bars are requested once per window, even when the provider has none.
+                    self._history_start[(ticker, base)] = min(self._history_start.get((ticker, base), start), start)
+                if ticker in new_bars and base == BASE_INTERVAL:
+                    updated.add(ticker)
+                    if end is not None:
+                        backfilled.add(ticker)
+
+        for ticker in updated:
+            try:
+                self.get_streaming_indicators(ticker, rebuild=ticker in backfilled)
+            except Exception as e:
+                # The streaming state is rebuilt on the next refresh; the bars themselves are stored.
+                print(f"Streaming indicator update failed for {ticker}:", e)
+        return failed
+
+    # Helper method that downloads bars for several tickers from the market-data provider.
+    def _download_bars_many(self, tickers: list[str], interval: str, **kwargs) -> dict[str, pd.DataFrame]:
+        return self.provider.get_bars_many(tickers, interval, **kwargs)
@@ -13,9 +13,10 @@ from PyQt6.QtWidgets import QMainWindow
 from controllers.screen_manager import ScreenManager
 from PyQt6.QtGui import QDesktopServices
 from PyQt6.QtCore import QUrl
+from services.task_runner import TaskRunner
 
 class RegistrationController:
-    def __init__(self, ui, main_window: QMainWindow, db_service: DatabaseService, auth_service: AuthService, app_state: AppState, user_controller: UserController, screen_manager: ScreenManager):
+    def __init__(self, ui, main_window: QMainWindow, db_service: DatabaseService, auth_service: AuthService, app_state: AppState, user_controller: UserController, screen_manager: ScreenManager, task_runner: TaskRunner):
         super().__init__()
         self.ui = ui
         self.main_window = main_window
@@ -24,6 +25,7 @@ class RegistrationController:
         self.app_state = app_state
         self.user_controller = user_controller
         self.screen_manager = screen_manager
+        self.task_runner = task_runner
 
         self.connect_signals()
 
@@ -52,13 +54,18 @@ class RegistrationController:
             self.show_error("Password Mismatch", "Passwords do not match.")
             return
 
-        try:
-            success = self.user_controller.register_user(password, first_name, last_name, email)
-            if success:
-                self.show_info("Success", "Account successfully created!")
-        except ValueError as e:
+        # Hashing and the inserts run in the background.
+        self.task_runner.submit(
+            self.user_controller.register_user, password, first_name, last_name, email, key="register",
+            on_success=lambda success: self.show_info("Success", "Account successfully created!") if success else None,
+            on_error=self._on_register_error,
+        )
+
+    # Shows a failed registration. Runs on the GUI thread.
+    def _on_register_error(self, e: Exception):
+        if isinstance(e, ValueError):
             self.show_error("Registration Error", str(e))
-        except Exception as e:
+        else:
             self.show_error("Unexpected Error", str(e))
 
     # Opens the home window (guest version)
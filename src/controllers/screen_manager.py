@@ -1,62 +1,103 @@
 #
 # Author: Robert Patel
 # This class is used for managing and navigating the screen transitions.
+# Screens are registered as factories and only built the first time they are shown,
+# so start-up only pays for the window that is actually opened.
 #
 
-from views.login import Ui_Login
-from views.register import Ui_Register
-from views.dashboard import Ui_dashboard
-from views.analysis import Ui_Analysis
-from views.home_logged_out import Ui_Home_Logged_Out
-from views.home_logged_in import Ui_Home_Logged_In
-from views.buy_page import Ui_PurchaseWindow
-from views.sell_page import Ui_SellWindow
-from controllers.dashboard_controller import DashboardController
+import threading
 from PyQt6.QtWidgets import QMainWindow
+from services.startup_timer import StartupTimer
+
+
+# Stand-in that builds the real object on first attribute access.
+class LazyProxy:
+
+    # Constructs a new proxy around a zero-argument loader.
+    def __init__(self, loader):
+        object.__setattr__(self, "_loader", loader)
+        object.__setattr__(self, "_target", None)
+        object.__setattr__(self, "_lock", threading.RLock())
+
+    # Gets the real object, building it on first use. Safe to call from pool threads.
+    def resolve(self):
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    object.__setattr__(self, "_target", self._loader())
+        return self._target
+
+    # Returns True once the real object was built.
+    def is_resolved(self) -> bool:
+        return self._target is not None
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.resolve(), name, value)
+
 
 class ScreenManager:
 
     # Constructor used for the ScreenManager class.
-    def __init__(self, login_window: QMainWindow, register_window: QMainWindow, dashboard_window: QMainWindow, home_logged_out:
-                QMainWindow, home_logged_in: QMainWindow, analysis: QMainWindow, sell_page: QMainWindow, buy_page: QMainWindow):
-        self.login_window = login_window
-        self.register_window = register_window
-        self.dashboard_window = dashboard_window
-        self.home_logged_out = home_logged_out
-        self.home_logged_in = home_logged_in
-        self.analysis = analysis
-        self.sell_page = sell_page
-        self.buy_page = buy_page
+    def __init__(self, timer: StartupTimer | None = None):
+        self.timer = timer
+        # name -> factory() returning (window, controller)
+        self._factories = {}
+        self._windows = {}
+        self._controllers = {}
+
+    # Registers a screen. The factory is called once, on first use.
+    def register(self, name: str, factory):
+        self._factories[name] = factory
+
+    # Gets the window of a screen, building it if needed.
+    def get_window(self, name: str) -> QMainWindow:
+        self._build(name)
+        return self._windows[name]
+
+    # Gets the controller of a screen, building it if needed.
+    def get_controller(self, name: str):
+        self._build(name)
+        return self._controllers[name]
+
+    # Gets a proxy for a screen's controller that builds the screen on first use.
+    def lazy_controller(self, name: str) -> LazyProxy:
+        return LazyProxy(lambda: self.get_controller(name))
+
+    # Returns True if a screen was already built.
+    def is_built(self, name: str) -> bool:
+        return name in self._windows
+
+    # Gets the dashboard controller.
+    @property
+    def dashboard_controller(self):
+        return self.get_controller("dashboard")
 
     # Opens the login page.
     def show_login(self):
-        self.hide_all()
-        self.login_window.show()
+        self._show("login")
 
     # Opens the register page.
     def show_register(self):
-        self.hide_all()
-        self.register_window.show()
+        self._show("register")
 
     # Opens the dashboard for the user.
     def show_dashboard(self):
-        self.hide_all()
-        self.dashboard_window.show()
+        self._show("dashboard")
 
     # Opens the analysis page.
     def show_analysis(self):
-        self.hide_all()
-        self.analysis.show()
+        self._show("analysis")
 
     # Opens the logged-in home page for user.
     def show_home_logged_in(self):
-        self.hide_all()
-        self.home_logged_in.show()
+        self._show("home_logged_in")
 
     # Opens the guest home page.
     def show_home_logged_out(self):
-        self.hide_all()
-        self.home_logged_out.show()
+        self._show("home_logged_out")
 
     # Opens the user / settings page.
     def show_user_settings(self):
@@ -64,19 +105,31 @@ class ScreenManager:
 
     # Opens the window for purchasing a stock.
     def show_buy_window(self):
-        self.hide_all()
-        self.buy_page.show()
+        self._show("buy_page")
 
     # Opens the window for selling a stock.
     def show_sell_window(self):
-        self.hide_all()
-        self.sell_page.show()
+        self._show("sell_page")
 
     # Helper method for closing previous windows to maintain efficiency.
     def hide_all(self):
-        self.login_window.hide()
-        self.register_window.hide()
-        self.dashboard_window.hide()
-        self.analysis.hide()
-        self.home_logged_in.hide()
-        self.home_logged_out.hide()
\ No newline at end of file
+        for window in self._windows.values():
+            window.hide()
+
+    # Helper method that hides every window and shows one.
+    def _show(self, name: str):
+        window = self.get_window(name)
+        self.hide_all()
+        window.show()
+
+    # Helper method that builds a screen the first time it is needed.
+    def _build(self, name: str):
+        if name in self._windows:
+            return
+        if name not in self._factories:
+            raise KeyError(f"Unknown screen '{name}'.")
+        window, controller = self._factories[name]()
+        self._windows[name] = window
+        self._controllers[name] = controller
+        if self.timer is not None:
+            self.timer.mark(f"built {name}")
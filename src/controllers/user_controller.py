@@ -5,6 +5,7 @@
 #
 
 from models.user import User
+from models.portfolio import Portfolio
 from services.db_service import DatabaseService
 from services.auth_service import AuthService
 from services.app_state import AppState
@@ -24,33 +25,16 @@ class UserController:
         self.screen_manager = screen_manager
         self.portfolio_controller = portfolio_controller
 
-    # Logins user into the application.
-    def login_user(self, email: str, password: str) -> bool:
-        conn = self.db_service.connect()
-        # Validates the connection.
-        if conn is None:
-            return None
-
-        # Retrieves the user email.
-        user = self.db_service.get_user_by_email(email)
-
-        if not user:
-            raise ValueError("User not found in database.")
-        if not self.auth_service.verify_password(password, user.get_hashed_password()):
-            raise ValueError("Incorrect Password.")
-        
-        # User login successful, transitions to dashboard.
-        user.set_authenticated_status(True)
-        self.app_state.set_current_user(user)
-        return True
+    # Logins user into the application. Returns the authenticated user and their portfolio.
+    # Runs on a worker thread; the caller stores the result in AppState on the GUI thread.
+    def login_user(self, email: str, password: str) -> tuple[User, Portfolio | None]:
+        # One query returns the user, the password hash and the portfolio id.
+        user, portfolio_id = self.auth_service.authenticate(email, password)
+        portfolio = Portfolio(portfolio_id, self.db_service) if portfolio_id is not None else None
+        return user, portfolio
         
     # Registers a new user into the database.
     def register_user(self, password: str, first_name: str, last_name: str, email: str) -> bool:
-        conn = self.db_service.connect()
-        # Validates the connection.
-        if conn is None:
-            raise ValueError("Database connection failed.")
-        
         # Validates passed in variables prior to pushing new user information to database.
         if not password:
             raise ValueError("Password Invalid.")
@@ -68,20 +52,26 @@ class UserController:
         if existing_user:
             raise ValueError("User already exists.")
 
+        # Checks out a pooled connection. Validates the connection.
+        conn = self.db_service.connect()
+        if conn is None:
+            raise ValueError("Database connection failed.")
+
         # Pushes the new user information to the database.
         try:
             cursor = conn.cursor()
             cursor.execute("INSERT INTO users (first_name, last_name, email, hashed_password) VALUES (?, ?, ?, ?)", (first_name, last_name, email, hashed_password))
             conn.commit()
-            self.portfolio_controller.create_portfolio(self.db_service.get_user_id(email))
-            return True
         except Exception as e:
             print(e)
             raise RuntimeError("User registration failed.") from e
         finally:
-            # Closes database connection and returns True for a successful user registration.
+            # Returns the connection to the pool before the portfolio is created on another one.
             conn.close()
 
+        self.portfolio_controller.create_portfolio(self.db_service.get_user_id(email))
+        return True
+
     # Removes a user from the database.
     def remove_user(self, first_name: str, last_name: str, email: str) -> bool:
         pass
\ No newline at end of file
@@ -1,111 +1,217 @@
+import time
+_startup = time.perf_counter()
+
 from PyQt6.QtWidgets import QApplication, QMainWindow
+from PyQt6.QtCore import QTimer
 import sys
+import os
 
-# Import all UI classes
-from views.login import Ui_Login
-from views.register import Ui_Register
-from views.dashboard import Ui_dashboard
-from views.analysis import Ui_Analysis
-from views.home_logged_out import Ui_Home_Logged_Out
-from views.home_logged_in import Ui_Home_Logged_In
-from views.buy_page import Ui_PurchaseWindow
-from views.sell_page import Ui_SellWindow
-
-# Import controllers and services
-from controllers.login_controller import LoginController
-from controllers.registration_controller import RegistrationController
-from controllers.screen_manager import ScreenManager
-from services.auth_service import AuthService
-from services.db_service import DatabaseService
+# Only light modules are imported up front. Views, controllers and the services that
+# pull in yfinance, pandas, pandas_ta and pyodbc are imported by the screen factories below.
+from controllers.screen_manager import ScreenManager, LazyProxy
 from services.app_state import AppState
-from controllers.user_controller import UserController
-from controllers.home_logged_out_controller import HomeLoggedOutController
-from controllers.home_logged_in_controller import HomeLoggedInController
-from controllers.analysis_controller import AnalysisController
-from controllers.portfolio_controller import PortfolioController
-from controllers.buy_page_controller import BuyPageController
-from controllers.dashboard_controller import DashboardController
+from services.task_runner import TaskRunner
+from services.startup_timer import StartupTimer
+from services.query_monitor import QueryMonitor
+
+
+# Builds the shared services the first time a screen needs them.
+class Services:
+
+    # Constructor used for the Services class.
+    def __init__(self, app_state: AppState, screen_manager: ScreenManager, query_monitor: QueryMonitor):
+        self.app_state = app_state
+        self.screen_manager = screen_manager
+        self.query_monitor = query_monitor
+        self.api_service = LazyProxy(self._build_api_service)
+        self.db_service = LazyProxy(self._build_db_service)
+        self.auth_service = LazyProxy(self._build_auth_service)
+        self.bar_store = LazyProxy(self._build_bar_store)
+        self.portfolio_controller = LazyProxy(self._build_portfolio_controller)
+        self.screener = LazyProxy(self._build_screener)
+        self.batch_analyzer = LazyProxy(self._build_batch_analyzer)
+        self.user_controller = LazyProxy(self._build_user_controller)
+
+    def _build_api_service(self):
+        from services.api_service import APIService
+        from services.market_data_provider import create_provider
+        # BUDDYTRADE_MARKET_DATA selects live, synthetic, record:<dir> or replay:<dir> data.
+        return APIService(provider=create_provider(os.environ.get("BUDDYTRADE_MARKET_DATA")))
+
+    def _build_db_service(self):
+        from services.db_service import DatabaseService
+        from services.storage_backend import create_backend
+        # BUDDYTRADE_DATABASE selects sqlserver (default), sqlite or sqlite:<path>.
+        backend = create_backend(os.environ.get("BUDDYTRADE_DATABASE"))
+        db_service = DatabaseService(api_service=self.api_service.resolve(), backend=backend, monitor=self.query_monitor)
+        # Applies any pending schema migrations before the first query.
+        db_service.migrate()
+        return db_service
+
+    def _build_auth_service(self):
+        from services.auth_service import AuthService
+        return AuthService(self.db_service.resolve())
+
+    def _build_bar_store(self):
+        from services.bar_store import BarStore
+        # Offline data gets its own bar cache so it never mixes with live bars.
+        kind = (os.environ.get("BUDDYTRADE_MARKET_DATA") or "live").partition(":")[0]
+        return BarStore() if kind == "live" else BarStore(os.path.join(os.path.expanduser("~"), ".buddytrade", f"bars-{kind}"))
+
+    def _build_portfolio_controller(self):
+        from controllers.portfolio_controller import PortfolioController
+        return PortfolioController(self.db_service.resolve(), self.api_service.resolve(), self.bar_store.resolve())
+
+    def _build_screener(self):
+        from services.screener import Screener
+        # BUDDYTRADE_SCREENER_UNIVERSE names a file with one ticker per line (e.g. the S&P 500).
+        universe_path = os.environ.get("BUDDYTRADE_SCREENER_UNIVERSE")
+        universe = Screener.load_universe(universe_path) if universe_path else None
+        return Screener(self.bar_store.resolve(), self.api_service.resolve().provider, universe)
+
+    def _build_batch_analyzer(self):
+        from services.batch_analyzer import BatchAnalyzer
+        return BatchAnalyzer(self.portfolio_controller.resolve())
+
+    def _build_user_controller(self):
+        from controllers.user_controller import UserController
+        return UserController(
+            None, self.auth_service.resolve(), self.db_service.resolve(), self.app_state,
+            self.screen_manager, self.portfolio_controller.resolve()
+        )
+
+
+# Registers every screen with the screen manager. Nothing is built until it is shown.
+def register_screens(screen_manager: ScreenManager, services: Services, app_state: AppState, task_runner: TaskRunner):
+
+    def login():
+        from views.login import Ui_Login
+        from controllers.login_controller import LoginController
+        window = QMainWindow(); ui = Ui_Login(); ui.setupUi(window)
+        controller = LoginController(
+            ui, window,
+            services.db_service, services.auth_service, app_state,
+            services.user_controller, screen_manager,
+            services.portfolio_controller, screen_manager.lazy_controller("dashboard"), task_runner
+        )
+        return window, controller
+
+    def register():
+        from views.register import Ui_Register
+        from controllers.registration_controller import RegistrationController
+        window = QMainWindow(); ui = Ui_Register(); ui.setupUi(window)
+        controller = RegistrationController(
+            ui, window,
+            services.db_service, services.auth_service, app_state, services.user_controller, screen_manager, task_runner
+        )
+        return window, controller
+
+    def dashboard():
+        from views.dashboard import Ui_dashboard
+        from controllers.dashboard_controller import DashboardController
+        from services.quote_poller import QuotePoller
+        window = QMainWindow(); ui = Ui_dashboard(); ui.setupUi(window)
+        # BUDDYTRADE_REFRESH_SECONDS sets how often the open dashboard refreshes its quotes.
+        quote_poller = QuotePoller(services.api_service, task_runner,
+                                   interval=float(os.environ.get("BUDDYTRADE_REFRESH_SECONDS", "15")))
+        controller = DashboardController(
+            ui, window,
+            services.db_service, services.auth_service, app_state, screen_manager, services.user_controller,
+            services.portfolio_controller, services.api_service, task_runner, quote_poller, services.batch_analyzer
+        )
+        return window, controller
+
+    def analysis():
+        from views.analysis import Ui_Analysis
+        from controllers.analysis_controller import AnalysisController
+        window = QMainWindow(); ui = Ui_Analysis(); ui.setupUi(window)
+        controller = AnalysisController(
+            ui, window,
+            services.db_service, services.auth_service, app_state, services.user_controller, screen_manager,
+            services.portfolio_controller, services.api_service, task_runner
+        )
+        return window, controller
+
+    def home_logged_in():
+        from views.home_logged_in import Ui_Home_Logged_In
+        from controllers.home_logged_in_controller import HomeLoggedInController
+        window = QMainWindow(); ui = Ui_Home_Logged_In(); ui.setupUi(window)
+        controller = HomeLoggedInController(
+            ui, window,
+            services.db_service, services.auth_service, app_state, services.user_controller, screen_manager,
+            screen_manager.lazy_controller("analysis"), task_runner, services.screener
+        )
+        return window, controller
+
+    def home_logged_out():
+        from views.home_logged_out import Ui_Home_Logged_Out
+        from controllers.home_logged_out_controller import HomeLoggedOutController
+        window = QMainWindow(); ui = Ui_Home_Logged_Out(); ui.setupUi(window)
+        controller = HomeLoggedOutController(
+            ui, window,
+            services.db_service, services.auth_service, app_state, services.user_controller, screen_manager,
+            screen_manager.lazy_controller("analysis"), task_runner, services.screener
+        )
+        return window, controller
+
+    def buy_page():
+        from views.buy_page import Ui_PurchaseWindow
+        from controllers.buy_page_controller import BuyPageController
+        window = QMainWindow(); ui = Ui_PurchaseWindow(); ui.setupUi(window)
+        controller = BuyPageController(ui, window, services.db_service, screen_manager, app_state, task_runner)
+        return window, controller
+
+    def sell_page():
+        from views.sell_page import Ui_SellWindow
+        window = QMainWindow(); ui = Ui_SellWindow(); ui.setupUi(window)
+        return window, None
+
+    for name, factory in [("login", login), ("register", register), ("dashboard", dashboard),
+                          ("analysis", analysis), ("home_logged_in", home_logged_in),
+                          ("home_logged_out", home_logged_out), ("buy_page", buy_page), ("sell_page", sell_page)]:
+        screen_manager.register(name, factory)
+
 
 if __name__ == "__main__":
+    timer = StartupTimer(_startup)
+    timer.mark("imports")
+
     app = QApplication(sys.argv)
+    timer.mark("QApplication")
 
-    # Create all windows
-    login_window = QMainWindow()
-    register_window = QMainWindow()
-    dashboard_window = QMainWindow()
-    home_logged_out_window = QMainWindow()
-    home_logged_in_window = QMainWindow()
-    analysis_window = QMainWindow()
-    buy_window = QMainWindow()
-    sell_window = QMainWindow()
-
-    # Set up all UIs
-    login_ui = Ui_Login(); login_ui.setupUi(login_window)
-    register_ui = Ui_Register(); register_ui.setupUi(register_window)
-    dashboard_ui = Ui_dashboard(); dashboard_ui.setupUi(dashboard_window)
-    home_logged_out_ui = Ui_Home_Logged_Out(); home_logged_out_ui.setupUi(home_logged_out_window)
-    home_logged_in_ui = Ui_Home_Logged_In(); home_logged_in_ui.setupUi(home_logged_in_window)
-    analysis_ui = Ui_Analysis(); analysis_ui.setupUi(analysis_window)
-    buy_window_ui = Ui_PurchaseWindow(); buy_window_ui.setupUi(buy_window)
-    sell_window_ui = Ui_SellWindow(); sell_window_ui.setupUi(sell_window)
-
-    # Initialize core services and shared state
-    db_service = DatabaseService()
-    auth_service = AuthService(db_service)
+    # Initialize shared state and the lazy screen registry
     app_state = AppState()
-
-    # Initialize screen manager
-    screen_manager = ScreenManager(
-        login_window, register_window, dashboard_window,
-        home_logged_out_window, home_logged_in_window,
-        analysis_window, sell_window, buy_window
-    )
-
-    # Initialize controllers
-    portfolio_controller = PortfolioController(db_service)
-
-    user_controller = UserController(
-        None, auth_service, db_service, app_state, screen_manager, portfolio_controller
-    )
-
-    dashboard_controller = DashboardController(
-        dashboard_ui, dashboard_window,
-        db_service, auth_service, app_state, screen_manager, user_controller, portfolio_controller
-    )
-
-    screen_manager.dashboard_controller = dashboard_controller
-
-    login_controller = LoginController(
-        login_ui, login_window,
-        db_service, auth_service, app_state,
-        user_controller, screen_manager,
-        portfolio_controller, dashboard_controller
-    )
-
-    registration_controller = RegistrationController(
-        register_ui, register_window,
-        db_service, auth_service, app_state, user_controller, screen_manager
-    )
-
-    analysis_controller = AnalysisController(
-        analysis_ui, analysis_window,
-        db_service, auth_service, app_state, user_controller, screen_manager, portfolio_controller
-    )
-
-    home_logged_in_controller = HomeLoggedInController(
-        home_logged_in_ui, home_logged_in_window,
-        db_service, auth_service, app_state, user_controller, screen_manager, analysis_controller
-    )
-
-    home_logged_out_controller = HomeLoggedOutController(
-        home_logged_out_ui, home_logged_out_window,
-        db_service, auth_service, app_state, user_controller, screen_manager, analysis_controller
-    )
-
-    buy_page_controller = BuyPageController(
-        buy_window_ui, buy_window, db_service, screen_manager, app_state
+    # Every query is timed; BUDDYTRADE_SLOW_QUERY_MS sets the slow-query threshold (default 250 ms).
+    query_monitor = QueryMonitor(
+        slow_threshold=float(os.environ.get("BUDDYTRADE_SLOW_QUERY_MS", "250")) / 1000,
+        slow_log_path=os.environ.get("BUDDYTRADE_SLOW_QUERY_LOG"),
     )
+    task_runner = TaskRunner(monitor=query_monitor)
+    screen_manager = ScreenManager(timer)
+    services = Services(app_state, screen_manager, query_monitor)
+    register_screens(screen_manager, services, app_state, task_runner)
 
     # Start app at guest home
-    home_logged_out_window.show()
-    sys.exit(app.exec())
+    screen_manager.show_home_logged_out()
+    timer.mark("home_logged_out shown")
+
+    # The first event-loop pass runs after the window has been painted.
+    def on_first_frame():
+        timer.mark("first event loop pass")
+        timer.print_report()
+    QTimer.singleShot(0, on_first_frame)
+
+    exit_code = app.exec()
+
+    # Lets in-flight background jobs finish before the pool is torn down.
+    task_runner.cancel_all()
+    task_runner.wait_for_done(5000)
+    if services.batch_analyzer.is_resolved():
+        services.batch_analyzer.close()
+    if services.bar_store.is_resolved():
+        services.bar_store.flush()
+    if services.db_service.is_resolved():
+        services.db_service.close()
+    # BUDDYTRADE_QUERY_STATS prints the query statistics on exit.
+    query_monitor.print_report()
+    sys.exit(exit_code)
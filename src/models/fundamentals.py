@@ -0,0 +1,73 @@
+#
+# Author: Robert Patel
+# FundamentalsSnapshot class which holds the fundamentals of a ticker
+# fetched from one .info request.
+#
+
+import time
+
+class FundamentalsSnapshot:
+
+    # Constructs a new FundamentalsSnapshot.
+    def __init__(self, ticker: str, short_name: str | None, current_price: float | None, market_cap: float | None,
+                 pe_ratio: float | None, eps: float | None, dividend_rate: float | None, dividend_yield: float | None,
+                 fetched_at: float | None = None):
+        self.ticker = ticker
+        self.short_name = short_name
+        self.current_price = current_price
+        self.market_cap = market_cap
+        self.pe_ratio = pe_ratio
+        self.eps = eps
+        self.dividend_rate = dividend_rate
+        self.dividend_yield = dividend_yield
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+    # Builds a snapshot from a yfinance .info dictionary.
+    @classmethod
+    def from_info(cls, ticker: str, info: dict):
+        return cls(
+            ticker,
+            info.get("shortName"),
+            info.get("currentPrice") or info.get("regularMarketPrice"),
+            info.get("marketCap"),
+            info.get("trailingPE"),
+            info.get("trailingEps"),
+            info.get("trailingAnnualDividendRate"),
+            info.get("dividendYield"),
+        )
+
+    # Gets the ticker
+    def get_ticker(self) -> str:
+        return self.ticker
+
+    # Gets the short name of the company.
+    def get_short_name(self) -> str | None:
+        return self.short_name
+
+    # Gets the current price.
+    def get_current_price(self) -> float | None:
+        return self.current_price
+
+    # Gets the market cap.
+    def get_market_cap(self) -> float | None:
+        return self.market_cap
+
+    # Gets the trailing p/e ratio.
+    def get_pe_ratio(self) -> float | None:
+        return self.pe_ratio
+
+    # Gets the trailing earnings per share.
+    def get_eps(self) -> float | None:
+        return self.eps
+
+    # Gets the trailing annual dividend rate.
+    def get_dividend_rate(self) -> float | None:
+        return self.dividend_rate
+
+    # Gets Yahoo's dividend yield (fraction, e.g. 0.012).
+    def get_dividend_yield(self) -> float | None:
+        return self.dividend_yield
+
+    # Gets the age of the snapshot in seconds.
+    def get_age(self) -> float:
+        return time.time() - self.fetched_at
@@ -3,8 +3,12 @@
 # Portfolio class which contains getters/setters for Portfolio object.
 #
 
+from __future__ import annotations
+from typing import TYPE_CHECKING
 from models.holding import Holding
-from services.db_service import DatabaseService
+
+if TYPE_CHECKING:
+    from services.db_service import DatabaseService
 
 
 class Portfolio:
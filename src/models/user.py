@@ -4,14 +4,19 @@
 #
 class User:
     
-    # Constructs a new User.
-    def __init__(self, first_name: str, last_name: str, hashed_password: str, email: str):
+    # Constructs a new User. user_id is the database id, when known.
+    def __init__(self, first_name: str, last_name: str, hashed_password: str, email: str, user_id: int | None = None):
+        self.user_id = user_id
         self.first_name = first_name
         self.last_name = last_name
         self.hashed_password = hashed_password
         self.email = email
         self.is_authenticated = False
     
+    # Gets user_id
+    def get_user_id(self) -> int | None:
+        return self.user_id
+
     # Gets first_name
     def get_first_name(self):
         return self.first_name
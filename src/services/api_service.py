@@ -1,16 +1,129 @@
 #
 # Author: Robert Patel
 # This class is utilized to manage API services within the application.
+# Every live market-data lookup goes through the APIService so that quotes
+# are fetched in batches and shared between screens through one cache.
 #
 
-import yfinance as yf
+import threading
+import time
+from models.fundamentals import FundamentalsSnapshot
+from services.market_data_provider import MarketDataProvider, YFinanceProvider
+
+# Marker for "nothing cached" so that cached falsy values are still hits.
+_MISSING = object()
+
+
+# In-process cache of quote fields with a time-to-live per field.
+class QuoteCache:
+
+    # Default time-to-live (seconds) for each cached field.
+    DEFAULT_TTLS = {
+        "price": 15.0,
+        "previous_close": 12 * 60 * 60.0,
+        "info": 60 * 60.0,
+    }
+
+    # Constructs a new, empty quote cache.
+    def __init__(self, ttls: dict | None = None, default_ttl: float = 60.0):
+        self.ttls = dict(self.DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        # (ticker, field) -> (value, expires_at)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    # Gets a cached field for a ticker, or default when it is missing or expired.
+    def get(self, ticker: str, field: str, default=_MISSING):
+        with self._lock:
+            entry = self._entries.get((ticker, field))
+            if entry is not None and entry[1] > time.monotonic():
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[(ticker, field)]
+            self.misses += 1
+            return default
+
+    # Stores a field for a ticker using the field's time-to-live.
+    def set(self, ticker: str, field: str, value):
+        ttl = self.ttls.get(field, self.default_ttl)
+        with self._lock:
+            self._entries[(ticker, field)] = (value, time.monotonic() + ttl)
+
+    # Drops every cached field for one ticker, or the whole cache.
+    def invalidate(self, ticker: str | None = None):
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == ticker]:
+                    del self._entries[key]
+
+    # Returns the hit/miss statistics of the cache.
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
 
 # Class that handles API services and operations.
 class APIService:
 
+    # Constructor used for the APIService class.
+    def __init__(self, ttls: dict | None = None, fundamentals_ttl: float = 24 * 60 * 60.0,
+                 provider: MarketDataProvider | None = None):
+        self.provider = provider if provider is not None else YFinanceProvider()
+        self.cache = QuoteCache(ttls)
+        self.fetches = 0
+        self.fundamentals_ttl = fundamentals_ttl
+        self.fundamentals_hits = 0
+        self.fundamentals_misses = 0
+        # ticker -> FundamentalsSnapshot; stale snapshots are kept and served while they refresh.
+        self._fundamentals = {}
+        self._refreshing = set()
+        self._fundamentals_lock = threading.Lock()
+
     # Retrieve the current price of a passed-in ticker.
-    def get_current_price(self, ticker: str) -> float:
-        pass
+    def get_current_price(self, ticker: str) -> float | None:
+        ticker = self.normalize_ticker(ticker)
+        return self.get_quotes([ticker]).get(ticker, {}).get("price")
+
+    # Retrieves {ticker: price} for many tickers; cache misses are fetched in one batch.
+    def get_current_prices(self, tickers: list[str]) -> dict[str, float | None]:
+        return {t: q.get("price") for t, q in self.get_quotes(tickers).items()}
+
+    # Retrieves {ticker: {"price", "previous_close", "change", "change_pct"}} for many tickers.
+    # change is price - previous_close; both change fields are None when either price is unknown.
+    # refresh=True skips cached prices (used by pollers that want the latest quote).
+    def get_quotes(self, tickers: list[str], refresh: bool = False) -> dict[str, dict]:
+        quotes = {}
+        missing = []
+        for ticker in dict.fromkeys(self.normalize_ticker(t) for t in tickers if t):
+            price = _MISSING if refresh else self.cache.get(ticker, "price")
+            if price is _MISSING:
+                missing.append(ticker)
+                continue
+            previous_close = self.cache.get(ticker, "previous_close", None)
+            quotes[ticker] = self._with_change({"price": price, "previous_close": previous_close})
+
+        if missing:
+            for ticker, quote in self._fetch_quotes(missing).items():
+                # Unavailable prices are not cached so the next call retries.
+                if quote["price"] is not None:
+                    self.cache.set(ticker, "price", quote["price"])
+                if quote["previous_close"] is not None:
+                    self.cache.set(ticker, "previous_close", quote["previous_close"])
+                quotes[ticker] = self._with_change(quote)
+        return quotes
 
     # Fetches price data of a passed-in ticker.
     def get_historical_data(self, ticker: str, period: str) -> list[float]:
@@ -18,7 +131,33 @@ class APIService:
 
     # Fetches company information (name, sector, industry).
     def get_company_information(self, ticker: str) -> dict:
-        pass
+        ticker = self.normalize_ticker(ticker)
+        info = self.cache.get(ticker, "info")
+        if info is not _MISSING:
+            return info
+
+        self.fetches += 1
+        info = self.provider.get_info(ticker)
+        self.cache.set(ticker, "info", info)
+        price = info.get("currentPrice") or info.get("regularMarketPrice")
+        if price is not None:
+            self.cache.set(ticker, "price", float(price))
+        return info
+
+    # Retrieves the fundamentals of a ticker. Fetched once, then served from cache for a day;
+    # after that the stale snapshot is returned while a background thread refreshes it.
+    def get_fundamentals(self, ticker: str) -> FundamentalsSnapshot:
+        ticker = self.normalize_ticker(ticker)
+        with self._fundamentals_lock:
+            snapshot = self._fundamentals.get(ticker)
+            if snapshot is not None:
+                self.fundamentals_hits += 1
+                if snapshot.get_age() >= self.fundamentals_ttl and ticker not in self._refreshing:
+                    self._refreshing.add(ticker)
+                    threading.Thread(target=self._refresh_fundamentals, args=(ticker,), daemon=True).start()
+                return snapshot
+            self.fundamentals_misses += 1
+        return self._fetch_fundamentals(ticker)
 
     # Returns list of relevant market news articles.
     def get_market_news(self) -> list[dict]:
@@ -26,15 +165,15 @@ class APIService:
 
     # Retrieves the price-to-earnings ratio.
     def get_pe_ratio(self, ticker: str) -> float:
-        pass
+        return self.get_fundamentals(ticker).get_pe_ratio()
 
     # Retrieves the dividend yield for a given stock.
     def get_dividend_yield(self, ticker: str) -> float:
-        pass
+        return self.get_fundamentals(ticker).get_dividend_yield()
 
     # Validates if a ticker is linked to a stock listed on the market.
     def validate_ticker(self, ticker: str) -> bool:
-        pass
+        return self.get_current_price(ticker) is not None
 
     # Retrieves SMA for stock with given interval.
     def get_sma(self, ticker: str, interval: str) -> float:
@@ -52,4 +191,49 @@ class APIService:
     def get_rsi(self, ticker: str, period: int) -> float:
         pass
 
-    
+    # Returns the quote cache statistics plus the number of network fetches.
+    def get_cache_stats(self) -> dict:
+        stats = self.cache.stats()
+        stats["fetches"] = self.fetches
+        stats["fundamentals_hits"] = self.fundamentals_hits
+        stats["fundamentals_misses"] = self.fundamentals_misses
+        return stats
+
+    # Helper method that normalizes a ticker symbol.
+    @staticmethod
+    def normalize_ticker(ticker: str) -> str:
+        return str(ticker).strip().upper()
+
+    # Helper method that downloads and stores a fundamentals snapshot.
+    def _fetch_fundamentals(self, ticker: str) -> FundamentalsSnapshot:
+        self.fetches += 1
+        snapshot = FundamentalsSnapshot.from_info(ticker, self.provider.get_info(ticker))
+        with self._fundamentals_lock:
+            self._fundamentals[ticker] = snapshot
+        if snapshot.get_current_price() is not None:
+            self.cache.set(ticker, "price", float(snapshot.get_current_price()))
+        return snapshot
+
+    # Helper method that refreshes a stale snapshot on a background thread.
+    def _refresh_fundamentals(self, ticker: str):
+        try:
+            self._fetch_fundamentals(ticker)
+        except Exception as e:
+            print(f"Fundamentals refresh failed for {ticker}:", e)
+        finally:
+            with self._fundamentals_lock:
+                self._refreshing.discard(ticker)
+
+    # Helper method that adds the day change to a quote.
+    @staticmethod
+    def _with_change(quote: dict) -> dict:
+        price, previous_close = quote.get("price"), quote.get("previous_close")
+        if price is None or not previous_close:
+            return {**quote, "change": None, "change_pct": None}
+        change = price - previous_close
+        return {**quote, "change": change, "change_pct": change / previous_close * 100}
+
+    # Helper method that fetches quotes for several tickers in one provider call.
+    def _fetch_quotes(self, tickers: list[str]) -> dict[str, dict]:
+        self.fetches += 1
+        return self.provider.get_quotes(tickers)
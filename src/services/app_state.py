@@ -29,6 +29,14 @@ class AppState():
     # Gets the current_portfolio
     def get_current_portfolio(self) -> Portfolio:
         return self.current_portfolio
+
+    # Gets the database id of the current user, resolved once at login.
+    def get_user_id(self) -> int | None:
+        return self.current_user.get_user_id() if self.current_user else None
+
+    # Gets the id of the current portfolio, resolved once at login.
+    def get_portfolio_id(self) -> int | None:
+        return self.current_portfolio.get_portfolio_id() if self.current_portfolio else None
     
     # Gets is_authenticated
     def is_user_authenticated(self) -> bool:
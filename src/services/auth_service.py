@@ -1,35 +1,157 @@
 #
 # Author: Robert Patel
 # This class handles all authentication operations within the application.
+# The bcrypt work factor is a policy: it is calibrated once per install so that
+# one verify takes about a target time, and stored hashes are rewritten at the
+# policy cost the next time their owner logs in.
+#
+#   python -m services.auth_service --calibrate [--target-ms 250]
 #
 
+import json
+import os
+import time
 import bcrypt
 from models.user import User
 from services.db_service import DatabaseService
 
 class AuthService:
 
-    # Contructor used for AuthService class.
-    def __init__(self, db_service: DatabaseService):
+    # Cost used when no policy has been calibrated (bcrypt's own default).
+    DEFAULT_ROUNDS = 12
+    # bcrypt accepts 4-31; below 10 is too cheap to brute-force safely, above 16 takes seconds.
+    MIN_ROUNDS = 10
+    MAX_ROUNDS = 16
+    POLICY_PATH = os.path.join(os.path.expanduser("~"), ".buddytrade", "auth_policy.json")
+
+    # Contructor used for AuthService class. rounds defaults to BUDDYTRADE_BCRYPT_ROUNDS,
+    # then to the calibrated policy file, then to DEFAULT_ROUNDS.
+    def __init__(self, db_service: DatabaseService, rounds: int | None = None):
         self.db_service = db_service
+        self.rounds = rounds if rounds is not None else self.load_rounds()
+
+    # Gets the bcrypt cost new hashes are created with.
+    def get_rounds(self) -> int:
+        return self.rounds
 
-    # Hashes the password using bcrypt
+    # Hashes the password using bcrypt at the policy cost.
     def hash_password(self, password: str) -> str:
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds)).decode('utf-8')
 
     # Verifies a raw password against a hashed one
     def verify_password(self, input_password: str, hashed_password: str) -> bool:
         return bcrypt.checkpw(input_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
+    # Checks an email and password with a single query. Returns the authenticated user and
+    # their portfolio id; raises ValueError if the email is unknown or the password is wrong.
+    # bcrypt is slow by design, so call this from a worker thread.
+    def authenticate(self, email: str, password: str) -> tuple[User, int | None]:
+        login = self.db_service.get_login(email)
+        if login is None:
+            raise ValueError("User not found in database.")
+        if not self.verify_password(password, login["hashed_password"]):
+            raise ValueError("Incorrect Password.")
+
+        hashed_password = login["hashed_password"]
+        if self.needs_rehash(hashed_password):
+            hashed_password = self._rehash(login["user_id"], password, hashed_password)
+
+        user = User(
+            first_name=login["first_name"], last_name=login["last_name"],
+            hashed_password=hashed_password, email=login["email"], user_id=login["user_id"],
+        )
+        user.set_authenticated_status(True)
+        return user, login["portfolio_id"]
+
+    # Returns True if a stored hash was made at a cost other than the policy.
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return self.get_hash_rounds(hashed_password) != self.rounds
+
     # Logs in a user by checking email and password
     def login_user(self, email: str, password: str) -> User | None:
-        user = self.db_service.get_user_by_email(email)
-        if user and self.verify_password(password, user.get_hashed_password()):
-            user.set_authenticated_status(True)
-            return user
-        return None
+        try:
+            return self.authenticate(email, password)[0]
+        except ValueError:
+            return None
 
     # Logs out the current user
     def logout_user(self, user: User) -> None:
         user.set_authenticated_status(False)
 
+    # Helper method that stores the password again at the policy cost. Only called right after
+    # the password was verified; a failed update leaves the old hash, which still works.
+    def _rehash(self, user_id: int, password: str, old_hash: str) -> str:
+        new_hash = self.hash_password(password)
+        if self.db_service.update_password_hash(user_id, old_hash, new_hash):
+            return new_hash
+        return old_hash
+
+    # Reads the cost from a "$2b$12$..." hash (None if it is not a bcrypt hash).
+    @staticmethod
+    def get_hash_rounds(hashed_password: str) -> int | None:
+        parts = hashed_password.split("$")
+        try:
+            return int(parts[2])
+        except (IndexError, ValueError):
+            return None
+
+    # Reads the policy cost: BUDDYTRADE_BCRYPT_ROUNDS, then the calibrated policy file, then DEFAULT_ROUNDS.
+    @classmethod
+    def load_rounds(cls, path: str | None = None) -> int:
+        value = os.environ.get("BUDDYTRADE_BCRYPT_ROUNDS")
+        if value is None:
+            try:
+                with open(path or cls.POLICY_PATH, encoding="utf-8") as f:
+                    value = json.load(f).get("bcrypt_rounds")
+            except (OSError, ValueError):
+                value = None
+        try:
+            return min(max(int(value), cls.MIN_ROUNDS), cls.MAX_ROUNDS) if value is not None else cls.DEFAULT_ROUNDS
+        except ValueError:
+            return cls.DEFAULT_ROUNDS
+
+    # Returns the highest cost whose verify takes at most target_seconds on this machine.
+    # Every extra round doubles the work, so one measurement at MIN_ROUNDS is extrapolated.
+    @classmethod
+    def calibrate(cls, target_seconds: float = 0.25, samples: int = 3) -> int:
+        password = b"calibration-password"
+        hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds=cls.MIN_ROUNDS))
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            bcrypt.checkpw(password, hashed)
+            timings.append(time.perf_counter() - start)
+        base = min(timings)
+
+        rounds = cls.MIN_ROUNDS
+        while rounds < cls.MAX_ROUNDS and base * 2 ** (rounds + 1 - cls.MIN_ROUNDS) <= target_seconds:
+            rounds += 1
+        return rounds
+
+    # Writes the policy file read by load_rounds.
+    @classmethod
+    def save_rounds(cls, rounds: int, target_seconds: float, path: str | None = None):
+        path = path or cls.POLICY_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"bcrypt_rounds": rounds, "target_ms": round(target_seconds * 1000)}, f)
+
+
+# Calibrates the bcrypt cost for this machine (run once at install time):
+#   python -m services.auth_service --calibrate --target-ms 250
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Calibrate the bcrypt work factor to a target verify time.")
+    parser.add_argument("--calibrate", action="store_true", help="write the calibrated cost to the policy file")
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--policy", default=AuthService.POLICY_PATH)
+    args = parser.parse_args()
+
+    rounds = AuthService.calibrate(args.target_ms / 1000)
+    print(f"bcrypt cost {rounds} keeps a verify under {args.target_ms:g} ms on this machine "
+          f"(current policy: {AuthService.load_rounds(args.policy)}).")
+    if args.calibrate:
+        AuthService.save_rounds(rounds, args.target_ms / 1000, args.policy)
+        print(f"Saved to {args.policy}.")
+
@@ -0,0 +1,247 @@
+#
+# Author: Robert Patel
+# This class backtests the recommendation rules of the PortfolioController
+# (golden cross, short momentum, price over the 200 EMA, pullback, volume spike,
+# high volume, RSI oversold and strong ADX) over the whole stored history of
+# many tickers. Every rule is evaluated at every bar as a boolean BarPanel-shaped
+# array, using only the bars up to that one, and the statistics are computed
+# from those arrays without a loop over bars.
+#
+#   python -m services.backtester --tickers AAPL,MSFT,NVDA [--interval 1h] [--horizons 1,7,35]
+#
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.bar_panel import BarPanel
+from services import panel_indicators as pi
+
+
+# Statistics of every rule over one panel.
+class BacktestResult:
+
+    # Constructs a new result. stats maps each rule to its statistics; baseline holds the forward
+    # returns of every bar for comparison.
+    def __init__(self, tickers: list[str], bars: int, horizons: tuple[int, ...], stats: dict[str, dict], baseline: dict[int, dict], seconds: float):
+        self.tickers = tickers
+        self.bars = bars
+        self.horizons = horizons
+        self.stats = stats
+        self.baseline = baseline
+        self.seconds = seconds
+
+    # Gets the rule names in report order.
+    def get_signals(self) -> list[str]:
+        return list(self.stats)
+
+    # Gets the statistics of one rule.
+    def get_stats(self, signal: str) -> dict:
+        return self.stats[signal]
+
+    # Gets the forward-return distribution of every bar for a horizon.
+    def get_baseline(self, horizon: int) -> dict:
+        return self.baseline[horizon]
+
+    # Formats the statistics as a fixed-width report.
+    def report(self) -> str:
+        lines = [f"{len(self.tickers)} tickers x {self.bars} bars backtested in {self.seconds:.2f} s", ""]
+        lines.append(f"{'signal':<20} {'exposure':>8} {'entries':>8} {'hold':>6} {'turn/yr':>8} {'max dd':>8} {'med dd':>8} {'port dd':>8}")
+        for name, stats in self.stats.items():
+            lines.append(
+                f"{name:<20} {stats['exposure']:>8.1%} {stats['entries']:>8} {stats['avg_hold']:>6.1f} "
+                f"{stats['turnover']:>8.1f} {stats['max_drawdown']:>8.1%} {stats['median_drawdown']:>8.1%} {stats['portfolio_drawdown']:>8.1%}"
+            )
+        for horizon in self.horizons:
+            base = self.baseline[horizon]
+            lines.append("")
+            lines.append(f"forward return over {horizon} bars (all bars: hit {base['hit_rate']:.1%}, mean {base['mean']:+.3%})")
+            lines.append(f"{'signal':<20} {'count':>9} {'hit':>6} {'mean':>8} {'edge':>8} {'p5':>8} {'p25':>8} {'median':>8} {'p75':>8} {'p95':>8}")
+            for name, stats in self.stats.items():
+                f = stats["forward"][horizon]
+                lines.append(
+                    f"{name:<20} {f['count']:>9} {f['hit_rate']:>6.1%} {f['mean']:>+8.3%} {f['edge']:>+8.3%} "
+                    f"{f['p5']:>+8.2%} {f['p25']:>+8.2%} {f['median']:>+8.2%} {f['p75']:>+8.2%} {f['p95']:>+8.2%}"
+                )
+        return "\n".join(lines)
+
+
+class Backtester:
+
+    # Rules in report order.
+    SIGNALS = ("golden_cross", "short_momentum", "price_over_200_ema", "pullback_opportunity",
+               "volume_spike", "high_volume", "rsi_oversold", "adx_strong")
+
+    # Bars in a trading year, for annualized turnover (1h has seven bars a day: 9:30 to 15:30).
+    BARS_PER_YEAR = {"1h": 7 * 252, "4h": 2 * 252, "1d": 252, "1wk": 52}
+
+    # Constructs a new backtester. horizons are the forward-return periods in bars. high_volume_window is
+    # the number of bars the high-volume percentile looks back (the 3-month frame of 1h bars the live
+    # rule sees). Indicators are computed for chunk_size tickers at a time to bound memory.
+    def __init__(self, horizons: tuple[int, ...] = (1, 7, 35), high_volume_window: int = 455,
+                 volume_multiplier: float = 1.5, high_volume_percentile: float = 0.9, chunk_size: int = 64):
+        self.horizons = tuple(horizons)
+        self.high_volume_window = high_volume_window
+        self.volume_multiplier = volume_multiplier
+        self.high_volume_percentile = high_volume_percentile
+        self.chunk_size = chunk_size
+
+    # Evaluates every rule at every bar. Returns {rule: bool array shaped (tickers, bars)}.
+    def evaluate(self, panel: BarPanel) -> dict[str, np.ndarray]:
+        signals = {name: np.zeros(panel.close.shape, dtype=bool) for name in self.SIGNALS}
+        for start in range(0, len(panel.get_tickers()), self.chunk_size):
+            rows = slice(start, start + self.chunk_size)
+            chunk = self._evaluate_chunk(panel.high[rows], panel.low[rows], panel.close[rows], panel.volume[rows])
+            for name, values in chunk.items():
+                signals[name][rows] = values
+        return signals
+
+    # Backtests every rule on a panel. interval only sets the annualization of turnover.
+    def run(self, panel: BarPanel, interval: str = "1h") -> BacktestResult:
+        started = time.perf_counter()
+        close = panel.close
+        signals = self.evaluate(panel)
+        valid = ~np.isnan(close)
+
+        forward = {}
+        baseline = {}
+        for horizon in self.horizons:
+            # Single precision is plenty for return statistics and halves the work of the percentiles.
+            forward[horizon] = np.full(close.shape, np.nan, dtype=np.float32)
+            if horizon < close.shape[1]:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    forward[horizon][:, :-horizon] = close[:, horizon:] / close[:, :-horizon] - 1
+            baseline[horizon] = self._distribution(forward[horizon][~np.isnan(forward[horizon])])
+
+        # Holding the ticker on the bar after each signal bar, in cash otherwise.
+        bar_returns = np.nan_to_num(pi.pct_change(close, 1))
+        bars_per_year = self.BARS_PER_YEAR.get(interval, 252)
+        stats = {}
+        for name, signal in signals.items():
+            stats[name] = self._signal_stats(signal, valid, forward, baseline, bar_returns, bars_per_year)
+        return BacktestResult(panel.get_tickers(), panel.get_length(), self.horizons, stats, baseline,
+                              time.perf_counter() - started)
+
+    # Helper method that evaluates every rule for a chunk of tickers, as IndicatorSet does at the last bar.
+    def _evaluate_chunk(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> dict[str, np.ndarray]:
+        bars = np.arange(close.shape[1])
+        # IndicatorSet needs 20 bars for the momentum and volume rules.
+        enough = bars[None, :] >= pi.first_valid(close)[:, None] + 19
+
+        ema_200 = pi.ema(close, 200)
+        rsi = pi.rsi(close, 14)
+        volume_sma_20 = pi.sma(volume, 20)
+        high_volume = pi.at_or_above_percentile(volume, self.high_volume_window, self.high_volume_percentile, min_periods=20)
+
+        with np.errstate(invalid="ignore"):
+            return {
+                "golden_cross": pi.sma(close, 50) > pi.sma(close, 200),
+                "short_momentum": (pi.ewm(close, 10) > pi.ewm(close, 20)) & enough,
+                "price_over_200_ema": close > ema_200,
+                "pullback_opportunity": (close > ema_200) & (rsi >= 40) & (rsi <= 50),
+                "volume_spike": (volume > volume_sma_20 * self.volume_multiplier) & enough,
+                "high_volume": high_volume & enough,
+                "rsi_oversold": rsi <= 30,
+                "adx_strong": pi.adx(high, low, close, 14, 10) > 25,
+            }
+
+    # Helper method that computes the statistics of one rule.
+    def _signal_stats(self, signal: np.ndarray, valid: np.ndarray, forward: dict, baseline: dict,
+                      bar_returns: np.ndarray, bars_per_year: int) -> dict:
+        position = np.zeros_like(signal)
+        position[:, 1:] = signal[:, :-1]
+        strategy = np.where(position, bar_returns, 0.0)
+        changes = np.count_nonzero(position[:, 1:] != position[:, :-1], axis=1)
+        entries = int(np.count_nonzero(signal[:, 1:] & ~signal[:, :-1]) + np.count_nonzero(signal[:, 0]))
+        signal_bars = int(np.count_nonzero(signal))
+        valid_bars = np.maximum(np.count_nonzero(valid, axis=1), 1)
+        drawdowns = self._max_drawdown(strategy)
+        listed = valid.any(axis=1)
+
+        stats = {
+            "bars": signal_bars,
+            "entries": entries,
+            "exposure": signal_bars / max(int(np.count_nonzero(valid)), 1),
+            "avg_hold": signal_bars / entries if entries else 0.0,
+            # Position changes per ticker per year.
+            "turnover": float(np.mean(changes / valid_bars * bars_per_year)) if len(changes) else 0.0,
+            "max_drawdown": float(drawdowns.min()) if len(drawdowns) else 0.0,
+            "median_drawdown": float(np.median(drawdowns)) if len(drawdowns) else 0.0,
+            # Equal weight across tickers, each either holding or in cash.
+            "portfolio_drawdown": float(self._max_drawdown(strategy[listed].mean(axis=0, keepdims=True))[0]) if listed.any() else 0.0,
+            "forward": {},
+        }
+        for horizon, returns in forward.items():
+            values = returns[signal & ~np.isnan(returns)]
+            distribution = self._distribution(values)
+            distribution["edge"] = distribution["mean"] - baseline[horizon]["mean"]
+            stats["forward"][horizon] = distribution
+        return stats
+
+    # Helper method that summarizes a flat array of forward returns.
+    @staticmethod
+    def _distribution(values: np.ndarray) -> dict:
+        if len(values) == 0:
+            return {"count": 0, "hit_rate": 0.0, "mean": 0.0, "std": 0.0,
+                    "p5": 0.0, "p25": 0.0, "median": 0.0, "p75": 0.0, "p95": 0.0}
+        p5, p25, median, p75, p95 = np.quantile(values, (0.05, 0.25, 0.5, 0.75, 0.95))
+        return {
+            "count": int(len(values)),
+            "hit_rate": float(np.count_nonzero(values > 0) / len(values)),
+            "mean": float(values.mean(dtype=np.float64)),
+            "std": float(values.std(dtype=np.float64)),
+            "p5": float(p5), "p25": float(p25), "median": float(median), "p75": float(p75), "p95": float(p95),
+        }
+
+    # Helper method that returns the largest peak-to-trough loss of every row of per-bar returns.
+    @staticmethod
+    def _max_drawdown(returns: np.ndarray) -> np.ndarray:
+        equity = np.cumprod(1 + returns, axis=1)
+        peak = np.maximum.accumulate(np.maximum(equity, 1.0), axis=1)
+        return (equity / peak - 1).min(axis=1, initial=0.0)
+
+
+# Backtests stored bars from the command line. Tickers missing from the bar store are downloaded first.
+def main(argv=None) -> int:
+    from services.bar_store import BarStore
+    from services.market_data_provider import create_provider
+
+    parser = argparse.ArgumentParser(description="Backtest the recommendation rules over stored bars.")
+    parser.add_argument("--tickers", help="comma-separated tickers")
+    parser.add_argument("--universe", help="file with one ticker per line")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--horizons", default="1,7,35", help="comma-separated forward-return horizons in bars")
+    parser.add_argument("--period", default="730d", help="history downloaded for tickers that are not stored yet")
+    parser.add_argument("--market-data", default=os.environ.get("BUDDYTRADE_MARKET_DATA"),
+                        help="live (default), synthetic, record:<dir> or replay:<dir>")
+    parser.add_argument("--cache-dir", default=None, help="bar store directory")
+    args = parser.parse_args(argv)
+
+    if args.universe:
+        from services.screener import Screener
+        tickers = Screener.load_universe(args.universe)
+    elif args.tickers:
+        tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+    else:
+        parser.error("pass --tickers or --universe")
+
+    bar_store = BarStore(args.cache_dir)
+    missing = [t for t in tickers if bar_store.last_timestamp(t, args.interval) is None]
+    if missing:
+        provider = create_provider(args.market_data)
+        bar_store.append_many(provider.get_bars_many(missing, args.interval, period=args.period), args.interval)
+
+    panel = BarPanel.from_store(bar_store, tickers, args.interval)
+    if not panel.get_tickers():
+        print("No bars stored for these tickers.")
+        return 1
+    backtester = Backtester(horizons=tuple(int(h) for h in args.horizons.split(",")))
+    print(backtester.run(panel, args.interval).report())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
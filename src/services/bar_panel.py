@@ -0,0 +1,72 @@
+#
+# Author: Robert Patel
+# This class lines up the stored bars of many tickers on one shared time axis so
+# indicators and signals can be computed for all of them at once. Each OHLCV
+# field is a 2-D array shaped (tickers, bars), oldest bar first.
+#
+
+import numpy as np
+import pandas as pd
+from services.bar_store import BarStore
+from services import panel_indicators as pi
+
+
+class BarPanel:
+
+    FIELDS = BarStore.COLUMNS
+
+    # Constructs a new panel. data is shaped (fields, tickers, bars) in FIELDS order;
+    # stamps are the bar timestamps in int64 UTC nanoseconds.
+    def __init__(self, tickers: list[str], stamps: np.ndarray, data: np.ndarray):
+        self.tickers = list(tickers)
+        self.stamps = stamps
+        self.data = data
+        self.open, self.high, self.low, self.close, self.volume = data
+        self._rows = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+    # Builds a panel from the bar store. Tickers with no stored bars are left out.
+    # lookback keeps only the newest bars of the shared time axis.
+    @classmethod
+    def from_store(cls, bar_store: BarStore, tickers: list[str], interval: str, lookback: int | None = None) -> "BarPanel":
+        return cls.from_arrays(bar_store.load_many(tickers, interval), lookback)
+
+    # Builds a panel from {ticker: (timestamps, bars)} as returned by BarStore.load_many.
+    # A bar missing for one ticker (e.g. a halted day) repeats its last close with zero volume.
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, tuple[np.ndarray, np.ndarray]], lookback: int | None = None) -> "BarPanel":
+        tickers = list(arrays)
+        if not tickers:
+            return cls([], np.empty(0, dtype=np.int64), np.empty((len(cls.FIELDS), 0, 0)))
+        stamps = np.unique(np.concatenate([ts for ts, _ in arrays.values()]))
+        if lookback is not None:
+            stamps = stamps[-lookback:]
+
+        data = np.full((len(cls.FIELDS), len(tickers), len(stamps)), np.nan)
+        for row, (ts, bars) in enumerate(arrays.values()):
+            positions = np.searchsorted(stamps, ts)
+            inside = positions < len(stamps)
+            inside[inside] = stamps[positions[inside]] == ts[inside]
+            data[:, row, positions[inside]] = bars[inside].T
+
+        open_, high, low, close, volume = data
+        close[:] = pi.ffill(close)
+        for field in (open_, high, low):
+            np.copyto(field, close, where=np.isnan(field))
+        volume[np.isnan(volume) & ~np.isnan(close)] = 0.0
+        return cls(tickers, stamps, data)
+
+    # Gets the tickers in row order.
+    def get_tickers(self) -> list[str]:
+        return self.tickers
+
+    # Gets the row of a ticker.
+    def get_row(self, ticker: str) -> int:
+        return self._rows[ticker]
+
+    # Gets the number of bars on the time axis.
+    def get_length(self) -> int:
+        return len(self.stamps)
+
+    # Gets the time axis as a UTC DatetimeIndex.
+    def get_index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.stamps.astype("datetime64[ns]"), tz="UTC")
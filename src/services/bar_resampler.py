@@ -0,0 +1,72 @@
+#
+# Author: Robert Patel
+# Builds coarser OHLCV bars (4h, 1d, 1wk) from a finer series such as the
+# stored hourly bars, so every timeframe is derived from one cached download.
+# Bars are grouped by exchange-local day or week, and intraday blocks start at
+# the first bar of each session, the way Yahoo Finance labels them.
+#
+
+import numpy as np
+import pandas as pd
+
+DAY_NS = 24 * 3600 * 10**9
+
+# Length of the intraday intervals that can be derived.
+INTRADAY = {"4h": 4 * 3600 * 10**9}
+
+# Every interval resample accepts.
+INTERVALS = tuple(INTRADAY) + ("1d", "1wk")
+
+
+# Returns price_data (sorted, finer than interval) aggregated into interval bars. Open is the first
+# open, High/Low the extremes, Close the last close and Volume the sum of every bar in the group.
+def resample(price_data: pd.DataFrame, interval: str) -> pd.DataFrame:
+    if interval not in INTERVALS:
+        raise ValueError(f"Unsupported interval '{interval}'.")
+    if price_data.empty:
+        return price_data.copy()
+
+    index = price_data.index
+    # Exchange-local wall clock in nanoseconds, so days and weeks break at local midnight.
+    local = (index.tz_localize(None) if index.tz is not None else index).as_unit("ns").asi8
+    day = local // DAY_NS
+
+    if interval == "1d":
+        groups = day
+    elif interval == "1wk":
+        # 1970-01-01 was a Thursday; weeks start on Monday.
+        groups = day - (day + 3) % 7
+    else:
+        day_starts = _starts(day)
+        session_open = np.repeat(local[day_starts], np.diff(np.append(day_starts, len(day))))
+        groups = day * (DAY_NS // INTRADAY[interval] + 1) + (local - session_open) // INTRADAY[interval]
+    starts = _starts(groups)
+    ends = np.append(starts[1:], len(groups)) - 1
+
+    open_, high, low, close, volume = (price_data[c].to_numpy(dtype=np.float64) for c in
+                                       ("Open", "High", "Low", "Close", "Volume"))
+    result = pd.DataFrame({
+        "Open": open_[starts],
+        "High": np.fmax.reduceat(high, starts),
+        "Low": np.fmin.reduceat(low, starts),
+        "Close": close[ends],
+        "Volume": np.add.reduceat(np.nan_to_num(volume), starts),
+    }, index=_labels(index[starts], interval))
+    result.index.name = index.name
+    return result
+
+
+# Helper function that returns where each run of equal values in a sorted array starts.
+def _starts(groups: np.ndarray) -> np.ndarray:
+    return np.flatnonzero(np.concatenate(([True], groups[1:] != groups[:-1])))
+
+
+# Helper function that labels each group: its first bar intraday, local midnight of the day, or the week's Monday.
+def _labels(first: pd.DatetimeIndex, interval: str) -> pd.DatetimeIndex:
+    if interval in INTRADAY:
+        return first
+    days = first.normalize()
+    if interval == "1wk":
+        days = (days.tz_localize(None) - pd.to_timedelta(days.weekday, unit="D"))
+        days = days.tz_localize(first.tz) if first.tz is not None else days
+    return days
@@ -0,0 +1,275 @@
+#
+# Author: Robert Patel
+# This class keeps downloaded OHLCV bars on disk so that a ticker which was
+# analysed before only needs the bars that are newer than the stored ones.
+#
+# Layout: <cache_dir>/<TICKER>_<interval>/seg_<n>_ts.npy  (int64 UTC nanoseconds)
+#         <cache_dir>/<TICKER>_<interval>/seg_<n>_bars.npy (float64, one column per OHLCV field)
+#         <cache_dir>/<TICKER>_<interval>/<name>.state.json (optional state saved next to the bars)
+#         <cache_dir>/manifest.json (timezone, first/last timestamp, size and last access per key)
+#
+# Reads only update the last access in memory; it reaches the manifest with the
+# next append, eviction or flush (call flush on shutdown).
+#
+
+import json
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+
+# Columnar on-disk store of OHLCV bars keyed by (ticker, interval).
+class BarStore:
+
+    COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+    # Constructs a new bar store rooted at cache_dir.
+    def __init__(self, cache_dir: str | None = None, max_bytes: int = 256 * 1024 * 1024, max_segments: int = 8):
+        self.cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".buddytrade", "bars")
+        self.max_bytes = max_bytes
+        self.max_segments = max_segments
+        self._lock = threading.RLock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._manifest = self._read_manifest()
+
+    # Returns every stored bar for (ticker, interval), or None if nothing is stored.
+    def load(self, ticker: str, interval: str) -> pd.DataFrame | None:
+        key = self._key(ticker, interval)
+        with self._lock:
+            entry = self._manifest.get(key)
+            if entry is None:
+                return None
+            arrays = self._read(key)
+            if arrays is None:
+                self._write_manifest()
+                return None
+            stamps, bars = arrays
+            entry["last_access"] = time.time()
+
+        index = pd.DatetimeIndex(stamps.astype("datetime64[ns]"), tz="UTC").tz_convert(entry["tz"])
+        frame = pd.DataFrame(bars, index=index, columns=list(self.COLUMNS))
+        frame.index.name = "Datetime"
+        return frame
+
+    # Returns {ticker: (timestamps, bars)} for every stored ticker of interval as plain arrays
+    # (int64 UTC nanoseconds and one float64 column per OHLCV field).
+    def load_many(self, tickers: list[str], interval: str) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+        result = {}
+        with self._lock:
+            now = time.time()
+            dropped = False
+            for ticker in tickers:
+                key = self._key(ticker, interval)
+                entry = self._manifest.get(key)
+                if entry is None:
+                    continue
+                arrays = self._read(key)
+                if arrays is not None:
+                    entry["last_access"] = now
+                    result[ticker] = arrays
+                else:
+                    dropped = True
+            if dropped:
+                self._write_manifest()
+        return result
+
+    # Returns the timestamp of the newest stored bar, or None.
+    def last_timestamp(self, ticker: str, interval: str) -> pd.Timestamp | None:
+        with self._lock:
+            entry = self._manifest.get(self._key(ticker, interval))
+            if entry is None:
+                return None
+            return pd.Timestamp(entry["last_ts"], tz="UTC").tz_convert(entry["tz"])
+
+    # Returns the timestamp of the oldest stored bar, or None.
+    def first_timestamp(self, ticker: str, interval: str) -> pd.Timestamp | None:
+        key = self._key(ticker, interval)
+        with self._lock:
+            entry = self._manifest.get(key)
+            if entry is None:
+                return None
+            if "first_ts" not in entry:
+                # Manifests written before first_ts was tracked.
+                arrays = self._read(key)
+                if arrays is None:
+                    self._write_manifest()
+                    return None
+                entry["first_ts"] = int(arrays[0][0])
+                self._write_manifest()
+            return pd.Timestamp(entry["first_ts"], tz="UTC").tz_convert(entry["tz"])
+
+    # Appends new bars as a segment. Compacts and evicts when limits are reached.
+    def append(self, ticker: str, interval: str, frame: pd.DataFrame):
+        self.append_many({ticker: frame}, interval)
+
+    # Appends new bars for several tickers of one interval, then evicts and writes the manifest once.
+    def append_many(self, frames: dict[str, pd.DataFrame], interval: str):
+        with self._lock:
+            changed = False
+            for ticker, frame in frames.items():
+                if frame is None or frame.empty:
+                    continue
+                self._append_segment(ticker, interval, frame)
+                changed = True
+            if changed:
+                self.evict()
+
+    # Helper method that writes one appended segment and updates its manifest entry (not the file).
+    def _append_segment(self, ticker: str, interval: str, frame: pd.DataFrame):
+        key = self._key(ticker, interval)
+        index = frame.index if frame.index.tz is not None else frame.index.tz_localize("UTC")
+        stamps = index.tz_convert("UTC").tz_localize(None).values.astype("datetime64[ns]").astype(np.int64)
+        bars = frame.reindex(columns=list(self.COLUMNS)).to_numpy(dtype=np.float64)
+
+        entry = self._manifest.setdefault(key, {"tz": str(index.tz), "next_seq": 0, "first_ts": int(stamps.min()),
+                                                "last_ts": int(stamps.max()), "bytes": 0})
+        self._write_segment(key, entry["next_seq"], stamps, bars)
+        entry["next_seq"] += 1
+        if "first_ts" in entry:
+            entry["first_ts"] = min(entry["first_ts"], int(stamps.min()))
+        entry["last_ts"] = max(entry["last_ts"], int(stamps.max()))
+        entry["last_access"] = time.time()
+        entry["bytes"] = self._disk_size(key)
+
+        if len(self._segments(key)) > self.max_segments:
+            self.compact(ticker, interval)
+
+    # Rewrites all segments of (ticker, interval) as one de-duplicated segment.
+    def compact(self, ticker: str, interval: str):
+        key = self._key(ticker, interval)
+        with self._lock:
+            frame = self.load(ticker, interval)
+            if frame is None:
+                return
+            old_segments = self._segments(key)
+            entry = self._manifest[key]
+            stamps = frame.index.tz_convert("UTC").tz_localize(None).values.astype("datetime64[ns]").astype(np.int64)
+            self._write_segment(key, entry["next_seq"], stamps, frame.to_numpy(dtype=np.float64))
+            entry["next_seq"] += 1
+            for ts_path, bars_path in old_segments:
+                os.remove(ts_path)
+                os.remove(bars_path)
+            entry["bytes"] = self._disk_size(key)
+            self._write_manifest()
+
+    # Saves a JSON-serializable state (e.g. streaming indicators) next to the bars of (ticker, interval).
+    def save_state(self, ticker: str, interval: str, name: str, state: dict):
+        key = self._key(ticker, interval)
+        with self._lock:
+            if key not in self._manifest:
+                return
+            target = os.path.join(self.cache_dir, key, f"{name}.state.json")
+            with open(target + ".tmp", "w") as f:
+                json.dump(state, f)
+            os.replace(target + ".tmp", target)
+            self._manifest[key]["bytes"] = self._disk_size(key)
+            self._write_manifest()
+
+    # Loads a state saved with save_state, or None. States are dropped together with their bars.
+    def load_state(self, ticker: str, interval: str, name: str) -> dict | None:
+        try:
+            with open(os.path.join(self.cache_dir, self._key(ticker, interval), f"{name}.state.json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # Removes least recently used keys until the store fits in max_bytes.
+    def evict(self):
+        with self._lock:
+            total = sum(e["bytes"] for e in self._manifest.values())
+            for key in sorted(self._manifest, key=lambda k: self._manifest[k].get("last_access", 0)):
+                if total <= self.max_bytes:
+                    break
+                total -= self._manifest[key]["bytes"]
+                self._drop(key)
+            self._write_manifest()
+
+    # Removes one ticker (every interval) or the whole store.
+    def clear(self, ticker: str | None = None):
+        with self._lock:
+            prefix = None if ticker is None else f"{ticker.strip().upper()}_"
+            for key in list(self._manifest):
+                if prefix is None or key.startswith(prefix):
+                    self._drop(key)
+            self._write_manifest()
+
+    # Writes the manifest, saving the access times of keys that were only read since the last write.
+    def flush(self):
+        with self._lock:
+            self._write_manifest()
+
+    # Returns the total number of bytes on disk.
+    def size(self) -> int:
+        with self._lock:
+            return sum(e["bytes"] for e in self._manifest.values())
+
+    # Helper method that builds the directory key for (ticker, interval).
+    @staticmethod
+    def _key(ticker: str, interval: str) -> str:
+        return f"{ticker.strip().upper()}_{interval}"
+
+    # Helper method that reads every segment of a key as sorted (timestamps, bars) arrays, or None
+    # (dropping the key) if it has no segments left.
+    def _read(self, key: str) -> tuple[np.ndarray, np.ndarray] | None:
+        segments = self._segments(key)
+        if not segments:
+            self._drop(key)
+            return None
+
+        # Segments are memory mapped; concatenation copies them into writable arrays.
+        stamps = np.concatenate([np.load(ts_path, mmap_mode="r") for ts_path, _ in segments])
+        bars = np.concatenate([np.load(bars_path, mmap_mode="r") for _, bars_path in segments])
+        # Later segments overwrite bars that were still forming when an earlier one was written.
+        order = np.argsort(stamps, kind="stable")
+        stamps, bars = stamps[order], bars[order]
+        keep = np.append(stamps[1:] != stamps[:-1], True)
+        return stamps[keep], bars[keep]
+
+    # Helper method that lists (timestamps, bars) segment paths in write order.
+    def _segments(self, key: str) -> list[tuple[str, str]]:
+        path = os.path.join(self.cache_dir, key)
+        if not os.path.isdir(path):
+            return []
+        seqs = sorted(int(name.split("_")[1]) for name in os.listdir(path) if name.endswith("_ts.npy"))
+        return [(os.path.join(path, f"seg_{seq:06d}_ts.npy"), os.path.join(path, f"seg_{seq:06d}_bars.npy")) for seq in seqs]
+
+    # Helper method that writes one segment atomically (bars first, so a visible _ts file is always complete).
+    def _write_segment(self, key: str, seq: int, stamps: np.ndarray, bars: np.ndarray):
+        path = os.path.join(self.cache_dir, key)
+        os.makedirs(path, exist_ok=True)
+        for suffix, array in (("bars", bars), ("ts", stamps)):
+            target = os.path.join(path, f"seg_{seq:06d}_{suffix}.npy")
+            with open(target + ".tmp", "wb") as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(target + ".tmp", target)
+
+    # Helper method that returns the bytes used by a key.
+    def _disk_size(self, key: str) -> int:
+        path = os.path.join(self.cache_dir, key)
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+    # Helper method that deletes a key from disk and from the manifest.
+    def _drop(self, key: str):
+        path = os.path.join(self.cache_dir, key)
+        if os.path.isdir(path):
+            for name in os.listdir(path):
+                os.remove(os.path.join(path, name))
+            os.rmdir(path)
+        self._manifest.pop(key, None)
+
+    # Helper method that reads the manifest, starting over if it is missing or corrupt.
+    def _read_manifest(self) -> dict:
+        try:
+            with open(os.path.join(self.cache_dir, "manifest.json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    # Helper method that writes the manifest atomically.
+    def _write_manifest(self):
+        target = os.path.join(self.cache_dir, "manifest.json")
+        with open(target + ".tmp", "w") as f:
+            json.dump(self._manifest, f)
+        os.replace(target + ".tmp", target)
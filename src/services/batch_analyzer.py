@@ -0,0 +1,161 @@
+#
+# Author: Robert Patel
+# This class computes the recommendation of many tickers at once, e.g. every
+# position of a portfolio. Bars are downloaded in one batch, copied into a
+# single shared-memory block and analysed by a pool of worker processes, so the
+# indicator work runs on every core instead of one GIL-bound thread. Results are
+# yielded as soon as each ticker is done.
+#
+#   for ticker, summary in batch_analyzer.analyze_many(["AAPL", "MSFT"]):
+#       ...  # summary is a dict, or the Exception raised for that ticker
+#
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import pandas as pd
+from services.bar_store import BarStore
+from services.indicator_engine import IndicatorEngine, IndicatorSet
+
+# Latest indicator values sent back with each summary.
+SUMMARY_SERIES = ("EMA_50", "EMA_200", "SMA_50", "SMA_200", "RSI", "ADX")
+
+# Engine of a worker process; its memo lets a refresh of unchanged bars skip the computation.
+_engine = None
+
+
+# Runs in a worker process: rebuilds one ticker's bars from the shared block and summarizes them.
+def _analyze_shared(name: str, ticker: str, offset: int, length: int, tz: str, price: float | None) -> dict:
+    global _engine
+    if _engine is None:
+        _engine = IndicatorEngine()
+    block = SharedMemory(name=name)
+    try:
+        # Copies out of the block so nothing refers to it once it is closed.
+        stamps = np.ndarray(length, dtype=np.int64, buffer=block.buf, offset=offset).copy()
+        bars = np.ndarray((length, len(BarStore.COLUMNS)), dtype=np.float64, buffer=block.buf,
+                          offset=offset + length * 8).copy()
+    finally:
+        block.close()
+
+    index = pd.DatetimeIndex(stamps.astype("datetime64[ns]"), tz="UTC").tz_convert(tz)
+    price_data = pd.DataFrame(bars, index=index, columns=list(BarStore.COLUMNS))
+    return summarize(_engine.compute(price_data, ticker), price, price_data.index[-1])
+
+
+# Describes an indicator set with the recommendation and the signals behind it.
+def summarize(indicator_set: IndicatorSet, price: float | None, as_of) -> dict:
+    if price is None:
+        price = indicator_set.latest_close()
+    return {
+        "recommendation": indicator_set.get_recommendation(price),
+        "price": price,
+        "as_of": as_of,
+        "bars": indicator_set.get_length(),
+        "signals": {
+            "Golden cross": indicator_set.is_golden_cross(),
+            "Momentum": indicator_set.get_short_momentum(),
+            "Over 200 EMA": indicator_set.is_price_over_200_ema(),
+            "RSI overbought": indicator_set.get_rsi_strength(),
+            "RSI oversold": indicator_set.is_rsi_oversold(),
+            "Strong ADX": indicator_set.is_adx_strong(),
+            "Pullback": indicator_set.pullback_opportunity(price),
+            "Volume spike": indicator_set.volume_spike(),
+            "High volume": indicator_set.high_volume(),
+        },
+        "latest": {name: indicator_set.latest(name) for name in SUMMARY_SERIES},
+    }
+
+
+class BatchAnalyzer:
+
+    # Constructs a new analyzer. Batches smaller than min_parallel, or machines with a single core,
+    # are analysed on the calling thread with the portfolio controller's engine.
+    def __init__(self, portfolio_controller, max_workers: int | None = None, min_parallel: int = 4):
+        self.portfolio_controller = portfolio_controller
+        self.max_workers = max_workers if max_workers is not None else min(os.cpu_count() or 1, 8)
+        self.min_parallel = min_parallel
+        self._executor = None
+        self._lock = threading.Lock()
+
+    # Analyses every ticker and yields (ticker, summary) as each one finishes. A ticker that cannot
+    # be analysed yields (ticker, exception) instead, so one bad symbol never hides the others.
+    def analyze_many(self, tickers: list[str], interval: str = "1h"):
+        price_data = self.portfolio_controller.get_price_data_many(tickers, interval)
+        frames = {}
+        for ticker, result in price_data.items():
+            if isinstance(result, Exception):
+                yield ticker, result
+            else:
+                frames[ticker] = result
+        if not frames:
+            return
+
+        try:
+            quotes = self.portfolio_controller.api_service.get_quotes(list(frames))
+        except Exception as e:
+            # The latest close stands in for the live price.
+            print("Quote download failed:", e)
+            quotes = {}
+        prices = {ticker: (quotes.get(ticker) or {}).get("price") for ticker in frames}
+
+        if len(frames) < self.min_parallel or self.max_workers < 2:
+            for ticker, frame in frames.items():
+                try:
+                    indicator_set = self.portfolio_controller.get_indicators(ticker, frame, interval)
+                    yield ticker, summarize(indicator_set, prices[ticker], frame.index[-1])
+                except Exception as e:
+                    yield ticker, e
+            return
+
+        yield from self._analyze_parallel(frames, prices)
+
+    # Shuts the worker processes down.
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    # Helper method that packs every frame into one shared block and fans the tickers out to the pool.
+    def _analyze_parallel(self, frames: dict[str, pd.DataFrame], prices: dict[str, float | None]):
+        # Per ticker: int64 UTC nanoseconds, then the OHLCV bars row by row.
+        width = len(BarStore.COLUMNS)
+        size = sum(len(frame) * 8 * (1 + width) for frame in frames.values())
+        block = SharedMemory(create=True, size=size)
+        futures = {}
+        try:
+            executor = self._get_executor()
+            offset = 0
+            for ticker, frame in frames.items():
+                length = len(frame)
+                index = frame.index if frame.index.tz is not None else frame.index.tz_localize("UTC")
+                np.ndarray(length, dtype=np.int64, buffer=block.buf, offset=offset)[:] = index.tz_convert("UTC").as_unit("ns").asi8
+                np.ndarray((length, width), dtype=np.float64, buffer=block.buf, offset=offset + length * 8)[:] = \
+                    frame[list(BarStore.COLUMNS)].to_numpy(dtype=np.float64)
+                future = executor.submit(_analyze_shared, block.name, ticker, offset, length, str(index.tz), prices[ticker])
+                futures[future] = ticker
+                offset += length * 8 * (1 + width)
+
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
+        finally:
+            # Also runs when the consumer stops early; workers still reading keep their own mapping.
+            for future in futures:
+                future.cancel()
+            block.close()
+            block.unlink()
+
+    # Helper method that starts the worker processes on first use.
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned, not forked: the GUI process runs Qt and pool threads that must not be copied.
+                self._executor = ProcessPoolExecutor(self.max_workers, mp_context=get_context("spawn"))
+            return self._executor
@@ -0,0 +1,74 @@
+#
+# Author: Robert Patel
+# Full-resolution series behind the price chart: every stored bar of a ticker
+# with its moving averages and RSI, computed once with the vectorized
+# indicator kernels. The chart asks for the visible range at its pixel width
+# and gets LTTB-downsampled lines and per-pixel volume peaks back.
+#
+
+import numpy as np
+import pandas as pd
+from services import panel_indicators as pi
+from services.downsampling import lttb, bucket_max
+
+
+class ChartData:
+
+    # Moving averages drawn over the price: name -> (kind, length).
+    OVERLAYS = {"EMA 50": ("ema", 50), "EMA 200": ("ema", 200), "SMA 50": ("sma", 50), "SMA 200": ("sma", 200)}
+
+    # Constructs new chart data. lines holds one row per line (close, the overlays, then RSI) with gaps
+    # filled; valid_from is the first bar of each row that had a value.
+    def __init__(self, index: pd.DatetimeIndex, names: list[str], lines: np.ndarray, valid_from: np.ndarray, volume: np.ndarray):
+        self.index = index
+        self.names = names
+        self.lines = lines
+        self.valid_from = valid_from
+        self.volume = volume
+        self._x = np.arange(len(index), dtype=np.float64)
+
+    # Builds chart data from an OHLCV frame (oldest bar first).
+    @classmethod
+    def from_frame(cls, price_data: pd.DataFrame) -> "ChartData":
+        close = price_data["Close"].to_numpy(dtype=np.float64)[None, :]
+        close = pi.ffill(close)
+        rows = {"Close": close[0]}
+        for name, (kind, length) in cls.OVERLAYS.items():
+            rows[name] = (pi.ema if kind == "ema" else pi.sma)(close, length)[0]
+        rows["RSI"] = pi.rsi(close, 14)[0]
+
+        lines = np.vstack(list(rows.values()))
+        valid_from = pi.first_valid(lines)
+        # Warm-up bars repeat the first value so downsampling never has to skip NaNs.
+        lines = pi.ffill(lines)
+        for row, first in zip(lines, valid_from):
+            row[:first] = row[first] if first < len(row) else 0.0
+        volume = np.nan_to_num(price_data["Volume"].to_numpy(dtype=np.float64))
+        return cls(price_data.index, list(rows), lines, valid_from, volume)
+
+    # Gets the number of bars.
+    def get_length(self) -> int:
+        return len(self.index)
+
+    # Gets the bar timestamps.
+    def get_index(self) -> pd.DatetimeIndex:
+        return self.index
+
+    # Gets the line names, in the order of the rows returned by downsample.
+    def get_names(self) -> list[str]:
+        return self.names
+
+    # Returns the bars first..last (exclusive) reduced to about width points per line:
+    # {"x": bar numbers per line, "y": values per line, "valid": False where a line had no value yet,
+    #  "volume_x": bar number of each pixel's peak, "volume": that peak}.
+    def downsample(self, first: int, last: int, width: int) -> dict:
+        first, last = max(0, first), min(self.get_length(), last)
+        selected = lttb(self._x[first:last], self.lines[:, first:last], max(3, width)) + first
+        volume_x, volume = bucket_max(self.volume[first:last], max(1, width))
+        return {
+            "x": selected,
+            "y": np.take_along_axis(self.lines, selected, axis=1),
+            "valid": selected >= self.valid_from[:, None],
+            "volume_x": volume_x + first,
+            "volume": volume,
+        }
@@ -0,0 +1,269 @@
+#
+# Author: Robert Patel
+# This class keeps a bounded pool of open database connections so that
+# the application does not pay for a new encrypted handshake on every query.
+#
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+# Counters describing how the pool has been used since it was created.
+class PoolMetrics:
+
+    # Constructs a new, zeroed set of pool metrics.
+    def __init__(self):
+        self.hits = 0
+        self.creations = 0
+        self.waits = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.health_check_failures = 0
+        self.evictions = 0
+        self.discards = 0
+
+    # Records the time a caller spent blocked waiting for a free connection.
+    def record_wait(self, seconds: float):
+        self.waits += 1
+        self.total_wait_time += seconds
+        self.max_wait_time = max(self.max_wait_time, seconds)
+
+    # Returns the metrics as a plain dictionary.
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "creations": self.creations,
+            "waits": self.waits,
+            "total_wait_time": round(self.total_wait_time, 6),
+            "avg_wait_time": round(self.total_wait_time / self.waits, 6) if self.waits else 0.0,
+            "max_wait_time": round(self.max_wait_time, 6),
+            "health_check_failures": self.health_check_failures,
+            "evictions": self.evictions,
+            "discards": self.discards,
+        }
+
+
+# Wraps a pooled connection so that close() hands it back to the pool.
+class PooledConnection:
+
+    # Constructs a wrapper around a raw connection owned by the given pool.
+    def __init__(self, pool, raw_connection):
+        self._pool = pool
+        self._raw = raw_connection
+        self._released = False
+
+    # Gets the underlying driver connection.
+    def get_raw_connection(self):
+        return self._raw
+
+    # Returns the connection to the pool instead of closing it.
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool.release(self._raw)
+
+    # Forwards every other attribute (cursor, commit, rollback, ...) to the raw connection.
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# Thread-safe pool of database connections created by a factory callable.
+class ConnectionPool:
+
+    # Constructs a new pool. Connections are created lazily up to max_size.
+    def __init__(self, factory, min_size: int = 1, max_size: int = 5, acquire_timeout: float = 30.0,
+                 idle_timeout: float = 300.0, health_check_after: float = 30.0, health_check_query: str = "SELECT 1"):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size.")
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.health_check_query = health_check_query
+        self.metrics = PoolMetrics()
+
+        # Idle connections as (connection, time returned to the pool); most recent on the right.
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._lock = threading.Condition()
+
+    # Opens min_size connections up front.
+    def warm_up(self):
+        with self._lock:
+            count = max(0, self.min_size - self._size)
+            self._size += count
+        for _ in range(count):
+            try:
+                conn = self._create()
+            except Exception:
+                self._forget()
+                raise
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+                self._lock.notify()
+
+    # Checks a connection out of the pool, blocking while the pool is exhausted.
+    def acquire(self):
+        start = time.monotonic()
+        waited = False
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed.")
+                self._evict_idle_locked()
+
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    break
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn, returned_at = None, None
+                    break
+
+                remaining = self.acquire_timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a database connection.")
+                waited = True
+                self._lock.wait(remaining)
+
+            if waited:
+                self.metrics.record_wait(time.monotonic() - start)
+
+        # Creates or validates outside of the lock so other callers are not blocked on I/O.
+        if conn is None:
+            try:
+                return self._create()
+            except Exception:
+                self._forget()
+                raise
+
+        if time.monotonic() - returned_at >= self.health_check_after and not self._is_healthy(conn):
+            with self._lock:
+                self.metrics.health_check_failures += 1
+            self._close_quietly(conn)
+            try:
+                return self._create()
+            except Exception:
+                self._forget()
+                raise
+
+        with self._lock:
+            self.metrics.hits += 1
+        return conn
+
+    # Returns a connection to the pool. Broken connections are dropped.
+    def release(self, conn):
+        try:
+            # Never hand out a connection with a half-finished transaction.
+            conn.rollback()
+        except Exception:
+            with self._lock:
+                self.metrics.discards += 1
+            self._close_quietly(conn)
+            self._forget()
+            return
+
+        with self._lock:
+            if self._closed:
+                self._size -= 1
+                self._close_quietly(conn)
+                return
+            self._idle.append((conn, time.monotonic()))
+            self._lock.notify()
+
+    # Checks out a connection for the duration of a with-block.
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    # Closes every idle connection and refuses further checkouts.
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._lock.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    # Returns the number of open connections (idle and checked out).
+    def size(self) -> int:
+        with self._lock:
+            return self._size
+
+    # Returns the number of idle connections.
+    def idle_count(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    # Returns a snapshot of the pool metrics and current occupancy.
+    def stats(self) -> dict:
+        with self._lock:
+            stats = self.metrics.as_dict()
+            stats["size"] = self._size
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._size - len(self._idle)
+            return stats
+
+    # Helper method that opens a brand new connection through the factory.
+    def _create(self):
+        conn = self.factory()
+        if conn is None:
+            raise ConnectionError("Connection factory returned no connection.")
+        with self._lock:
+            self.metrics.creations += 1
+        return conn
+
+    # Helper method that gives back a slot after a connection is lost or never created.
+    def _forget(self):
+        with self._lock:
+            self._size -= 1
+            self._lock.notify()
+
+    # Helper method that closes connections idle for longer than idle_timeout, keeping min_size open.
+    def _evict_idle_locked(self):
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        # The oldest idle connections sit on the left of the deque.
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            self.metrics.evictions += 1
+            self._close_quietly(conn)
+
+    # Helper method that runs the health check query against a connection.
+    def _is_healthy(self, conn) -> bool:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(self.health_check_query)
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    # Helper method that closes a connection and ignores driver errors.
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
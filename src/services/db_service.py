@@ -5,48 +5,117 @@
 # application.
 #
 
-import sys
-import os
-import pyodbc
-import yfinance as yf
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from collections import defaultdict
+from itertools import islice
 from models.user import User
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import DB_SERVER, DB_NAME, DB_USER, DB_PASSWORD, DB_DRIVER
+from services.connection_pool import ConnectionPool, PooledConnection
+from services.api_service import APIService
+from services.storage_backend import StorageBackend, SqlServerBackend
+from services.schema_migrations import SchemaMigrator
+from services.query_monitor import QueryMonitor
 
 # Handles interactions between the database and the application.
 class DatabaseService:
 
-    # Connects to the database
+    # Queries on the login and dashboard path: name -> (query, parameter names).
+    # Each one must be answered with index seeks (see benchmarks/db_benchmark.py).
+    HOT_QUERIES = {
+        "login": ("""
+            SELECT u.id, u.first_name, u.last_name, u.hashed_password, u.email, p.id
+            FROM Users u
+            LEFT JOIN Portfolios p ON p.user_id = u.id
+            WHERE u.email = ?
+        """, ("email",)),
+        "user_by_email": ("SELECT first_name, last_name, hashed_password, email FROM Users WHERE email = ?", ("email",)),
+        "user_id": ("SELECT id FROM Users WHERE email = ?", ("email",)),
+        "portfolio_id": ("SELECT id FROM Portfolios WHERE user_id = ?", ("user_id",)),
+        "portfolio_snapshot": ("""
+            SELECT p.id, pos.ticker, pos.total_qty, pos.cost_basis
+            FROM Users u
+            JOIN Portfolios p ON p.user_id = u.id
+            LEFT JOIN Positions pos ON pos.portfolio_id = p.id
+            WHERE u.email = ?
+        """, ("email",)),
+        "positions": ("SELECT ticker, total_qty, cost_basis FROM Positions WHERE portfolio_id = ? AND total_qty > 0", ("portfolio_id",)),
+        "position": ("SELECT total_qty, avg_price FROM Positions WHERE portfolio_id = ? AND ticker = ?", ("portfolio_id", "ticker")),
+        "ticker_lots": ("SELECT quantity, buy_price FROM Holdings WHERE portfolio_id = ? AND ticker_norm = ?", ("portfolio_id", "ticker")),
+    }
+
+    # Constructor used for the DatabaseService class. Connections are pooled and reused.
+    # backend defaults to the SQL Server database from config.py; every query is recorded by monitor.
+    def __init__(self, min_pool_size: int = 1, max_pool_size: int = 5, idle_timeout: float = 300.0, health_check_after: float = 30.0, api_service: APIService | None = None, backend: StorageBackend | None = None, monitor: QueryMonitor | None = None):
+        self.api_service = api_service if api_service is not None else APIService()
+        self.backend = backend if backend is not None else SqlServerBackend()
+        self.monitor = monitor if monitor is not None else QueryMonitor()
+        self.pool = ConnectionPool(
+            self._open_connection,
+            min_size=min_pool_size,
+            max_size=max_pool_size,
+            idle_timeout=idle_timeout,
+            health_check_after=health_check_after,
+        )
+
+    # Opens a brand-new connection to the database (used by the pool only).
+    def _open_connection(self):
+        return self.backend.connect()
+
+    # Connects to the database. The returned connection goes back to the pool on close().
     def connect(self):
-        connection_string = (
-        f"DRIVER={DB_DRIVER};"
-        f"SERVER={DB_SERVER};"
-        f"DATABASE={DB_NAME};"
-        f"UID={DB_USER};"
-        f"PWD={DB_PASSWORD};"
-        f"Encrypt=yes;"
-        f"TrustServerCertificate=no;"
-        f"Connection Timeout=30;"
-    )
-
         try:
-            conn = pyodbc.connect(connection_string)
-            return conn
+            start = time.perf_counter()
+            conn = PooledConnection(self.pool, self.pool.acquire())
+            self.monitor.record_acquire(time.perf_counter() - start)
+            return self.monitor.wrap(conn)
         except Exception as e:
             print("❌ Connection failed:", e)
             return None
 
+    # Checks a pooled connection out for the duration of a with-block.
+    @contextmanager
+    def connection(self):
+        start = time.perf_counter()
+        with self.pool.connection() as conn:
+            self.monitor.record_acquire(time.perf_counter() - start)
+            yield self.monitor.wrap(conn)
+
+    # Brings the schema up to date (the first pooled connection already does) and returns its version.
+    def migrate(self) -> int:
+        with self.connection() as conn:
+            self.backend.migrate(conn)
+            return SchemaMigrator(self.backend).get_version(conn)
+
+    # Returns {name: {"plan": [...], "index_seek": bool}} for every hot query.
+    # values supplies the parameters: email, user_id, portfolio_id and ticker.
+    def explain_hot_queries(self, values: dict) -> dict[str, dict]:
+        results = {}
+        with self.connection() as conn:
+            for name, (query, param_names) in self.HOT_QUERIES.items():
+                plan = self.backend.explain(conn, query, tuple(values[p] for p in param_names))
+                results[name] = {"plan": plan, "index_seek": self.backend.uses_index_seek(plan)}
+        return results
+
+    # Returns the connection pool metrics (wait time, hits, creations, ...).
+    def get_pool_stats(self) -> dict:
+        return self.pool.stats()
+
+    # Gets the monitor that times every query.
+    def get_query_monitor(self) -> QueryMonitor:
+        return self.monitor
+
+    # Closes all pooled connections.
+    def close(self):
+        self.pool.close()
+
     # Retrieves a user via email search.
     def get_user_by_email(self, email: str) -> User | None:
         try:
-            conn = self.connect()
-            cursor = conn.cursor()
-            cursor.execute("SELECT first_name, last_name, hashed_password, email FROM Users WHERE email = ?", (email,))
-            row = cursor.fetchone()
-            cursor.close()
-            conn.close()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(self.HOT_QUERIES["user_by_email"][0], (email,))
+                row = cursor.fetchone()
+                cursor.close()
 
             if row:
                 # row = (first_name, last_name, hashed_password, email)
@@ -56,15 +125,38 @@ class DatabaseService:
             print(f"❌ Error retrieving user: {e}")
             return None
         
+    # Retrieves everything a login needs in one query.
+    # Returns {"user_id", "first_name", "last_name", "hashed_password", "email", "portfolio_id"} or None.
+    def get_login(self, email: str) -> dict | None:
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(self.HOT_QUERIES["login"][0], (email,))
+                row = cursor.fetchone()
+                cursor.close()
+
+            if row is None:
+                return None
+            return {
+                "user_id": row[0],
+                "first_name": row[1],
+                "last_name": row[2],
+                "hashed_password": row[3],
+                "email": row[4],
+                "portfolio_id": row[5],
+            }
+        except Exception as e:
+            print(f"❌ Error retrieving login: {e}")
+            return None
+
     # Retrieves the user ID using the email to search.
     def get_user_id(self, email: str) -> int | None:
         try:
-            conn = self.connect()
-            cursor = conn.cursor()
-            cursor.execute("SELECT id FROM users WHERE email = ?", (email,))
-            row = cursor.fetchone()
-            cursor.close()
-            conn.close()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(self.HOT_QUERIES["user_id"][0], (email,))
+                row = cursor.fetchone()
+                cursor.close()
 
             if row:
                 return row[0]
@@ -78,19 +170,35 @@ class DatabaseService:
     def get_portfolio_id(self, user_id: int) -> int | None:
         # Connects to db and fetches the portfolio_id linked with the given user_id.
         try:
-            # Connects to db and creates cursor to execute query.
-            conn = self.connect()
-            cursor = conn.cursor()
-            cursor.execute("SELECT id FROM Portfolios WHERE user_id = ?", (user_id,))
-            row = cursor.fetchone()
-            # Closes the connections to the db.
-            cursor.close()
-            conn.close()
+            # Checks out a pooled connection and creates cursor to execute query.
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(self.HOT_QUERIES["portfolio_id"][0], (user_id,))
+                row = cursor.fetchone()
+                # Closes the cursor; the connection returns to the pool.
+                cursor.close()
             return row[0] if row else None
         except Exception as e:
             print("Error retrieving portfolio ID:", e)
             return None
 
+    # Replaces a user's password hash, only if it is still old_hash (so a concurrent change wins).
+    def update_password_hash(self, user_id: int, old_hash: str, new_hash: str) -> bool:
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "UPDATE Users SET hashed_password = ? WHERE id = ? AND hashed_password = ?",
+                    (new_hash, user_id, old_hash),
+                )
+                updated = cursor.rowcount == 1
+                conn.commit()
+                cursor.close()
+            return updated
+        except Exception as e:
+            print("Error updating password hash:", e)
+            return False
+
     # Verifies the existence of an email in the database.
     def email_exists(self, email: str) -> bool:
         if self.get_user_by_email(email):
@@ -120,7 +228,7 @@ class DatabaseService:
                 WHERE
                     portfolio_id = ?
             """
-            cursor.execute(query, (portfolio_id))
+            cursor.execute(query, (portfolio_id,))
             rows = cursor.fetchall()
             columns = [column[0] for column in cursor.description]
 
@@ -134,37 +242,109 @@ class DatabaseService:
             conn.close()
 
     # Saves a holding currently in a portfolio in the database.
-    def save_holding(self, ticker: str, quantity: int, price: float, datetime: datetime) -> bool | None:
+    # The ticker's lots and position are replaced by one lot of quantity shares at price (none if quantity is 0).
+    def save_holding(self, ticker: str, quantity: int, price: float, datetime: datetime, portfolio_id: int) -> bool | None:
         # Connects to db
         conn = self.connect()
 
         if conn is None:
             return None
-        
+
         try:
             cursor = conn.cursor()
-            query = ("UPATE holdings SET ticker = ?, quantity = ?, price = ? ")
-            cursor.execute(query, (ticker, quantity, price, datetime))
+            ticker = ticker.strip().upper()
+            date_added = datetime.strftime("%Y-%m-%d %H:%M:%S") if hasattr(datetime, "strftime") else datetime
+            cursor.execute("DELETE FROM Holdings WHERE portfolio_id = ? AND ticker_norm = ?", (portfolio_id, ticker))
+            cursor.execute("DELETE FROM Positions WHERE portfolio_id = ? AND ticker = ?", (portfolio_id, ticker))
+            if quantity > 0:
+                cursor.execute(
+                    "INSERT INTO Holdings (portfolio_id, ticker, buy_price, quantity, date_added) VALUES (?, ?, ?, ?, ?)",
+                    (portfolio_id, ticker, price, quantity, date_added),
+                )
+                self._apply_position(cursor, portfolio_id, ticker, quantity, quantity * price, date_added)
+            conn.commit()
+            return True
         except Exception as e:
             print(e)
+            conn.rollback()
+            return False
         finally:
-            conn.close( )
+            conn.close()
 
     # Remove's a holding from a portfolio in the database.
     def remove_holding(self, user_id: int, ticker: str) -> bool:
-        pass
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    DELETE FROM Holdings
+                    WHERE portfolio_id IN (SELECT id FROM Portfolios WHERE user_id = ?)
+                      AND ticker_norm = ?
+                """, (user_id, ticker.strip().upper()))
+                removed = cursor.rowcount
+                cursor.execute("""
+                    DELETE FROM Positions
+                    WHERE portfolio_id IN (SELECT id FROM Portfolios WHERE user_id = ?)
+                      AND ticker = ?
+                """, (user_id, ticker.strip().upper()))
+                conn.commit()
+                cursor.close()
+            return removed > 0
+        except Exception as e:
+            print("Error removing holding:", e)
+            return False
 
     # Retrieves a watchlist from the database.
     def get_watchlist(self, user_id: int) -> list[str]:
-        pass
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT ticker FROM Watchlist WHERE user_id = ? ORDER BY id", (user_id,))
+                rows = cursor.fetchall()
+                cursor.close()
+            # A ticker can sit in several colored lists; each is returned once.
+            return list(dict.fromkeys(row[0] for row in rows))
+        except Exception as e:
+            print("Error retrieving watchlist:", e)
+            return []
 
     # Adds a ticker to a watchlist in the database.
     def add_to_watchlist(self, user_id: int, ticker: str, color_id: int) -> bool:
-        pass
+        try:
+            ticker = ticker.strip().upper()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                # Adding a ticker that is already listed is a no-op.
+                cursor.execute("""
+                    INSERT INTO Watchlist (user_id, ticker, color_id)
+                    SELECT ?, ?, ?
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM Watchlist WHERE user_id = ? AND ticker = ? AND color_id = ?
+                    )
+                """, (user_id, ticker, color_id, user_id, ticker, color_id))
+                conn.commit()
+                cursor.close()
+            return True
+        except Exception as e:
+            print("Error adding to watchlist:", e)
+            return False
 
     # Removes a ticker from the watchlist in the database.
     def remove_from_watchlist(self, user_id: int, ticker: str, color_id: int) -> bool:
-        pass
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "DELETE FROM Watchlist WHERE user_id = ? AND ticker = ? AND color_id = ?",
+                    (user_id, ticker.strip().upper(), color_id),
+                )
+                removed = cursor.rowcount
+                conn.commit()
+                cursor.close()
+            return removed > 0
+        except Exception as e:
+            print("Error removing from watchlist:", e)
+            return False
 
     # Adds a holding to the database into the 'Holdings' table.
     def add_holding(self, ticker: str, purchase_price: float, quantity: int, date_time: datetime, portfolio_id: int) -> bool:
@@ -178,48 +358,134 @@ class DatabaseService:
 
             if isinstance(date_time, datetime):
                 date_time = date_time.strftime("%Y-%m-%d %H:%M:%S")
+            ticker = ticker.strip().upper()
 
             query = "INSERT INTO Holdings (portfolio_id, ticker, buy_price, quantity, date_added) VALUES (?, ?, ?, ?, ?)"
 
+            # The lot and the position update commit together.
             cursor.execute(query, (portfolio_id, ticker, purchase_price, quantity, date_time))
+            self._apply_position(cursor, portfolio_id, ticker, quantity, quantity * purchase_price, date_time)
             conn.commit()
             return True
         except Exception as e:
             print("❌ SQL Error:", e)
+            conn.rollback()
             return False
         finally:
             conn.close()
 
-    def get_holding(self):
-        return
-    
-    # Retrieves {ticker: quantity} for a user's portfolio.
-    def get_tickers(self, portfolio_id: int) -> dict[str, int]:
+    # Sells shares of a holding at average cost. The sale is recorded as a negative lot at the
+    # position's average price, so the lots and the Positions table keep the same totals.
+    # Returns False if the portfolio holds fewer than quantity shares.
+    def sell_holding(self, ticker: str, quantity: float, date_time: datetime, portfolio_id: int) -> bool:
         conn = self.connect()
+
         if conn is None:
-            return {}
+            return False
 
         try:
             cursor = conn.cursor()
+
+            if isinstance(date_time, datetime):
+                date_time = date_time.strftime("%Y-%m-%d %H:%M:%S")
+            ticker = ticker.strip().upper()
+
+            cursor.execute(self.HOT_QUERIES["position"][0], (portfolio_id, ticker))
+            row = cursor.fetchone()
+            if quantity <= 0 or row is None or float(row[0]) < quantity:
+                return False
+            avg_price = float(row[1] or 0)
+
             cursor.execute(
-                """
-                SELECT ticker, quantity
-                FROM Holdings
-                WHERE portfolio_id = ?
-                """,
-                (portfolio_id,),
+                "INSERT INTO Holdings (portfolio_id, ticker, buy_price, quantity, date_added) VALUES (?, ?, ?, ?, ?)",
+                (portfolio_id, ticker, avg_price, -quantity, date_time),
             )
-            rows = cursor.fetchall()
+            self._apply_position(cursor, portfolio_id, ticker, -quantity, -quantity * avg_price, date_time)
+            conn.commit()
+            return True
+        except Exception as e:
+            print("❌ SQL Error:", e)
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
 
-            tickers: dict[str, int] = {}
-            for r in rows:
-                if not r or r[0] is None:
-                    continue
-                ticker = str(r[0]).upper()
-                qty = int(r[1]) if r[1] is not None else 0
-                tickers[ticker] = tickers.get(ticker, 0) + qty  # aggregate if duplicates
+    # Adds many holdings to the 'Holdings' table in batched transactions.
+    # holdings yields (ticker, purchase_price, quantity, date_time) and is consumed lazily, so
+    # it can stream from a file. progress(rows_inserted, rows_per_second) is called after every batch.
+    # Positions are updated once per ticker per batch, in the batch's transaction.
+    # Returns the number of rows inserted; raises RuntimeError if a batch fails (earlier batches stay).
+    def add_holdings_bulk(self, portfolio_id: int, holdings, batch_size: int = 1000, progress=None) -> int:
+        query = "INSERT INTO Holdings (portfolio_id, ticker, buy_price, quantity, date_added) VALUES (?, ?, ?, ?, ?)"
+        inserted = 0
+        start = time.perf_counter()
+        holdings = iter(holdings)
+
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            self.backend.prepare_bulk_cursor(cursor)
+            try:
+                while True:
+                    # Errors raised while reading holdings propagate unchanged.
+                    batch = [
+                        (portfolio_id, ticker.strip().upper(), purchase_price, quantity,
+                         date_time.strftime("%Y-%m-%d %H:%M:%S") if isinstance(date_time, datetime) else date_time)
+                        for ticker, purchase_price, quantity, date_time in islice(holdings, batch_size)
+                    ]
+                    if not batch:
+                        break
+                    # ticker -> [quantity, cost]
+                    totals = {}
+                    for _, ticker, purchase_price, quantity, _ in batch:
+                        total = totals.setdefault(ticker, [0.0, 0.0])
+                        total[0] += quantity
+                        total[1] += quantity * purchase_price
+                    updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    try:
+                        cursor.executemany(query, batch)
+                        for ticker, (quantity, cost) in totals.items():
+                            self._apply_position(cursor, portfolio_id, ticker, quantity, cost, updated_at)
+                        conn.commit()
+                    except Exception as e:
+                        conn.rollback()
+                        print("❌ SQL Error:", e)
+                        raise RuntimeError(f"Bulk insert failed after {inserted} rows.") from e
+                    inserted += len(batch)
+                    if progress is not None:
+                        elapsed = time.perf_counter() - start
+                        progress(inserted, inserted / elapsed if elapsed > 0 else 0.0)
+            finally:
+                cursor.close()
+        return inserted
+
+    # Retrieves one ticker's position as {"ticker", "quantity", "avg_buy_price"}, or None if not held.
+    def get_holding(self, portfolio_id: int, ticker: str) -> dict | None:
+        try:
+            ticker = ticker.strip().upper()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(self.HOT_QUERIES["position"][0], (portfolio_id, ticker))
+                row = cursor.fetchone()
+                cursor.close()
+
+            if row is None or float(row[0] or 0) <= 0:
+                return None
+            return {"ticker": ticker, "quantity": float(row[0]), "avg_buy_price": float(row[1] or 0)}
+        except Exception as e:
+            print("Error retrieving holding:", e)
+            return None
 
-            return tickers
+    # Retrieves {ticker: quantity} for a user's portfolio.
+    def get_tickers(self, portfolio_id: int) -> dict[str, int]:
+        conn = self.connect()
+        if conn is None:
+            return {}
+
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT ticker, total_qty FROM Positions WHERE portfolio_id = ?", (portfolio_id,))
+            rows = cursor.fetchall()
+            return {r[0]: int(r[1]) for r in rows if r[0] and r[1] is not None}
         except Exception as e:
             print(e)
             return {}
@@ -228,59 +494,17 @@ class DatabaseService:
 
     # Retrieves the total market value of the user's portfolio (sum of qty * current price).
     def get_portfolio_value(self, portfolio_id: int) -> float | None:
-        conn = self.connect()
-        if conn is None:
-            return None
         try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT
-                    ticker,
-                    quantity
-                FROM
-                    Holdings
-                WHERE
-                    portfolio_id = ?
-            """, (portfolio_id,))
-            rows = cursor.fetchall()
-            if not rows:
+            positions = self._get_positions(portfolio_id)
+            if not positions:
                 return 0.0
 
-            # Aggregate quantities per ticker in case of duplicates
-            qty_by_ticker = defaultdict(float)
-            for r in rows:
-                tkr = (r[0] or "").upper().strip()
-                qty = float(r[1] or 0)
-                if tkr and qty > 0:
-                    qty_by_ticker[tkr] += qty
-
-            if not qty_by_ticker:
-                return 0.0
-
-            # Batch fetch using Tickers
-            tickers_str = " ".join(qty_by_ticker.keys())
-            ts = yf.Tickers(tickers_str)
+            # Batch fetch through the shared quote cache
+            prices = self.api_service.get_current_prices([p[0] for p in positions])
 
             total = 0.0
-            for tkr, qty in qty_by_ticker.items():
-                t = ts.tickers[tkr]
-                price = None
-
-                # Fast path
-                fi = getattr(t, "fast_info", None)
-                if fi:
-                    price = fi.get("last_price")
-
-                # Fallbacks
-                if price is None:
-                    info = getattr(t, "info", {})
-                    price = info.get("regularMarketPrice")
-
-                if price is None:
-                    hist = t.history(period="1d", interval="1m")
-                    if not hist.empty:
-                        price = float(hist["Close"].dropna().iloc[-1])
-
+            for tkr, qty, _ in positions:
+                price = prices.get(tkr)
                 if price is not None:
                     total += float(price) * qty
                 # else: skip ticker with no price available
@@ -289,67 +513,21 @@ class DatabaseService:
         except Exception as e:
             print(e)
             return None
-        finally:
-            conn.close()
 
-# Returns the portfolio's total profit (current value - cost basis).
+    # Returns the portfolio's total profit (current value - cost basis).
     def get_portfolio_profit(self, portfolio_id: int) -> float | None:
-        conn = self.connect()
-        if conn is None:
-            return None
         try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT
-                    ticker,
-                    quantity,
-                    buy_price
-                FROM
-                    Holdings
-                WHERE
-                    portfolio_id = ?
-            """, (portfolio_id,))
-            rows = cursor.fetchall()
-            if not rows:
+            positions = self._get_positions(portfolio_id)
+            if not positions:
                 return 0.0
 
-            # Sum cost basis across lots; also collect total qty per ticker for live pricing
+            # Fetch current prices in one shot through the shared quote cache
+            prices = self.api_service.get_current_prices([p[0] for p in positions])
             cost_basis = 0.0
-            qty_by_ticker = defaultdict(float)
-            for tkr, qty, buy_price in rows:
-                if not tkr:
-                    continue
-                tkr = tkr.upper().strip()
-                q = float(qty or 0)
-                bp = float(buy_price or 0)
-                if q <= 0:
-                    continue
-                cost_basis += q * bp
-                qty_by_ticker[tkr] += q
-
-            if not qty_by_ticker:
-                return 0.0
-
-            # Fetch current prices in one shot
-            ts = yf.Tickers(" ".join(qty_by_ticker.keys()))
             current_value = 0.0
-            for tkr, q in qty_by_ticker.items():
-                t = ts.tickers[tkr]
-                price = None
-
-                fi = getattr(t, "fast_info", None)
-                if fi:
-                    price = fi.get("last_price")
-
-                if price is None:
-                    info = getattr(t, "info", {})
-                    price = info.get("regularMarketPrice")
-
-                if price is None:
-                    hist = t.history(period="1d", interval="1m")
-                    if not hist.empty:
-                        price = float(hist["Close"].dropna().iloc[-1])
-
+            for tkr, q, cost in positions:
+                cost_basis += cost
+                price = prices.get(tkr)
                 if price is not None:
                     current_value += float(price) * q
 
@@ -358,25 +536,157 @@ class DatabaseService:
         except Exception as e:
             print(e)
             return None
-        finally:
-            conn.close()
 
-    # In your DatabaseService
+    # Retrieves the average buy price of a ticker in a portfolio.
     def get_avg_buy_price(self, portfolio_id: int, ticker: str) -> float | None:
         conn = self.connect()
         if conn is None:
             return None
         try:
             cur = conn.cursor()
-            cur.execute("""
-                SELECT
-                    CASE WHEN SUM(quantity) = 0 THEN NULL
-                        ELSE SUM(quantity * buy_price) / SUM(quantity)
-                    END AS avg_buy_price
-                FROM Holdings
-                WHERE portfolio_id = ? AND UPPER(ticker) = UPPER(?)
-            """, (portfolio_id, ticker))
+            cur.execute(self.HOT_QUERIES["position"][0], (portfolio_id, ticker.strip().upper()))
             row = cur.fetchone()
-            return float(row[0]) if row and row[0] is not None else None
+            return float(row[1]) if row and row[1] is not None else None
         finally:
             conn.close()
+
+    # Retrieves a portfolio's open positions as [{"ticker", "quantity", "cost_basis", "avg_buy_price"}, ...].
+    def get_positions(self, portfolio_id: int) -> list[dict] | None:
+        try:
+            return [
+                {"ticker": ticker, "quantity": quantity, "cost_basis": cost_basis, "avg_buy_price": cost_basis / quantity}
+                for ticker, quantity, cost_basis in self._get_positions(portfolio_id)
+            ]
+        except Exception as e:
+            print("Error retrieving positions:", e)
+            return None
+
+    # Helper method that reads a portfolio's open positions as [(ticker, quantity, cost_basis), ...].
+    def _get_positions(self, portfolio_id: int) -> list[tuple[str, float, float]]:
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(self.HOT_QUERIES["positions"][0], (portfolio_id,))
+            rows = cursor.fetchall()
+            cursor.close()
+        return [(r[0], float(r[1]), float(r[2] or 0)) for r in rows]
+
+    # Helper method that adds quantity shares costing cost in total to a position (negative values
+    # reduce it). Runs on the caller's cursor so it commits or rolls back with the lot it belongs to.
+    def _apply_position(self, cursor, portfolio_id: int, ticker: str, quantity: float, cost: float, updated_at: str):
+        cursor.execute("""
+            UPDATE Positions
+            SET total_qty = total_qty + ?,
+                cost_basis = cost_basis + ?,
+                avg_price = CASE WHEN total_qty + ? > 0 THEN (cost_basis + ?) / (total_qty + ?) END,
+                updated_at = ?
+            WHERE portfolio_id = ? AND ticker = ?
+        """, (quantity, cost, quantity, cost, quantity, updated_at, portfolio_id, ticker))
+        if cursor.rowcount == 0:
+            # A batch that bought and sold a whole position nets to nothing.
+            if quantity > 1e-9:
+                cursor.execute(
+                    "INSERT INTO Positions (portfolio_id, ticker, total_qty, cost_basis, avg_price, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (portfolio_id, ticker, quantity, cost, cost / quantity, updated_at),
+                )
+        elif quantity < 0:
+            # Fully sold positions are removed (with room for floating-point leftovers).
+            cursor.execute("DELETE FROM Positions WHERE portfolio_id = ? AND ticker = ? AND total_qty < 1e-9", (portfolio_id, ticker))
+
+    # Retrieves the distinct (upper-case) tickers of a portfolio: every ticker it has lots of, or with
+    # open_only only those of its open positions.
+    def get_distinct_tickers(self, portfolio_id: int, open_only: bool = False) -> list[str]:
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                if open_only:
+                    cursor.execute("SELECT ticker FROM Positions WHERE portfolio_id = ? AND total_qty > 0", (portfolio_id,))
+                else:
+                    cursor.execute("""
+                        SELECT DISTINCT ticker_norm
+                        FROM Holdings
+                        WHERE portfolio_id = ?
+                    """, (portfolio_id,))
+                rows = cursor.fetchall()
+                cursor.close()
+            return [row[0] for row in rows if row[0]]
+        except Exception as e:
+            print("Error retrieving tickers:", e)
+            return []
+
+    # Yields a portfolio's lots, oldest first, as lists of up to chunk_size dicts
+    # ({"id", "ticker", "quantity", "buy_price", "date_added"}).
+    def stream_lots(self, portfolio_id: int, chunk_size: int = 1000):
+        yield from self._stream("""
+            SELECT id, ticker_norm AS ticker, quantity, buy_price, date_added
+            FROM Holdings
+            WHERE portfolio_id = ?
+            ORDER BY date_added, id
+        """, (portfolio_id,), chunk_size)
+
+    # Yields a portfolio's open positions per ticker as lists of up to chunk_size dicts
+    # ({"ticker", "quantity", "cost_basis", "lots", "first_bought", "last_bought"}). Sales are negative
+    # lots at average cost, so the sums match the Positions table; lots and dates count buys only.
+    # Fully sold tickers are left out, with the same tolerance as Positions.
+    def stream_positions(self, portfolio_id: int, chunk_size: int = 1000):
+        yield from self._stream("""
+            SELECT
+                ticker_norm AS ticker,
+                SUM(quantity) AS quantity,
+                SUM(quantity * buy_price) AS cost_basis,
+                COUNT(CASE WHEN quantity > 0 THEN 1 END) AS lots,
+                MIN(CASE WHEN quantity > 0 THEN date_added END) AS first_bought,
+                MAX(CASE WHEN quantity > 0 THEN date_added END) AS last_bought
+            FROM Holdings
+            WHERE portfolio_id = ?
+            GROUP BY ticker_norm
+            HAVING SUM(quantity) >= 1e-9
+            ORDER BY ticker_norm
+        """, (portfolio_id,), chunk_size)
+
+    # Helper method that runs a query and yields its rows in chunks fetched with fetchmany(),
+    # so only one chunk is in memory. The connection is held until the generator is exhausted or closed.
+    def _stream(self, query: str, params: tuple, chunk_size: int):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                columns = [column[0] for column in cursor.description]
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield [dict(zip(columns, row)) for row in rows]
+            finally:
+                cursor.close()
+
+    # Retrieves the portfolio id and per-ticker positions for a user in a single query.
+    # Returns {"portfolio_id": int, "positions": [{"ticker", "quantity", "cost_basis", "avg_buy_price"}, ...]}.
+    def get_portfolio_snapshot(self, email: str) -> dict | None:
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(self.HOT_QUERIES["portfolio_snapshot"][0], (email,))
+                rows = cursor.fetchall()
+                cursor.close()
+
+            if not rows:
+                return None
+
+            # A portfolio without positions still returns one row with a NULL ticker.
+            positions = []
+            for portfolio_id, ticker, quantity, cost_basis in rows:
+                quantity = float(quantity or 0)
+                if not ticker or quantity <= 0:
+                    continue
+                cost_basis = float(cost_basis or 0)
+                positions.append({
+                    "ticker": ticker,
+                    "quantity": quantity,
+                    "cost_basis": cost_basis,
+                    "avg_buy_price": cost_basis / quantity,
+                })
+
+            return {"portfolio_id": rows[0][0], "positions": positions}
+        except Exception as e:
+            print("Error retrieving portfolio snapshot:", e)
+            return None
@@ -0,0 +1,86 @@
+#
+# Author: Robert Patel
+# Downsampling used to draw long series at the resolution of the screen.
+# lttb keeps the shape of a line (Largest-Triangle-Three-Buckets, Steinarsson
+# 2013) and bucket_max keeps the peaks of bar series such as volume. Both work
+# on full-resolution arrays, so a chart can re-run them on every zoom or pan.
+#
+
+import numpy as np
+
+
+# Returns the indices of threshold points of y (1-D, or one series per row) chosen by LTTB over x.
+# The first and last points are always kept; every bucket in between contributes the point that forms
+# the largest triangle with the point kept before it and the average of the next bucket. All rows are
+# processed together, each bucket in one vectorized step. Returns every index if y is short enough.
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    rows = y.reshape(-1, y.shape[-1])
+    count = rows.shape[1]
+    if np.isnan(rows).any():
+        # Gaps (e.g. an indicator's warm-up) take the nearest value so they never win a bucket.
+        rows = _fill_gaps(rows)
+    if threshold >= count or threshold < 3:
+        indices = np.arange(count)
+        return indices if y.ndim == 1 else np.broadcast_to(indices, rows.shape).copy()
+
+    # threshold - 2 buckets of (almost) equal size over the points between the first and the last.
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    # Average of the following bucket, the last point for the final bucket.
+    next_x = np.append(np.add.reduceat(x[:count - 1], edges[:-1])[1:] / sizes[1:], x[-1])
+    next_y = np.column_stack((np.add.reduceat(rows[:, :count - 1], edges[:-1], axis=1)[:, 1:] / sizes[1:], rows[:, -1]))
+
+    selected = np.empty((len(rows), threshold), dtype=np.int64)
+    selected[:, 0] = 0
+    selected[:, -1] = count - 1
+    lines = np.arange(len(rows))
+    anchor = np.zeros(len(rows), dtype=np.int64)
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        anchor_x, anchor_y = x[anchor], rows[lines, anchor]
+        # Twice the triangle area is |alpha * y + beta * x - gamma| for the bucket's points.
+        alpha = anchor_x - next_x[bucket]
+        beta = next_y[:, bucket] - anchor_y
+        area = rows[:, start:end] * alpha[:, None]
+        area += beta[:, None] * x[start:end]
+        area -= (alpha * anchor_y + beta * anchor_x)[:, None]
+        anchor = start + np.abs(area, out=area).argmax(axis=1)
+        selected[:, bucket + 1] = anchor
+    return selected[0] if y.ndim == 1 else selected
+
+
+# Helper function that replaces NaNs with the previous value, or the next one at the start of a row.
+def _fill_gaps(rows: np.ndarray) -> np.ndarray:
+    rows = rows.copy()
+    for row in rows:
+        missing = np.isnan(row)
+        gaps = np.count_nonzero(missing)
+        if gaps == 0:
+            continue
+        if gaps == len(row):
+            row[:] = 0.0
+            continue
+        first = int(missing.argmin())
+        if gaps == first:
+            # Only a leading warm-up is missing.
+            row[:first] = row[first]
+            continue
+        positions = np.where(missing, 0, np.arange(len(row)))
+        np.maximum.accumulate(positions, out=positions)
+        row[:] = row[np.maximum(positions, first)]
+    return rows
+
+
+# Splits values into count equal buckets and returns (index of each bucket's maximum, that maximum).
+def bucket_max(values: np.ndarray, count: int) -> tuple[np.ndarray, np.ndarray]:
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64))
+    if count >= len(values) or count < 1:
+        return np.arange(len(values)), values
+    edges = np.linspace(0, len(values), count + 1).astype(np.int64)[:-1]
+    maxima = np.maximum.reduceat(values, edges)
+    # Position of the maximum: the first bar of its bucket that reaches it.
+    hits = np.flatnonzero(values == np.repeat(maxima, np.diff(np.append(edges, len(values)))))
+    first = hits[np.searchsorted(hits, edges)]
+    return first, maxima
@@ -0,0 +1,134 @@
+#
+# Author: Robert Patel
+# This class writes tabular exports (CSV, JSON Lines, Parquet) one chunk of
+# rows at a time, so an export never holds more than one chunk in memory.
+# Files are written next to their destination and moved into place when complete.
+#
+
+import csv
+import json
+import os
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+
+
+# Writes chunks of rows as CSV with a header line.
+class CsvChunkWriter:
+
+    # Constructs a new writer on an open text file.
+    def __init__(self, f, columns: list[str]):
+        self.writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        self.writer.writeheader()
+
+    # Writes a chunk of rows.
+    def write_rows(self, rows: list[dict]):
+        self.writer.writerows(rows)
+
+    # Finishes the file.
+    def close(self):
+        pass
+
+
+# Writes chunks of rows as one JSON object per line.
+class JsonLinesChunkWriter:
+
+    # Constructs a new writer on an open text file.
+    def __init__(self, f, columns: list[str]):
+        self.f = f
+        self.columns = columns
+
+    # Writes a chunk of rows.
+    def write_rows(self, rows: list[dict]):
+        self.f.write("".join(
+            json.dumps({c: row.get(c) for c in self.columns}, default=_to_json) + "\n" for row in rows
+        ))
+
+    # Finishes the file.
+    def close(self):
+        pass
+
+
+# Writes each chunk of rows as one Parquet row group (requires pyarrow).
+class ParquetChunkWriter:
+
+    # Constructs a new writer; the schema is taken from the first chunk.
+    def __init__(self, path: str, columns: list[str]):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise RuntimeError("Parquet export requires the 'pyarrow' package.") from e
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.path = path
+        self.columns = columns
+        self.writer = None
+
+    # Writes a chunk of rows.
+    def write_rows(self, rows: list[dict]):
+        if not rows:
+            return
+        table = self.pa.Table.from_pydict({c: [row.get(c) for row in rows] for c in self.columns},
+                                          schema=self.writer.schema if self.writer is not None else None)
+        if self.writer is None:
+            # Columns that are empty in the first chunk (e.g. no quote yet) are stored as float64.
+            schema = self.pa.schema([
+                field.with_type(self.pa.float64()) if self.pa.types.is_null(field.type) else field
+                for field in table.schema
+            ])
+            table = table.cast(schema)
+            self.writer = self.pq.ParquetWriter(self.path, schema)
+        self.writer.write_table(table)
+
+    # Finishes the file (an export without rows still gets an empty file with the columns).
+    def close(self):
+        if self.writer is None:
+            empty = self.pa.Table.from_pydict({c: self.pa.array([], type=self.pa.string()) for c in self.columns})
+            self.writer = self.pq.ParquetWriter(self.path, empty.schema)
+        self.writer.close()
+
+
+class FileService:
+
+    # File extension -> export format.
+    FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+
+    # Returns the export format for a path, from file_format or the file extension.
+    def get_format(self, path: str, file_format: str | None = None) -> str:
+        file_format = (file_format or self.FORMATS.get(os.path.splitext(path)[1].lower(), "")).lower()
+        if file_format not in self.FORMATS.values():
+            raise ValueError(f"Unsupported export format for '{path}'. Use CSV, JSON Lines or Parquet.")
+        return file_format
+
+    # Opens a chunk writer for path. The file only appears once the with-block completes.
+    @contextmanager
+    def open_writer(self, path: str, columns: list[str], file_format: str | None = None):
+        file_format = self.get_format(path, file_format)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".part"
+
+        try:
+            if file_format == "parquet":
+                writer = ParquetChunkWriter(tmp_path, columns)
+                yield writer
+                writer.close()
+            else:
+                with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+                    writer = CsvChunkWriter(f, columns) if file_format == "csv" else JsonLinesChunkWriter(f, columns)
+                    yield writer
+                    writer.close()
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+# Helper function that converts database values json cannot encode.
+def _to_json(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
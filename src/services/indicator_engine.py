@@ -0,0 +1,248 @@
+#
+# Author: Robert Patel
+# This class computes every technical indicator used by the analysis and
+# dashboard screens in a single NumPy pass over an OHLCV frame (the kernels of
+# panel_indicators) and memoizes the result.
+#
+
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from services import panel_indicators as pi
+
+
+# Read-only set of indicator series computed from one OHLCV frame.
+class IndicatorSet:
+
+    # Series each signal reads. A signal is undefined while any of them has no value yet.
+    SIGNAL_SERIES = {
+        "is_golden_cross": ("SMA_50", "SMA_200"),
+        "is_price_over_200_ema": ("EMA_200",),
+        "get_rsi_strength": ("RSI",),
+        "is_rsi_oversold": ("RSI",),
+        "is_adx_strong": ("ADX",),
+        "pullback_opportunity": ("EMA_200", "RSI"),
+        "volume_spike": ("VOLUME_SMA_20",),
+    }
+
+    # Constructs a new indicator set. Arrays are made read-only so no caller can mutate them.
+    def __init__(self, series: dict[str, np.ndarray], close: np.ndarray, volume: np.ndarray, high_volume_threshold: float):
+        for values in series.values():
+            values.flags.writeable = False
+        close.flags.writeable = False
+        volume.flags.writeable = False
+        self._series = series
+        self._close = close
+        self._volume = volume
+        self._high_volume_threshold = high_volume_threshold
+
+    # Gets the full series for an indicator name, e.g. "EMA_200" or "RSI".
+    def get_series(self, name: str) -> np.ndarray:
+        return self._series[name]
+
+    # Gets the names of every computed series.
+    def get_names(self) -> list[str]:
+        return list(self._series)
+
+    # Gets the number of bars the set was computed from.
+    def get_length(self) -> int:
+        return len(self._close)
+
+    # Gets the latest non-NaN value of a series, or None if it has none.
+    def latest(self, name: str) -> float | None:
+        values = self._series.get(name)
+        if values is None:
+            return None
+        valid = values[~np.isnan(values)]
+        return float(valid[-1]) if len(valid) else None
+
+    # Returns False while a signal (e.g. "is_golden_cross" with fewer than 200 bars) has no value to read.
+    def is_defined(self, signal: str) -> bool:
+        return all(self.latest(name) is not None for name in self.SIGNAL_SERIES.get(signal, ()))
+
+    # Gets the latest close.
+    def latest_close(self) -> float:
+        return float(self._close[-1])
+
+    # Returns true if a golden_cross is present, false otherwise.
+    def is_golden_cross(self) -> bool:
+        sma50 = self._series["SMA_50"][-1]
+        sma200 = self._series["SMA_200"][-1]
+        if np.isnan(sma50) or np.isnan(sma200):
+            return False
+        return bool(sma50 > sma200)
+
+    # Returns short-term momentum signal: "Bullish", "Bearish", or "Neutral"
+    def get_short_momentum(self) -> str:
+        if len(self._close) < 20:
+            return "N/A"
+        ema_10 = self._series["MOMENTUM_EMA_10"][-1]
+        ema_20 = self._series["MOMENTUM_EMA_20"][-1]
+        if ema_10 > ema_20:
+            return "Bullish"
+        elif ema_10 < ema_20:
+            return "Bearish"
+        return "Neutral"
+
+    # Returns True if the current price is above the 200 EMA, False otherwise
+    def is_price_over_200_ema(self) -> bool:
+        ema_200 = self.latest("EMA_200")
+        if ema_200 is None:
+            return False
+        return self.latest_close() > ema_200
+
+    # Returns True if RSI is strong, False otherwise.
+    def get_rsi_strength(self, threshold: float = 70) -> bool:
+        rsi = self.latest("RSI")
+        return rsi is not None and rsi >= threshold
+
+    # Returns True is RSI is oversold, False otherise.
+    def is_rsi_oversold(self, threshold: float = 30) -> bool:
+        rsi = self.latest("RSI")
+        return rsi is not None and rsi <= threshold
+
+    # Returns True if ADX is above 25 (strong trend)
+    def is_adx_strong(self) -> bool:
+        adx = self.latest("ADX")
+        return adx is not None and adx > 25
+
+    # Detects if current price is in a pullback during an uptrend
+    def pullback_opportunity(self, current_price: float | None) -> bool:
+        ema_200 = self.latest("EMA_200")
+        rsi = self.latest("RSI")
+        if current_price is None or ema_200 is None or rsi is None:
+            return False
+        return current_price > ema_200 and 40 <= rsi <= 50
+
+    # Detects if current volume is significantly higher than recent average
+    def volume_spike(self, multiplier: float = 1.5) -> bool:
+        if len(self._volume) < 20:
+            return False
+        avg_volume = self._series["VOLUME_SMA_20"][-1]
+        current_volume = self._volume[-1]
+        if np.isnan(avg_volume) or np.isnan(current_volume):
+            return False
+        return bool(current_volume > avg_volume * multiplier)
+
+    # Checks if the current volume is in the top (1 - percentile) of the frame, the top 10% by default.
+    def high_volume(self, percentile: float = 0.9) -> bool:
+        if len(self._volume) < 20:
+            return False
+        threshold = self._high_volume_threshold
+        if percentile != 0.9:
+            threshold = _percentile(self._volume, percentile)
+        current_volume = self._volume[-1]
+        if np.isnan(threshold) or np.isnan(current_volume):
+            return False
+        return bool(current_volume >= threshold)
+
+    # Combines the signals into "Buy", "Hold" or "Sell". Trend, momentum and RSI vote +1 or -1;
+    # a strong ADX doubles the trend votes. Undefined trend signals do not vote. Two net votes either way make a call.
+    def get_recommendation(self, current_price: float | None = None) -> str:
+        if current_price is None:
+            current_price = self.latest_close()
+        trend = 0
+        if self.is_defined("is_golden_cross"):
+            trend += 1 if self.is_golden_cross() else -1
+        if self.is_defined("is_price_over_200_ema"):
+            trend += 1 if self.is_price_over_200_ema() else -1
+        if self.is_adx_strong():
+            trend *= 2
+        momentum = {"Bullish": 1, "Bearish": -1}.get(self.get_short_momentum(), 0)
+        score = trend + momentum
+        if self.pullback_opportunity(current_price):
+            score += 1
+        if self.is_rsi_oversold():
+            score += 1
+        elif self.get_rsi_strength():
+            score -= 1
+        if score >= 2:
+            return "Buy"
+        if score <= -2:
+            return "Sell"
+        return "Hold"
+
+
+# Computes IndicatorSets and memoizes them on (ticker, interval, last bar and its values).
+class IndicatorEngine:
+
+    EMA_LENGTHS = (10, 34, 50, 200)
+    SMA_LENGTHS = (20, 50, 100, 200)
+
+    # Constructs a new engine keeping at most max_entries results.
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Returns the indicator set for price_data. Results are memoized when a ticker is given.
+    def compute(self, price_data: pd.DataFrame, ticker: str | None = None, interval: str | None = None) -> IndicatorSet:
+        if price_data is None or price_data.empty:
+            raise ValueError("No price data found.")
+        if ticker is None:
+            return self._compute(price_data)
+
+        # The last bar may still be forming: a refresh replaces it in place with new values but the same
+        # timestamp and length, so its values are part of the key.
+        last_bar = price_data.iloc[-1].to_numpy(dtype=np.float64).tobytes()
+        key = (ticker.strip().upper(), interval, price_data.index[-1], len(price_data), last_bar)
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                self.hits += 1
+                return self._memo[key]
+            self.misses += 1
+
+        result = self._compute(price_data)
+        with self._lock:
+            self._memo[key] = result
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return result
+
+    # Drops every memoized result.
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+
+    # Returns the memoization statistics.
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._memo)}
+
+    # Helper method that computes every series once from the frame's columns. Prices are forward-filled
+    # first, as the kernels expect; each kernel matches the pandas_ta indicator of the same name.
+    def _compute(self, price_data: pd.DataFrame) -> IndicatorSet:
+        high, low, close = (pi.ffill(price_data[c].to_numpy(dtype=np.float64)[None, :]) for c in ("High", "Low", "Close"))
+        volume = price_data["Volume"].to_numpy(dtype=np.float64)[None, :]
+        series = {}
+
+        for length in self.EMA_LENGTHS:
+            series[f"EMA_{length}"] = pi.ema(close, length)
+        for length in self.SMA_LENGTHS:
+            series[f"SMA_{length}"] = pi.sma(close, length)
+
+        series["MOMENTUM_EMA_10"] = pi.ewm(close, 10)
+        series["MOMENTUM_EMA_20"] = pi.ewm(close, 20)
+        series["RSI"] = pi.rsi(close, 14)
+        series["RSI_Volume"] = pi.rsi(volume, 14)
+        series["VOLUME_SMA_20"] = pi.sma(volume, 20)
+        series["ADX"] = pi.adx(high, low, close, 14, 10)
+
+        volume = volume[0]
+        return IndicatorSet(
+            {name: values[0] for name, values in series.items()},
+            close[0],
+            volume.copy(),
+            _percentile(volume, 0.9),
+        )
+
+
+# Helper function that returns the percentile of the non-NaN values (as pandas' quantile does), or NaN.
+def _percentile(values: np.ndarray, percentile: float) -> float:
+    if np.isnan(values).all():
+        return np.nan
+    return float(np.nanquantile(values, percentile))
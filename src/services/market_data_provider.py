@@ -0,0 +1,391 @@
+#
+# Author: Robert Patel
+# These classes are the source of every piece of market data in the application.
+# The live provider talks to Yahoo through yfinance, the recording provider saves
+# whatever another provider returns to disk, and the replay provider serves those
+# recordings (or seeded synthetic data) without any network access.
+#
+
+import json
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+
+# Interface every market-data provider implements.
+class MarketDataProvider:
+
+    # Retrieves {ticker: {"price", "previous_close"}} for several tickers.
+    def get_quotes(self, tickers: list[str]) -> dict[str, dict]:
+        raise NotImplementedError
+
+    # Retrieves the company information dictionary (same keys as yfinance's .info).
+    def get_info(self, ticker: str) -> dict:
+        raise NotImplementedError
+
+    # Retrieves OHLCV bars with flat Open/High/Low/Close/Volume columns.
+    # Either period (e.g. "3mo") or start (a datetime) selects the range; end (exclusive) bounds a start range.
+    def get_bars(self, ticker: str, interval: str, period: str | None = None, start=None, end=None) -> pd.DataFrame:
+        raise NotImplementedError
+
+    # Retrieves {ticker: bars} for several tickers over the same range. Tickers without data are left out.
+    def get_bars_many(self, tickers: list[str], interval: str, period: str | None = None, start=None, end=None) -> dict[str, pd.DataFrame]:
+        result = {}
+        for ticker in tickers:
+            bars = self.get_bars(ticker, interval, period=period, start=start, end=end)
+            if bars is not None and not bars.empty:
+                result[ticker] = bars
+        return result
+
+
+# Live market data from Yahoo Finance.
+class YFinanceProvider(MarketDataProvider):
+
+    # Constructs a new provider. Tickers the batch download misses are fetched one by one
+    # on at most max_workers threads.
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+
+    # Retrieves quotes for several tickers with one download of their last daily bars.
+    def get_quotes(self, tickers: list[str]) -> dict[str, dict]:
+        quotes = {}
+        try:
+            quotes = self._download_quotes(tickers)
+        except Exception as e:
+            print("Batch quote download failed:", e)
+
+        missing = [t for t in tickers if quotes.get(t, {}).get("price") is None]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as pool:
+                for ticker, quote in zip(missing, pool.map(self._fetch_quote, missing)):
+                    quotes[ticker] = quote
+        return quotes
+
+    # Helper method that reads price and previous close for every ticker from one yf.download call.
+    # The last daily close is the current price while the market is open.
+    def _download_quotes(self, tickers: list[str]) -> dict[str, dict]:
+        data = yf.download(tickers, period="5d", interval="1d", auto_adjust=False, group_by="column",
+                           progress=False, threads=True)
+        if data is None or data.empty:
+            return {}
+        close = data["Close"]
+        if isinstance(close, pd.Series):
+            close = close.to_frame(tickers[0])
+
+        quotes = {}
+        for ticker in tickers:
+            if ticker not in close.columns:
+                continue
+            series = close[ticker].dropna()
+            if series.empty:
+                continue
+            quotes[ticker] = {
+                "price": float(series.iloc[-1]),
+                "previous_close": float(series.iloc[-2]) if len(series) > 1 else None,
+            }
+        return quotes
+
+    # Helper method that fetches one quote through fast_info, .info and intraday history, in that order.
+    def _fetch_quote(self, ticker: str) -> dict:
+        price = None
+        previous_close = None
+        try:
+            t = yf.Ticker(ticker)
+
+            # Fast path
+            fi = getattr(t, "fast_info", None)
+            if fi:
+                price = fi.get("last_price")
+                previous_close = fi.get("previous_close")
+
+            # Fallbacks
+            if price is None:
+                info = getattr(t, "info", {}) or {}
+                price = info.get("regularMarketPrice")
+                previous_close = previous_close or info.get("regularMarketPreviousClose")
+
+            if price is None:
+                hist = t.history(period="1d", interval="1m")
+                if not hist.empty:
+                    price = float(hist["Close"].dropna().iloc[-1])
+        except Exception as e:
+            print(f"Quote fetch failed for {ticker}:", e)
+
+        return {
+            "price": float(price) if price is not None else None,
+            "previous_close": float(previous_close) if previous_close is not None else None,
+        }
+
+    # Retrieves the company information dictionary.
+    def get_info(self, ticker: str) -> dict:
+        return yf.Ticker(ticker).info or {}
+
+    # Retrieves OHLCV bars and flattens yfinance's column MultiIndex.
+    def get_bars(self, ticker: str, interval: str, period: str | None = None, start=None, end=None) -> pd.DataFrame:
+        kwargs = {"start": start, "end": end} if start is not None else {"period": period or "3mo"}
+        price_data = yf.download(ticker, interval=interval, auto_adjust=True, progress=False, **kwargs)
+
+        # Flatten MultiIndex if needed
+        if isinstance(price_data.columns, pd.MultiIndex):
+            price_data.columns = price_data.columns.get_level_values(0)
+
+        return price_data
+
+    # Retrieves bars for several tickers with one yf.download call (grouped by ticker).
+    def get_bars_many(self, tickers: list[str], interval: str, period: str | None = None, start=None, end=None) -> dict[str, pd.DataFrame]:
+        if len(tickers) == 1:
+            return super().get_bars_many(tickers, interval, period=period, start=start, end=end)
+        kwargs = {"start": start, "end": end} if start is not None else {"period": period or "3mo"}
+        data = yf.download(tickers, interval=interval, auto_adjust=True, progress=False,
+                           group_by="ticker", threads=True, **kwargs)
+        result = {}
+        if data is None or data.empty or not isinstance(data.columns, pd.MultiIndex):
+            return result
+        for ticker in tickers:
+            if ticker not in data.columns.get_level_values(0):
+                continue
+            bars = data[ticker].dropna(how="all")
+            if not bars.empty:
+                result[ticker] = bars
+        return result
+
+
+# Wraps another provider and saves every response under record_dir for later replay.
+class RecordingProvider(MarketDataProvider):
+
+    # Constructs a new recording proxy.
+    def __init__(self, provider: MarketDataProvider, record_dir: str):
+        self.provider = provider
+        self.record_dir = record_dir
+        for sub in ("quotes", "info", "bars"):
+            os.makedirs(os.path.join(record_dir, sub), exist_ok=True)
+
+    # Retrieves and records quotes.
+    def get_quotes(self, tickers: list[str]) -> dict[str, dict]:
+        quotes = self.provider.get_quotes(tickers)
+        for ticker, quote in quotes.items():
+            _write_json(os.path.join(self.record_dir, "quotes", f"{ticker}.json"), quote)
+        return quotes
+
+    # Retrieves and records company information.
+    def get_info(self, ticker: str) -> dict:
+        info = self.provider.get_info(ticker)
+        _write_json(os.path.join(self.record_dir, "info", f"{ticker}.json"), info)
+        return info
+
+    # Retrieves bars and merges them into the recording for (ticker, interval).
+    def get_bars(self, ticker: str, interval: str, period: str | None = None, start=None, end=None) -> pd.DataFrame:
+        bars = self.provider.get_bars(ticker, interval, period=period, start=start, end=end)
+        self._record_bars(ticker, interval, bars)
+        return bars
+
+    # Retrieves bars for several tickers through the wrapped provider's batch call and records each.
+    def get_bars_many(self, tickers: list[str], interval: str, period: str | None = None, start=None, end=None) -> dict[str, pd.DataFrame]:
+        result = self.provider.get_bars_many(tickers, interval, period=period, start=start, end=end)
+        for ticker, bars in result.items():
+            self._record_bars(ticker, interval, bars)
+        return result
+
+    # Helper method that merges bars into the recording for (ticker, interval).
+    def _record_bars(self, ticker: str, interval: str, bars: pd.DataFrame):
+        if bars is None or bars.empty:
+            return
+        path = os.path.join(self.record_dir, "bars", f"{ticker}_{interval}.npz")
+        recorded = _read_bars(path)
+        if recorded is not None:
+            merged = pd.concat([recorded, bars.tz_convert(recorded.index.tz) if bars.index.tz is not None else bars])
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        else:
+            merged = bars
+        _write_bars(path, merged)
+
+
+# Serves recordings from record_dir without network access. Tickers that were never
+# recorded get seeded synthetic data (unless synthesize is False), so the same
+# ticker and seed always produce the same bars, quotes and fundamentals.
+class ReplayProvider(MarketDataProvider):
+
+    # How far back synthetic bars reach for each interval.
+    LOOKBACK = {"1m": "7D", "5m": "60D", "15m": "60D", "30m": "60D", "1h": "730D", "1d": "3650D", "1wk": "7300D"}
+
+    # Constructs a new replay provider. end is the timestamp of the newest synthetic bar.
+    def __init__(self, record_dir: str | None = None, synthesize: bool = True, seed: int = 0,
+                 end: str = "2025-06-30 16:00"):
+        self.record_dir = record_dir
+        self.synthesize = synthesize
+        self.seed = seed
+        self.end = pd.Timestamp(end, tz="America/New_York")
+        # interval -> trading calendar; identical for every ticker so it is built once.
+        self._indexes = {}
+
+    # Retrieves recorded or synthetic quotes.
+    def get_quotes(self, tickers: list[str]) -> dict[str, dict]:
+        quotes = {}
+        for ticker in tickers:
+            quote = self._recorded_json("quotes", ticker)
+            if quote is None and self.synthesize:
+                daily = self._synthetic_bars(ticker, "1d")
+                quote = {"price": float(daily["Close"].iloc[-1]), "previous_close": float(daily["Close"].iloc[-2])}
+            quotes[ticker] = quote or {"price": None, "previous_close": None}
+        return quotes
+
+    # Retrieves recorded or synthetic company information.
+    def get_info(self, ticker: str) -> dict:
+        info = self._recorded_json("info", ticker)
+        if info is not None or not self.synthesize:
+            return info or {}
+
+        rng = self._rng(ticker, "info")
+        price = self.get_quotes([ticker])[ticker]["price"]
+        pe_ratio = float(rng.uniform(8, 45))
+        dividend_rate = float(round(price * rng.uniform(0, 0.04), 2)) if rng.random() < 0.6 else None
+        return {
+            "shortName": f"{ticker} Synthetic Inc.",
+            "currentPrice": price,
+            "regularMarketPrice": price,
+            "marketCap": float(price * rng.integers(50_000_000, 5_000_000_000)),
+            "trailingPE": pe_ratio,
+            "trailingEps": price / pe_ratio,
+            "trailingAnnualDividendRate": dividend_rate,
+            "dividendYield": dividend_rate / price if dividend_rate else None,
+        }
+
+    # Retrieves recorded or synthetic bars for the requested range.
+    def get_bars(self, ticker: str, interval: str, period: str | None = None, start=None, end=None) -> pd.DataFrame:
+        bars = _read_bars(os.path.join(self.record_dir, "bars", f"{ticker}_{interval}.npz")) if self.record_dir else None
+        if bars is None:
+            if not self.synthesize:
+                return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])
+            bars = self._synthetic_bars(ticker, interval)
+
+        if start is not None:
+            start = self._as_bar_time(start, bars.index)
+            if end is not None:
+                return bars[(bars.index >= start) & (bars.index < self._as_bar_time(end, bars.index))]
+            return bars[bars.index >= start]
+        if period and period != "max":
+            return bars[bars.index >= bars.index[-1] - period_offset(period)]
+        return bars
+
+    # Helper method that converts a datetime into a timestamp comparable with index.
+    @staticmethod
+    def _as_bar_time(value, index: pd.DatetimeIndex) -> pd.Timestamp:
+        value = pd.Timestamp(value)
+        return value.tz_localize(index.tz) if value.tzinfo is None else value
+
+    # Helper method that reads a recorded JSON response, or None.
+    def _recorded_json(self, kind: str, ticker: str) -> dict | None:
+        if not self.record_dir:
+            return None
+        try:
+            with open(os.path.join(self.record_dir, kind, f"{ticker}.json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # Helper method that returns a random generator seeded by (seed, ticker, purpose).
+    def _rng(self, ticker: str, purpose: str) -> np.random.Generator:
+        return np.random.default_rng(zlib.crc32(f"{self.seed}:{ticker}:{purpose}".encode()))
+
+    # Helper method that generates a seeded random-walk OHLCV frame on the exchange calendar.
+    def _synthetic_bars(self, ticker: str, interval: str) -> pd.DataFrame:
+        if interval not in self._indexes:
+            self._indexes[interval] = _trading_index(self.end - pd.Timedelta(self.LOOKBACK.get(interval, "730D")), self.end, interval)
+        index = self._indexes[interval]
+        rng = self._rng(ticker, interval)
+        count = len(index)
+
+        start_price = float(rng.uniform(10, 500))
+        volatility = float(rng.uniform(0.002, 0.02))
+        drift = float(rng.normal(0.0001, 0.0003))
+        close = start_price * np.exp(np.cumsum(rng.normal(drift, volatility, count)))
+        open_ = np.concatenate(([start_price], close[:-1]))
+        wick = np.abs(rng.normal(0, volatility / 2, count)) * close
+        volume = rng.lognormal(np.log(rng.uniform(1e5, 5e6)), 0.5, count).round()
+
+        return pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) + wick,
+            "Low": np.minimum(open_, close) - wick,
+            "Close": close,
+            "Volume": volume,
+        }, index=index)
+
+
+# Builds a provider from a spec: "live", "synthetic", "record:<dir>" or "replay:<dir>".
+def create_provider(spec: str | None = None) -> MarketDataProvider:
+    spec = spec or "live"
+    kind, _, path = spec.partition(":")
+    if kind == "live":
+        return YFinanceProvider()
+    if kind == "synthetic":
+        return ReplayProvider()
+    if kind == "record" and path:
+        return RecordingProvider(YFinanceProvider(), path)
+    if kind == "replay" and path:
+        return ReplayProvider(path)
+    raise ValueError(f"Unknown market data provider '{spec}'.")
+
+
+# Converts a yfinance period ("5d", "3mo", "1y") into an offset.
+def period_offset(period: str) -> pd.DateOffset:
+    number = int("".join(c for c in period if c.isdigit()) or 1)
+    unit = period.lstrip("0123456789")
+    if unit == "d":
+        return pd.DateOffset(days=number)
+    if unit == "wk":
+        return pd.DateOffset(weeks=number)
+    if unit == "mo":
+        return pd.DateOffset(months=number)
+    if unit == "y":
+        return pd.DateOffset(years=number)
+    raise ValueError(f"Unsupported period '{period}'.")
+
+
+# Helper function that builds bar timestamps for regular US trading hours.
+def _trading_index(start: pd.Timestamp, end: pd.Timestamp, interval: str) -> pd.DatetimeIndex:
+    days = pd.bdate_range(start.normalize().tz_localize(None), end.normalize().tz_localize(None))
+    if interval == "1d":
+        return days.tz_localize(end.tz)
+    if interval == "1wk":
+        return pd.date_range(days[0], days[-1], freq="W-MON").tz_localize(end.tz)
+
+    step = pd.Timedelta(interval.replace("m", "min") if interval.endswith("m") else interval)
+    offsets = pd.timedelta_range(pd.Timedelta(hours=9, minutes=30), pd.Timedelta(hours=16), freq=step)
+    # Bars start every step from the open; the last one may be shorter than step (15:30 for 1h).
+    offsets = offsets[offsets < pd.Timedelta(hours=16)]
+    stamps = (days.values[:, None] + offsets.values[None, :]).ravel()
+    index = pd.DatetimeIndex(stamps).tz_localize(end.tz)
+    return index[index <= end]
+
+
+# Helper function that writes JSON atomically.
+def _write_json(path: str, data):
+    with open(path + ".tmp", "w") as f:
+        json.dump(data, f, default=str)
+    os.replace(path + ".tmp", path)
+
+
+# Helper function that saves bars as UTC nanoseconds, values and the timezone name.
+def _write_bars(path: str, bars: pd.DataFrame):
+    index = bars.index if bars.index.tz is not None else bars.index.tz_localize("UTC")
+    with open(path + ".tmp", "wb") as f:
+        np.savez(
+            f,
+            stamps=index.tz_convert("UTC").tz_localize(None).values.astype("datetime64[ns]").astype(np.int64),
+            values=bars[["Open", "High", "Low", "Close", "Volume"]].to_numpy(dtype=np.float64),
+            tz=np.array(str(index.tz)),
+        )
+    os.replace(path + ".tmp", path)
+
+
+# Helper function that loads bars written by _write_bars, or None.
+def _read_bars(path: str) -> pd.DataFrame | None:
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        index = pd.DatetimeIndex(data["stamps"].astype("datetime64[ns]"), tz="UTC").tz_convert(str(data["tz"]))
+        return pd.DataFrame(data["values"], index=index, columns=["Open", "High", "Low", "Close", "Volume"])
@@ -0,0 +1,209 @@
+#
+# Author: Robert Patel
+# Technical indicators computed for many tickers at once. Every function takes
+# 2-D float arrays shaped (tickers, bars), oldest bar first, and returns arrays
+# of the same shape. Rolling windows are differences of cumulative sums and
+# exponential averages are solved block by block as matrix products, so there
+# is no Python loop over tickers or bars. The results match what pandas_ta
+# computes for each ticker on its own, for series without gaps after their
+# first value (forward-fill a panel first). IndicatorEngine uses them for a
+# single ticker as a one-row panel.
+#
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Bars per block of the exponential-average solver.
+BLOCK = 64
+
+
+# Fills gaps with the previous bar's value. Bars before a ticker's first value stay NaN.
+def ffill(values: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    index = np.where(valid, np.arange(values.shape[1]), 0)
+    np.maximum.accumulate(index, axis=1, out=index)
+    filled = np.take_along_axis(values, index, axis=1)
+    # Rows whose first bars are missing would have picked up column 0; keep them empty.
+    filled[np.cumsum(valid, axis=1) == 0] = np.nan
+    return filled
+
+
+# Index of the first non-NaN bar of every row (the row length when a row is empty).
+def first_valid(values: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    return np.where(valid.any(axis=1), valid.argmax(axis=1), values.shape[1])
+
+
+# Simple moving average over length bars (NaN until a full window is available).
+def sma(values: np.ndarray, length: int) -> np.ndarray:
+    valid = ~np.isnan(values)
+    sums = _window(np.cumsum(np.where(valid, values, 0.0), axis=1), length)
+    counts = _window(np.cumsum(valid, axis=1), length)
+    with np.errstate(invalid="ignore"):
+        return np.where(counts == length, sums / length, np.nan)
+
+
+# Exponential moving average with pandas_ta's seed: the first value is the SMA of the first length bars.
+def ema(values: np.ndarray, length: int) -> np.ndarray:
+    seed_at = first_valid(values) + length - 1
+    seed = np.take_along_axis(sma(values, length), np.minimum(seed_at, values.shape[1] - 1)[:, None], axis=1)[:, 0]
+    bars = np.arange(values.shape[1])
+    seeded = np.where(bars[None, :] > seed_at[:, None], values, np.nan)
+    at_seed = bars[None, :] == seed_at[:, None]
+    seeded[at_seed] = seed[seed_at < values.shape[1]]
+    return ewm(seeded, length)
+
+
+# Exponential moving average without a seed (pandas ewm, adjust=False): starts at the first value.
+def ewm(values: np.ndarray, span: int) -> np.ndarray:
+    alpha = 2.0 / (span + 1)
+    start = first_valid(values)
+    bars = np.arange(values.shape[1])
+    started = bars[None, :] >= start[:, None]
+    weighted = np.where(started, alpha * values, 0.0)
+    # The first value enters with weight 1, every later one with weight alpha.
+    weighted[bars[None, :] == start[:, None]] /= alpha
+    result = _decay(weighted, 1.0 - alpha)
+    result[~started] = np.nan
+    return result
+
+
+# Wilder's moving average as pandas_ta computes it (ewm with alpha 1/length, adjust=True).
+def rma(values: np.ndarray, length: int) -> np.ndarray:
+    valid = ~np.isnan(values)
+    # Weighted mean of the valid values; a missing value still ages the older weights.
+    numerator = _decay(np.where(valid, values, 0.0), 1.0 - 1.0 / length)
+    denominator = _decay(valid.astype(float), 1.0 - 1.0 / length)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result = numerator / denominator
+    result[np.cumsum(valid, axis=1) < length] = np.nan
+    return result
+
+
+# Relative strength index.
+def rsi(close: np.ndarray, length: int = 14) -> np.ndarray:
+    change = np.diff(close, axis=1, prepend=np.nan)
+    gains = rma(np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0)), length)
+    losses = rma(np.where(change < 0, -change, np.where(np.isnan(change), np.nan, 0.0)), length)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100 * gains / (gains + losses)
+
+
+# Average directional index (pandas_ta's ADX_<lensig> column).
+def adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int = 14, lensig: int = 10) -> np.ndarray:
+    previous_close = _shift(close)
+    true_range = np.fmax(np.fmax(np.abs(high - low), np.abs(high - previous_close)), np.abs(previous_close - low))
+    true_range[np.isnan(previous_close)] = np.nan
+    atr = rma(true_range, length)
+
+    up = high - _shift(high)
+    down = _shift(low) - low
+    plus = np.where((up > down) & (up > 0), up, 0.0)
+    minus = np.where((down > up) & (down > 0), down, 0.0)
+    plus[np.isnan(up)] = np.nan
+    minus[np.isnan(down)] = np.nan
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        k = 100 / atr
+        plus_di = k * rma(plus, length)
+        minus_di = k * rma(minus, length)
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    return rma(dx, lensig)
+
+
+# Percentage change over periods bars.
+def pct_change(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return values / _shift(values, periods) - 1
+
+
+# True where a value is at or above the percentile of the last window bars (itself included), as
+# pandas' rolling(window, min_periods).quantile(percentile) with linear interpolation decides it.
+def at_or_above_percentile(values: np.ndarray, window: int, percentile: float, min_periods: int = 1) -> np.ndarray:
+    valid = ~np.isnan(values)
+    counts = _window(np.cumsum(valid, axis=1), window)
+    # A value reaches the interpolated percentile exactly when at most this many values in its window are greater.
+    allowed = counts - 1 - np.ceil(percentile * (counts - 1))
+    candidates = valid & (counts >= min_periods) & ~_below_block_bound(values, window, counts, allowed)
+
+    result = np.zeros(values.shape, dtype=bool)
+    padded = np.concatenate([np.full((values.shape[0], window - 1), np.nan), values], axis=1)
+    windows = sliding_window_view(padded, window, axis=1)
+    rows, bars = np.nonzero(candidates)
+    # Candidates are counted in slices so the gathered windows stay small.
+    step = max(1, (1 << 22) // window)
+    for start in range(0, len(rows), step):
+        r, b = rows[start:start + step], bars[start:start + step]
+        greater = np.count_nonzero(windows[r, b] > values[r, b, None], axis=1)
+        result[r, b] = greater <= allowed[r, b]
+    return result
+
+
+# True on the bars where fast moves from at or below slow to above it.
+def crossed_above(fast: np.ndarray, slow: np.ndarray) -> np.ndarray:
+    above = fast > slow
+    was_above = _shift(fast) > _shift(slow)
+    valid = ~np.isnan(_shift(fast)) & ~np.isnan(_shift(slow))
+    return above & ~was_above & valid
+
+
+# Helper function that solves result[t] = decay * result[t - 1] + values[t] along every row.
+# Each block of bars is one matrix product; the carry from the previous block decays into the next.
+def _decay(values: np.ndarray, decay: float) -> np.ndarray:
+    result = np.empty_like(values, dtype=float)
+    size = max(1, min(BLOCK, values.shape[1]))
+    lags = np.arange(size)[None, :] - np.arange(size)[:, None]
+    weights = np.where(lags >= 0, decay ** np.maximum(lags, 0), 0.0)
+    powers = decay ** np.arange(1, size + 1)
+    carry = np.zeros(values.shape[0])
+    for start in range(0, values.shape[1], size):
+        block = values[:, start:start + size]
+        width = block.shape[1]
+        solved = block @ weights[:width, :width] + carry[:, None] * powers[:width]
+        result[:, start:start + width] = solved
+        carry = solved[:, -1]
+    return result
+
+
+# Helper function that marks values certainly below their window's percentile. The windows of a
+# full, gap-free history contain the whole blocks before the current one; if enough of those
+# values are greater than a bar's value, so is the rest of its window.
+def _below_block_bound(values: np.ndarray, window: int, counts: np.ndarray, allowed: np.ndarray) -> np.ndarray:
+    size = max(1, window // 4)
+    blocks = window // size - 1
+    below = np.zeros(values.shape, dtype=bool)
+    steady = counts == window
+    if blocks < 1 or not steady.any():
+        return below
+    limit = int(allowed[steady].max())
+    if blocks * size <= limit:
+        return below
+
+    usable = values.shape[1] // size * size
+    grouped = values[:, :usable].reshape(values.shape[0], -1, size)
+    if grouped.shape[1] < blocks:
+        return below
+    spans = sliding_window_view(grouped, blocks, axis=1).reshape(values.shape[0], -1, blocks * size)
+    # The (limit + 1)-th largest value of every run of whole blocks.
+    bounds = np.partition(spans, blocks * size - limit - 1, axis=2)[:, :, blocks * size - limit - 1]
+
+    group = np.arange(values.shape[1]) // size - blocks
+    known = (group >= 0) & (group < bounds.shape[1])
+    with np.errstate(invalid="ignore"):
+        below[:, known] = values[:, known] < bounds[:, group[known]]
+    return below & steady
+
+
+# Helper function that turns cumulative sums into sums over the last length bars.
+def _window(sums: np.ndarray, length: int) -> np.ndarray:
+    result = sums.astype(float)
+    result[:, length:] -= sums[:, :-length]
+    return result
+
+
+# Helper function that moves every row periods bars later, filling the start with NaN.
+def _shift(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    shifted = np.full_like(values, np.nan, dtype=float)
+    if periods < values.shape[1]:
+        shifted[:, periods:] = values[:, :-periods]
+    return shifted
@@ -0,0 +1,444 @@
+#
+# Author: Robert Patel
+# These classes time and count every query the application sends to the
+# database. Connections handed out by the DatabaseService are wrapped so that
+# each cursor execute() records its label (the method that ran it), row count,
+# latency and errors, and the time spent waiting for a pooled connection.
+# Queries above a threshold go to the slow-query log, and scopes group the
+# queries of one screen action ("portfolio = 14 queries / 2.3 s").
+#
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+
+# Latency histogram with fixed millisecond buckets.
+class LatencyHistogram:
+
+    # Upper bounds of the buckets in milliseconds; the last bucket is unbounded.
+    BOUNDS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 250, 500, 1000, 5000)
+
+    # Constructs a new, empty histogram.
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.max_ms = 0.0
+
+    # Records one latency in seconds.
+    def record(self, seconds: float):
+        ms = seconds * 1000
+        index = 0
+        while index < len(self.BOUNDS_MS) and ms > self.BOUNDS_MS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.max_ms = max(self.max_ms, ms)
+
+    # Returns the upper bound (ms) of the bucket holding the given percentile (0-100), capped at the
+    # slowest recorded latency so it never exceeds the max (or is infinite in the last bucket).
+    def percentile(self, percent: float) -> float:
+        if not self.count:
+            return 0.0
+        target = self.count * percent / 100
+        seen = 0
+        for bound, count in zip(self.BOUNDS_MS + (float("inf"),), self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    # Returns {"<=1ms": n, ...} for the non-empty buckets.
+    def as_dict(self) -> dict[str, int]:
+        labels = [f"<={b:g}ms" for b in self.BOUNDS_MS] + [f">{self.BOUNDS_MS[-1]:g}ms"]
+        return {label: count for label, count in zip(labels, self.counts) if count}
+
+
+# Counters for every query recorded under one label.
+class QueryStats:
+
+    # Constructs a new, zeroed set of counters.
+    def __init__(self, label: str):
+        self.label = label
+        self.count = 0
+        self.rows = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.last_error = None
+        self.histogram = LatencyHistogram()
+
+    # Returns the counters as a plain dictionary.
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "rows": self.rows,
+            "errors": self.errors,
+            "total_time": round(self.total_time, 6),
+            "avg_time": round(self.total_time / self.count, 6) if self.count else 0.0,
+            "max_time": round(self.max_time, 6),
+            "p50_ms": self.histogram.percentile(50),
+            "p95_ms": self.histogram.percentile(95),
+            "histogram": self.histogram.as_dict(),
+            "last_error": self.last_error,
+        }
+
+
+# Totals of one named scope (e.g. one screen action) over all of its runs.
+class ScopeStats:
+
+    # Constructs a new, zeroed set of counters.
+    def __init__(self, name: str):
+        self.name = name
+        self.runs = 0
+        self.queries = 0
+        self.query_time = 0.0
+        self.acquire_time = 0.0
+        self.errors = 0
+        self.wall_time = 0.0
+        # The most recent run.
+        self.last = None
+
+    # Adds a finished run.
+    def add(self, run: "ScopeRun"):
+        self.runs += 1
+        self.queries += run.queries
+        self.query_time += run.query_time
+        self.acquire_time += run.acquire_time
+        self.errors += run.errors
+        self.wall_time += run.wall_time
+        self.last = run
+
+    # Returns the counters as a plain dictionary.
+    def as_dict(self) -> dict:
+        return {
+            "runs": self.runs,
+            "queries": self.queries,
+            "query_time": round(self.query_time, 6),
+            "acquire_time": round(self.acquire_time, 6),
+            "errors": self.errors,
+            "wall_time": round(self.wall_time, 6),
+            "last": self.last.as_dict() if self.last else None,
+        }
+
+
+# Queries of one run of a scope.
+class ScopeRun:
+
+    # Constructs a new run that starts now.
+    def __init__(self, name: str):
+        self.name = name
+        self.queries = 0
+        self.query_time = 0.0
+        self.acquire_time = 0.0
+        self.errors = 0
+        self.start = time.perf_counter()
+        self.wall_time = 0.0
+
+    # Returns the run as a plain dictionary.
+    def as_dict(self) -> dict:
+        return {
+            "queries": self.queries,
+            "query_time": round(self.query_time, 6),
+            "acquire_time": round(self.acquire_time, 6),
+            "errors": self.errors,
+            "wall_time": round(self.wall_time, 6),
+        }
+
+    # Returns the run as one line, e.g. "portfolio = 14 queries / 2.3 s".
+    def summary(self) -> str:
+        return (f"{self.name} = {self.queries} queries / {self.wall_time:.2f} s "
+                f"(db {self.query_time * 1000:.1f} ms, pool wait {self.acquire_time * 1000:.1f} ms"
+                f"{f', {self.errors} errors' if self.errors else ''})")
+
+
+# Records query timings, row counts and errors for the whole application.
+class QueryMonitor:
+
+    # Constructs a new monitor. Queries slower than slow_threshold seconds are kept in the
+    # slow-query log (the newest slow_log_size entries) and appended to slow_log_path if given.
+    def __init__(self, slow_threshold: float = 0.25, slow_log_size: int = 200, slow_log_path: str | None = None):
+        self.slow_threshold = slow_threshold
+        self.slow_log_path = slow_log_path
+        self._slow = deque(maxlen=slow_log_size)
+        self._stats = {}
+        self._scopes = {}
+        self._acquires = 0
+        self._acquire_time = 0.0
+        self._max_acquire_time = 0.0
+        self._lock = threading.Lock()
+        # Stack of the ScopeRuns open on each thread.
+        self._local = threading.local()
+
+    # Wraps a DB-API connection so that its cursors are timed.
+    def wrap(self, conn) -> "InstrumentedConnection":
+        return InstrumentedConnection(conn, self)
+
+    # Groups every query made on this thread inside the with-block under name.
+    @contextmanager
+    def scope(self, name: str):
+        run = ScopeRun(name)
+        stack = self._get_stack()
+        stack.append(run)
+        try:
+            yield run
+        finally:
+            stack.remove(run)
+            run.wall_time = time.perf_counter() - run.start
+            with self._lock:
+                stats = self._scopes.get(name)
+                if stats is None:
+                    stats = self._scopes[name] = ScopeStats(name)
+                stats.add(run)
+
+    # Records the time spent checking a connection out of the pool.
+    def record_acquire(self, seconds: float):
+        with self._lock:
+            self._acquires += 1
+            self._acquire_time += seconds
+            self._max_acquire_time = max(self._max_acquire_time, seconds)
+        for run in self._get_stack():
+            run.acquire_time += seconds
+
+    # Records one executed statement. rows is the number of rows written (0 for queries;
+    # rows read are added by add_rows as they are fetched).
+    def record(self, label: str, query: str, seconds: float, rows: int = 0, error: Exception | None = None):
+        with self._lock:
+            stats = self._stats.get(label)
+            if stats is None:
+                stats = self._stats[label] = QueryStats(label)
+            stats.count += 1
+            stats.rows += rows
+            stats.total_time += seconds
+            stats.max_time = max(stats.max_time, seconds)
+            stats.histogram.record(seconds)
+            if error is not None:
+                stats.errors += 1
+                stats.last_error = f"{type(error).__name__}: {error}"
+
+        stack = self._get_stack()
+        for run in stack:
+            run.queries += 1
+            run.query_time += seconds
+            run.errors += error is not None
+
+        if seconds >= self.slow_threshold:
+            self._log_slow(label, query, seconds, stack[-1].name if stack else None, error)
+
+    # Adds rows fetched by a query to its label.
+    def add_rows(self, label: str, rows: int):
+        with self._lock:
+            stats = self._stats.get(label)
+            if stats is not None:
+                stats.rows += rows
+
+    # Returns {label: counters} for every label seen so far.
+    def get_stats(self) -> dict[str, dict]:
+        with self._lock:
+            return {label: stats.as_dict() for label, stats in self._stats.items()}
+
+    # Returns {scope name: counters} for every scope that has finished at least once.
+    def get_scopes(self) -> dict[str, dict]:
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._scopes.items()}
+
+    # Returns the slow-query log, oldest first.
+    def get_slow_queries(self) -> list[dict]:
+        with self._lock:
+            return list(self._slow)
+
+    # Returns the connection checkout counters.
+    def get_acquire_stats(self) -> dict:
+        with self._lock:
+            return {
+                "acquires": self._acquires,
+                "total_time": round(self._acquire_time, 6),
+                "avg_time": round(self._acquire_time / self._acquires, 6) if self._acquires else 0.0,
+                "max_time": round(self._max_acquire_time, 6),
+            }
+
+    # Clears every counter and the slow-query log.
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._scopes.clear()
+            self._slow.clear()
+            self._acquires = 0
+            self._acquire_time = 0.0
+            self._max_acquire_time = 0.0
+
+    # Returns the report as text: scopes, then labels by total time, then the slow-query log.
+    def report(self) -> str:
+        with self._lock:
+            scopes = sorted(self._scopes.values(), key=lambda s: s.name)
+            stats = sorted(self._stats.values(), key=lambda s: s.total_time, reverse=True)
+            slow = list(self._slow)
+            acquires, acquire_time, max_acquire = self._acquires, self._acquire_time, self._max_acquire_time
+
+        lines = ["Query statistics:"]
+        if scopes:
+            lines.append("  Scopes (last run; average over all runs):")
+            for scope in scopes:
+                lines.append(f"    {scope.last.summary()}; avg {scope.queries / scope.runs:.1f} queries / "
+                             f"{scope.wall_time / scope.runs:.2f} s over {scope.runs} run(s)")
+        lines.append(f"  Connection checkouts: {acquires}, {acquire_time * 1000:.1f} ms total, "
+                     f"{max_acquire * 1000:.1f} ms max")
+        lines.append(f"  {'label':<44} {'count':>7} {'rows':>9} {'errors':>6} {'total ms':>10} "
+                     f"{'p50 ms':>7} {'p95 ms':>7} {'max ms':>8}")
+        for s in stats:
+            lines.append(f"  {s.label:<44} {s.count:>7} {s.rows:>9} {s.errors:>6} {s.total_time * 1000:>10.1f} "
+                         f"{s.histogram.percentile(50):>7.2f} {s.histogram.percentile(95):>7.2f} {s.max_time * 1000:>8.2f}")
+        lines.append(f"  Slow queries (>= {self.slow_threshold * 1000:g} ms): {len(slow)}")
+        for entry in slow:
+            lines.append(f"    {entry['time']} {entry['seconds'] * 1000:8.1f} ms  {entry['label']}"
+                         f"{' [' + entry['scope'] + ']' if entry['scope'] else ''}  {entry['query']}")
+        return "\n".join(lines)
+
+    # Prints the report when BUDDYTRADE_QUERY_STATS is set.
+    def print_report(self):
+        if os.environ.get("BUDDYTRADE_QUERY_STATS"):
+            print(self.report())
+
+    # Helper method that returns this thread's stack of open scopes.
+    def _get_stack(self) -> list[ScopeRun]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    # Helper method that adds a query to the slow-query log.
+    def _log_slow(self, label: str, query: str, seconds: float, scope: str | None, error: Exception | None):
+        entry = {
+            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "label": label,
+            "scope": scope,
+            "seconds": round(seconds, 6),
+            "query": " ".join(query.split())[:200],
+            "error": f"{type(error).__name__}: {error}" if error is not None else None,
+        }
+        with self._lock:
+            self._slow.append(entry)
+        print(f"Slow query ({seconds * 1000:.1f} ms) {label}: {entry['query']}")
+        if self.slow_log_path:
+            try:
+                with open(self.slow_log_path, "a", encoding="utf-8") as f:
+                    f.write(f"{entry['time']}\t{seconds * 1000:.1f}\t{label}\t{scope or ''}\t{entry['query']}\n")
+            except OSError as e:
+                print("Could not write the slow-query log:", e)
+
+
+# Wraps a connection so that cursor() and execute() return timed cursors.
+class InstrumentedConnection:
+
+    # Constructs a wrapper around a connection (raw or pooled).
+    def __init__(self, conn, monitor: QueryMonitor):
+        self._conn = conn
+        self._monitor = monitor
+
+    # Returns a timed cursor.
+    def cursor(self, *args, **kwargs) -> "InstrumentedCursor":
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs), self._monitor)
+
+    # Runs one statement on a new timed cursor and returns it (like sqlite3 and pyodbc do).
+    def execute(self, query: str, *params) -> "InstrumentedCursor":
+        return self.cursor().execute(query, *params)
+
+    # Gets the wrapped connection.
+    def get_connection(self):
+        return self._conn
+
+    # Forwards every other attribute (commit, rollback, close, in_transaction, ...) to the connection.
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+
+# Wraps a cursor so that every execute() is timed and its fetched rows are counted.
+class InstrumentedCursor:
+
+    # Constructs a wrapper around a DB-API cursor.
+    def __init__(self, cursor, monitor: QueryMonitor):
+        object.__setattr__(self, "_cursor", cursor)
+        object.__setattr__(self, "_monitor", monitor)
+        object.__setattr__(self, "_label", None)
+
+    # Runs one statement.
+    def execute(self, query: str, *params):
+        self._run(self._cursor.execute, query, params)
+        return self
+
+    # Runs one statement for every parameter set.
+    def executemany(self, query: str, seq_of_params):
+        self._run(self._cursor.executemany, query, (seq_of_params,))
+        return self
+
+    # Fetches the next row.
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._monitor.add_rows(self._label, 1)
+        return row
+
+    # Fetches up to size rows.
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._monitor.add_rows(self._label, len(rows))
+        return rows
+
+    # Fetches every remaining row.
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._monitor.add_rows(self._label, len(rows))
+        return rows
+
+    # Iterates over the remaining rows.
+    def __iter__(self):
+        for row in self._cursor:
+            self._monitor.add_rows(self._label, 1)
+            yield row
+
+    # Forwards every other attribute (description, rowcount, nextset, ...) to the cursor.
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    # Forwards attribute assignments (e.g. fast_executemany) to the cursor.
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)
+
+    # Helper method that times a call and records it under the calling method's name.
+    def _run(self, method, query: str, params: tuple):
+        label = _caller_label()
+        object.__setattr__(self, "_label", label)
+        start = time.perf_counter()
+        try:
+            method(query, *params)
+        except Exception as e:
+            self._monitor.record(label, query, time.perf_counter() - start, error=e)
+            raise
+        seconds = time.perf_counter() - start
+        # rowcount is the number of rows written; SELECTs report -1 and are counted as they are fetched.
+        rowcount = getattr(self._cursor, "rowcount", -1)
+        written = rowcount if rowcount and rowcount > 0 and self._cursor.description is None else 0
+        self._monitor.record(label, query, seconds, written)
+
+
+# Helper function that names the first function outside this module on the call stack,
+# e.g. "DatabaseService.get_user_by_email".
+def _caller_label() -> str:
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_globals.get("__name__") == __name__:
+        frame = frame.f_back
+    if frame is None:
+        return "unknown"
+    code = frame.f_code
+    return getattr(code, "co_qualname", code.co_name)
@@ -0,0 +1,124 @@
+#
+# Author: Robert Patel
+# This class keeps a set of quotes fresh while a screen is open. A QTimer on the
+# GUI thread schedules each poll, the quotes are fetched on the TaskRunner, and
+# quotes_updated is emitted back on the GUI thread. Polling slows down while
+# the watched window is hidden, while the market is closed and after errors.
+#
+
+from datetime import datetime, time as dt_time
+from zoneinfo import ZoneInfo
+from PyQt6.QtCore import QObject, QEvent, QTimer, pyqtSignal
+from services.api_service import APIService
+from services.task_runner import TaskRunner
+
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+MARKET_OPEN = dt_time(9, 30)
+MARKET_CLOSE = dt_time(16, 0)
+
+
+# Returns True during regular NYSE/Nasdaq hours (weekdays 9:30-16:00 New York time; holidays are not known).
+def is_market_open(now: datetime | None = None) -> bool:
+    now = (now or datetime.now(MARKET_TIMEZONE)).astimezone(MARKET_TIMEZONE)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+class QuotePoller(QObject):
+
+    # Emitted on the GUI thread with {ticker: quote} after every successful poll.
+    quotes_updated = pyqtSignal(dict)
+
+    # Constructs a new poller. interval is the poll period in seconds while the market is open and
+    # the window is visible; idle_interval is used otherwise, and errors double the period up to max_interval.
+    def __init__(self, api_service: APIService, task_runner: TaskRunner, interval: float = 15.0,
+                 idle_interval: float = 300.0, max_interval: float = 600.0, market_open=is_market_open,
+                 parent: QObject | None = None):
+        super().__init__(parent)
+        self.api_service = api_service
+        self.task_runner = task_runner
+        self.interval = interval
+        self.idle_interval = idle_interval
+        self.max_interval = max_interval
+        self.market_open = market_open
+        self.tickers = []
+        self.failures = 0
+        self.visible = True
+        self._running = False
+        self._in_flight = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.poll_now)
+
+    # Sets the tickers to poll.
+    def set_tickers(self, tickers: list[str]):
+        self.tickers = list(dict.fromkeys(tickers))
+
+    # Starts polling; the first poll happens after one period.
+    def start(self):
+        self._running = True
+        self._schedule()
+
+    # Stops polling. A poll already in flight still delivers its result.
+    def stop(self):
+        self._running = False
+        self._timer.stop()
+
+    # Returns True while the poller is started.
+    def is_running(self) -> bool:
+        return self._running
+
+    # Pauses while window is hidden and polls as soon as it is shown again.
+    def watch(self, window: QObject):
+        self.visible = window.isVisible()
+        window.installEventFilter(self)
+
+    # Gets the seconds until the next poll under the current conditions.
+    def get_current_interval(self) -> float:
+        if not self.visible or not self.market_open():
+            base = self.idle_interval
+        else:
+            base = self.interval
+        return min(base * 2 ** self.failures, max(self.max_interval, base))
+
+    # Fetches the quotes now (unless a poll is already running) and reschedules.
+    def poll_now(self):
+        if not self._running:
+            return
+        if self._in_flight or not self.tickers or not self.visible:
+            self._schedule()
+            return
+        self._in_flight = True
+        self.task_runner.submit(
+            self.api_service.get_quotes, list(self.tickers), refresh=True, key="quote_poll",
+            on_success=self._on_quotes, on_error=self._on_error, background=True,
+        )
+
+    # Tracks the visibility of the watched window.
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Show:
+            self.visible = True
+            # Shows fresh prices right away instead of waiting out the idle period.
+            self.poll_now()
+        elif event.type() == QEvent.Type.Hide:
+            self.visible = False
+            self._schedule()
+        return False
+
+    # Helper method that publishes a successful poll. Runs on the GUI thread.
+    def _on_quotes(self, quotes: dict):
+        self._in_flight = False
+        self.failures = 0
+        self.quotes_updated.emit(quotes)
+        self._schedule()
+
+    # Helper method that backs off after a failed poll. Runs on the GUI thread.
+    def _on_error(self, e: Exception):
+        self._in_flight = False
+        self.failures += 1
+        print(f"Quote poll failed ({self.failures} in a row):", e)
+        self._schedule()
+
+    # Helper method that (re)starts the timer with the current interval.
+    def _schedule(self):
+        if self._running and not self._in_flight:
+            self._timer.start(int(self.get_current_interval() * 1000))
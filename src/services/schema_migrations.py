@@ -0,0 +1,238 @@
+#
+# Author: Robert Patel
+# These classes keep the database schema up to date.
+# Every schema change is a numbered migration with one script per backend;
+# the SchemaVersion table records which migrations a database already has,
+# so each one runs exactly once, in order, inside its own transaction.
+#
+
+
+# One numbered schema change. Statements run one at a time, in order.
+class Migration:
+
+    # Constructs a new migration with the statements for each backend.
+    def __init__(self, version: int, description: str, sqlite: list[str], sqlserver: list[str]):
+        self.version = version
+        self.description = description
+        self.statements = {"sqlite": sqlite, "sqlserver": sqlserver}
+
+    # Gets the version number.
+    def get_version(self) -> int:
+        return self.version
+
+    # Gets the description.
+    def get_description(self) -> str:
+        return self.description
+
+    # Gets the statements for a backend ("sqlite" or "sqlserver").
+    def get_statements(self, backend_name: str) -> list[str]:
+        return self.statements.get(backend_name, [])
+
+
+# Every migration, oldest first. Never edit one that has shipped; add a new one instead.
+MIGRATIONS = [
+    Migration(
+        1, "Users, Portfolios, Holdings and Watchlist",
+        sqlite=[
+            """
+            CREATE TABLE IF NOT EXISTS Users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                first_name TEXT NOT NULL,
+                last_name TEXT NOT NULL,
+                email TEXT NOT NULL COLLATE NOCASE UNIQUE,
+                hashed_password TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS Portfolios (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL REFERENCES Users (id) ON DELETE CASCADE
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS IX_Portfolios_user_id ON Portfolios (user_id)",
+            """
+            CREATE TABLE IF NOT EXISTS Holdings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                portfolio_id INTEGER NOT NULL REFERENCES Portfolios (id) ON DELETE CASCADE,
+                ticker TEXT NOT NULL COLLATE NOCASE,
+                buy_price REAL NOT NULL,
+                quantity REAL NOT NULL,
+                date_added TEXT NOT NULL
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS IX_Holdings_portfolio_ticker ON Holdings (portfolio_id, ticker)",
+            """
+            CREATE TABLE IF NOT EXISTS Watchlist (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL REFERENCES Users (id) ON DELETE CASCADE,
+                ticker TEXT NOT NULL COLLATE NOCASE,
+                color_id INTEGER NOT NULL DEFAULT 0,
+                date_added TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (user_id, color_id, ticker)
+            )
+            """,
+        ],
+        # Users, Portfolios and Holdings predate the migrations on the server.
+        sqlserver=[
+            """
+            IF OBJECT_ID(N'dbo.Watchlist', N'U') IS NULL
+                CREATE TABLE dbo.Watchlist (
+                    id INT IDENTITY(1, 1) PRIMARY KEY,
+                    user_id INT NOT NULL REFERENCES dbo.Users (id) ON DELETE CASCADE,
+                    ticker NVARCHAR(16) NOT NULL,
+                    color_id INT NOT NULL DEFAULT 0,
+                    date_added DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+                    CONSTRAINT UQ_Watchlist UNIQUE (user_id, color_id, ticker)
+                )
+            """,
+        ],
+    ),
+    Migration(
+        2, "Positions table maintained on every trade",
+        sqlite=[
+            """
+            CREATE TABLE IF NOT EXISTS Positions (
+                portfolio_id INTEGER NOT NULL REFERENCES Portfolios (id) ON DELETE CASCADE,
+                ticker TEXT NOT NULL,
+                total_qty REAL NOT NULL,
+                cost_basis REAL NOT NULL,
+                avg_price REAL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (portfolio_id, ticker)
+            ) WITHOUT ROWID
+            """,
+            # Databases that already have Positions keep their rows.
+            """
+            INSERT OR IGNORE INTO Positions (portfolio_id, ticker, total_qty, cost_basis, avg_price, updated_at)
+            SELECT portfolio_id, UPPER(TRIM(ticker)), SUM(quantity), SUM(quantity * buy_price),
+                   SUM(quantity * buy_price) / SUM(quantity), CURRENT_TIMESTAMP
+            FROM Holdings
+            GROUP BY portfolio_id, UPPER(TRIM(ticker))
+            HAVING SUM(quantity) > 0
+            """,
+        ],
+        sqlserver=[
+            """
+            IF OBJECT_ID(N'dbo.Positions', N'U') IS NULL
+            BEGIN
+                CREATE TABLE dbo.Positions (
+                    portfolio_id INT NOT NULL REFERENCES dbo.Portfolios (id) ON DELETE CASCADE,
+                    ticker NVARCHAR(16) NOT NULL,
+                    total_qty FLOAT NOT NULL,
+                    cost_basis FLOAT NOT NULL,
+                    avg_price FLOAT NULL,
+                    updated_at DATETIME2 NOT NULL,
+                    CONSTRAINT PK_Positions PRIMARY KEY (portfolio_id, ticker)
+                );
+
+                INSERT INTO dbo.Positions (portfolio_id, ticker, total_qty, cost_basis, avg_price, updated_at)
+                SELECT portfolio_id, UPPER(LTRIM(RTRIM(ticker))), SUM(CAST(quantity AS FLOAT)),
+                       SUM(CAST(quantity AS FLOAT) * buy_price),
+                       SUM(CAST(quantity AS FLOAT) * buy_price) / SUM(CAST(quantity AS FLOAT)), SYSUTCDATETIME()
+                FROM dbo.Holdings
+                GROUP BY portfolio_id, UPPER(LTRIM(RTRIM(ticker)))
+                HAVING SUM(CAST(quantity AS FLOAT)) > 0;
+            END
+            """,
+        ],
+    ),
+    Migration(
+        3, "Normalized ticker column and covering indexes for the login and dashboard queries",
+        sqlite=[
+            "ALTER TABLE Holdings ADD COLUMN ticker_norm TEXT GENERATED ALWAYS AS (UPPER(TRIM(ticker))) VIRTUAL",
+            "DROP INDEX IF EXISTS IX_Holdings_portfolio_ticker",
+            # SQLite has no INCLUDE; trailing columns make the index covering.
+            "CREATE INDEX IX_Holdings_portfolio_ticker_norm ON Holdings (portfolio_id, ticker_norm, quantity, buy_price)",
+            # Users(email) and Portfolios(user_id) are already served by the UNIQUE and v1 indexes.
+        ],
+        sqlserver=[
+            """
+            IF COL_LENGTH(N'dbo.Holdings', N'ticker_norm') IS NULL
+                ALTER TABLE dbo.Holdings ADD ticker_norm AS UPPER(LTRIM(RTRIM(ticker))) PERSISTED
+            """,
+            """
+            IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Holdings_portfolio_ticker_norm')
+                CREATE INDEX IX_Holdings_portfolio_ticker_norm ON dbo.Holdings (portfolio_id, ticker_norm)
+                    INCLUDE (quantity, buy_price, date_added)
+            """,
+            """
+            IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Users_email_login')
+                CREATE INDEX IX_Users_email_login ON dbo.Users (email)
+                    INCLUDE (first_name, last_name, hashed_password)
+            """,
+            """
+            IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Portfolios_user_id')
+                CREATE INDEX IX_Portfolios_user_id ON dbo.Portfolios (user_id)
+            """,
+        ],
+    ),
+]
+
+
+# Applies pending migrations to a database.
+class SchemaMigrator:
+
+    # Bookkeeping table, created before anything else.
+    VERSION_TABLE = {
+        "sqlite": """
+            CREATE TABLE IF NOT EXISTS SchemaVersion (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """,
+        "sqlserver": """
+            IF OBJECT_ID(N'dbo.SchemaVersion', N'U') IS NULL
+                CREATE TABLE dbo.SchemaVersion (
+                    version INT PRIMARY KEY,
+                    description NVARCHAR(200) NOT NULL,
+                    applied_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME()
+                )
+        """,
+    }
+
+    # Constructs a new migrator for a storage backend.
+    def __init__(self, backend, migrations: list[Migration] | None = None):
+        self.backend = backend
+        self.migrations = sorted(migrations if migrations is not None else MIGRATIONS, key=lambda m: m.get_version())
+
+    # Returns the newest migration version.
+    def get_latest_version(self) -> int:
+        return self.migrations[-1].get_version() if self.migrations else 0
+
+    # Returns the version a database is at (0 for a new database).
+    def get_version(self, conn) -> int:
+        cursor = conn.cursor()
+        cursor.execute(self.VERSION_TABLE[self.backend.name])
+        conn.commit()
+        cursor.execute("SELECT MAX(version) FROM SchemaVersion")
+        row = cursor.fetchone()
+        cursor.close()
+        return int(row[0]) if row and row[0] is not None else 0
+
+    # Applies every migration newer than the database, oldest first. Returns the versions applied.
+    def migrate(self, conn) -> list[int]:
+        current = self.get_version(conn)
+        applied = []
+        for migration in self.migrations:
+            if migration.get_version() <= current:
+                continue
+
+            self.backend.begin(conn)
+            cursor = conn.cursor()
+            try:
+                for statement in migration.get_statements(self.backend.name):
+                    cursor.execute(statement)
+                cursor.execute(
+                    "INSERT INTO SchemaVersion (version, description) VALUES (?, ?)",
+                    (migration.get_version(), migration.get_description()),
+                )
+                conn.commit()
+                print(f"Applied schema migration {migration.get_version()}: {migration.get_description()}")
+            except Exception as e:
+                conn.rollback()
+                raise RuntimeError(f"Migration {migration.get_version()} ({migration.get_description()}) failed.") from e
+            finally:
+                cursor.close()
+            applied.append(migration.get_version())
+        return applied
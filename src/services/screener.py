@@ -0,0 +1,201 @@
+#
+# Author: Robert Patel
+# This class screens a whole universe of tickers (e.g. the S&P 500) in one pass.
+# The daily bars of every ticker come from the bar store as one BarPanel, and
+# returns, moving-average crosses, RSI and volume spikes are computed for all
+# of them at once; only bars newer than the stored ones are downloaded.
+#
+
+import time
+import numpy as np
+from services.bar_panel import BarPanel
+from services.bar_store import BarStore
+from services.market_data_provider import MarketDataProvider
+from services import panel_indicators as pi
+
+# Large US companies screened when no universe file is configured.
+DEFAULT_UNIVERSE = (
+    "AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "BRK-B", "AVGO", "TSLA", "LLY",
+    "JPM", "V", "UNH", "XOM", "MA", "JNJ", "PG", "HD", "COST", "ABBV",
+    "WMT", "NFLX", "MRK", "KO", "BAC", "CVX", "CRM", "PEP", "AMD", "ORCL",
+    "TMO", "ADBE", "LIN", "ACN", "MCD", "CSCO", "ABT", "WFC", "DHR", "TXN",
+    "QCOM", "PM", "INTU", "DIS", "AMGN", "CAT", "IBM", "GE", "VZ", "NOW",
+    "PFE", "CMCSA", "ISRG", "NEE", "UNP", "SPGI", "GS", "RTX", "AMAT", "T",
+    "LOW", "HON", "BKNG", "UBER", "PGR", "AXP", "ELV", "SYK", "BLK", "TJX",
+    "MS", "LMT", "C", "VRTX", "BSX", "SCHW", "MDT", "ADP", "REGN", "PLD",
+    "CB", "MMC", "ADI", "LRCX", "PANW", "SBUX", "MU", "DE", "GILD", "BMY",
+    "KLAC", "CI", "SO", "MO", "TMUS", "INTC", "DUK", "SHW", "ZTS", "BA",
+)
+
+
+# Screening results for every ticker of a universe at the latest bar.
+class ScreenResult:
+
+    # Constructs a new result. Every array has one entry per ticker, in tickers order.
+    def __init__(self, tickers: list[str], as_of, close: np.ndarray, returns: dict[str, np.ndarray], rsi: np.ndarray,
+                 volume_ratio: np.ndarray, golden_cross: np.ndarray, signals: dict[str, np.ndarray]):
+        self.tickers = tickers
+        self.as_of = as_of
+        self.close = close
+        self.returns = returns
+        self.rsi = rsi
+        self.volume_ratio = volume_ratio
+        self.golden_cross = golden_cross
+        self.signals = signals
+
+    # Gets the screened tickers.
+    def get_tickers(self) -> list[str]:
+        return self.tickers
+
+    # Gets the timestamp of the latest bar (None if nothing was screened).
+    def get_as_of(self):
+        return self.as_of
+
+    # Gets the return of every ticker over a horizon ("Day", "Week", "Month" or "Year").
+    def get_returns(self, horizon: str) -> np.ndarray:
+        return self.returns[horizon]
+
+    # Gets which tickers fired a signal, as a boolean array.
+    def get_signal(self, name: str) -> np.ndarray:
+        return self.signals[name]
+
+    # Returns the count tickers that moved the most over horizon, largest absolute move first.
+    def top_movers(self, horizon: str = "Day", count: int = 10) -> list[dict]:
+        returns = self.returns[horizon]
+        candidates = np.flatnonzero(~np.isnan(returns))
+        count = min(count, len(candidates))
+        if count == 0:
+            return []
+        moves = np.abs(returns[candidates])
+        top = candidates[np.argpartition(-moves, count - 1)[:count]]
+        top = top[np.argsort(-np.abs(returns[top]), kind="stable")]
+        return [self._row(i, horizon) for i in top]
+
+    # Returns the tickers with at least one signal, the most signals first, then by relative volume.
+    def signal_hits(self, count: int | None = None) -> list[dict]:
+        if not self.signals:
+            return []
+        fired = np.column_stack(list(self.signals.values()))
+        totals = fired.sum(axis=1)
+        hits = np.flatnonzero(totals > 0)
+        order = np.lexsort((-np.nan_to_num(self.volume_ratio[hits]), -totals[hits]))
+        names = list(self.signals)
+        rows = []
+        for i in hits[order][:count]:
+            row = self._row(i, "Day")
+            row["signals"] = [names[j] for j in np.flatnonzero(fired[i])]
+            rows.append(row)
+        return rows
+
+    # Helper method that describes ticker i for display.
+    def _row(self, i: int, horizon: str) -> dict:
+        return {
+            "ticker": self.tickers[i],
+            "close": float(self.close[i]),
+            "change_pct": float(self.returns[horizon][i] * 100),
+            "rsi": None if np.isnan(self.rsi[i]) else float(self.rsi[i]),
+            "golden_cross": bool(self.golden_cross[i]),
+        }
+
+
+class Screener:
+
+    # Bars per horizon on daily bars.
+    HORIZONS = {"Day": 1, "Week": 5, "Month": 21, "Year": 252}
+
+    # Constructs a new screener over universe (DEFAULT_UNIVERSE if None). Without a provider only stored
+    # bars are screened. lookback is the number of bars loaded per ticker; crosses count as fresh for
+    # fresh_bars bars; stored bars are topped up at most every refresh_interval seconds.
+    def __init__(self, bar_store: BarStore, provider: MarketDataProvider | None = None, universe: list[str] | None = None,
+                 interval: str = "1d", lookback: int = 300, history: str = "2y", fresh_bars: int = 5,
+                 refresh_interval: float = 15 * 60.0, batch_size: int = 100):
+        self.bar_store = bar_store
+        self.provider = provider
+        self.universe = list(dict.fromkeys(t.strip().upper() for t in (universe or DEFAULT_UNIVERSE)))
+        self.interval = interval
+        self.lookback = lookback
+        self.history = history
+        self.fresh_bars = fresh_bars
+        self.refresh_interval = refresh_interval
+        self.batch_size = batch_size
+        self._updated_at = None
+
+    # Reads a universe file with one ticker per line ("#" starts a comment).
+    @staticmethod
+    def load_universe(path: str) -> list[str]:
+        with open(path, "r") as f:
+            lines = (line.split("#", 1)[0].strip().upper() for line in f)
+            return [line for line in lines if line]
+
+    # Gets the screened tickers.
+    def get_universe(self) -> list[str]:
+        return self.universe
+
+    # Downloads the bars missing from the store: full history for new tickers, newer bars for the rest.
+    # Tickers sharing a start are fetched together in batches of batch_size.
+    def update_bars(self, tickers: list[str] | None = None):
+        if self.provider is None:
+            return
+        starts = {}
+        for ticker in tickers or self.universe:
+            last_timestamp = self.bar_store.last_timestamp(ticker, self.interval)
+            # Starts at the newest stored bar, which may still have been forming when it was saved.
+            start = None if last_timestamp is None else last_timestamp.to_pydatetime()
+            starts.setdefault(start, []).append(ticker)
+
+        for start, group in starts.items():
+            for i in range(0, len(group), self.batch_size):
+                batch = group[i:i + self.batch_size]
+                try:
+                    if start is None:
+                        frames = self.provider.get_bars_many(batch, self.interval, period=self.history)
+                    else:
+                        frames = self.provider.get_bars_many(batch, self.interval, start=start)
+                except Exception as e:
+                    # Screens whatever is stored if the download fails.
+                    print(f"Bar download failed for {len(batch)} tickers:", e)
+                    continue
+                self.bar_store.append_many(frames, self.interval)
+        self._updated_at = time.monotonic()
+
+    # Screens the universe. With refresh, stored bars older than refresh_interval are topped up first.
+    def screen(self, refresh: bool = True) -> ScreenResult:
+        if refresh and (self._updated_at is None or time.monotonic() - self._updated_at >= self.refresh_interval):
+            self.update_bars()
+        return self.screen_panel(BarPanel.from_store(self.bar_store, self.universe, self.interval, self.lookback))
+
+    # Screens a panel at its latest bar. Every indicator is computed for all tickers at once.
+    def screen_panel(self, panel: BarPanel) -> ScreenResult:
+        close, volume = panel.close, panel.volume
+        length = panel.get_length()
+        if length == 0:
+            empty = np.empty(0)
+            return ScreenResult([], None, empty, {h: empty for h in self.HORIZONS}, empty, empty, empty.astype(bool), {})
+
+        last = close[:, -1]
+        returns = {}
+        for horizon, bars in self.HORIZONS.items():
+            returns[horizon] = pi.pct_change(close[:, -bars - 1:], bars)[:, -1] if bars < length else np.full(len(last), np.nan)
+
+        sma_50 = pi.sma(close, 50)
+        sma_200 = pi.sma(close, 200)
+        momentum_10 = pi.ewm(close, 10)
+        momentum_20 = pi.ewm(close, 20)
+        rsi = pi.rsi(close, 14)[:, -1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            volume_ratio = volume[:, -1] / pi.sma(volume, 20)[:, -1]
+
+        recent = slice(-self.fresh_bars, None)
+        signals = {
+            "Golden cross": pi.crossed_above(sma_50, sma_200)[:, recent].any(axis=1),
+            "Death cross": pi.crossed_above(sma_200, sma_50)[:, recent].any(axis=1),
+            "Momentum up": pi.crossed_above(momentum_10, momentum_20)[:, -1],
+            "Momentum down": pi.crossed_above(momentum_20, momentum_10)[:, -1],
+            "RSI overbought": rsi >= 70,
+            "RSI oversold": rsi <= 30,
+            "Volume spike": volume_ratio > 1.5,
+        }
+        return ScreenResult(
+            panel.get_tickers(), panel.get_index()[-1], last, returns, rsi, volume_ratio,
+            sma_50[:, -1] > sma_200[:, -1], signals,
+        )
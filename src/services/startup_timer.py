@@ -0,0 +1,42 @@
+#
+# Author: Robert Patel
+# This class records how long each step of application start-up takes so
+# that time-to-first-window can be measured and kept low.
+#
+
+import os
+import time
+
+class StartupTimer:
+
+    # Constructs a new timer. start defaults to now (pass an earlier perf_counter() to include imports).
+    def __init__(self, start: float | None = None):
+        self.start = start if start is not None else time.perf_counter()
+        self.last = self.start
+        # (label, seconds since previous mark, seconds since start)
+        self.marks = []
+
+    # Records a step that just finished.
+    def mark(self, label: str):
+        now = time.perf_counter()
+        self.marks.append((label, now - self.last, now - self.start))
+        self.last = now
+
+    # Returns the seconds since start for a recorded label, or None.
+    def elapsed(self, label: str) -> float | None:
+        for name, _, total in self.marks:
+            if name == label:
+                return total
+        return None
+
+    # Returns the report as text.
+    def report(self) -> str:
+        lines = ["Startup timing:"]
+        for label, step, total in self.marks:
+            lines.append(f"  {label:<32} +{step * 1000:8.1f} ms  {total * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+    # Prints the report when BUDDYTRADE_STARTUP_TIMING is set.
+    def print_report(self):
+        if os.environ.get("BUDDYTRADE_STARTUP_TIMING"):
+            print(self.report())
@@ -0,0 +1,193 @@
+#
+# Author: Robert Patel
+# These classes open database connections for the DatabaseService.
+# The SQL Server backend connects to the Azure database configured in config.py;
+# the SQLite backend keeps the same tables in one local file for single-user
+# installs and for running the application without a network connection.
+#
+
+import os
+import sqlite3
+import sys
+import threading
+import uuid
+from services.schema_migrations import SchemaMigrator
+
+
+# Interface every storage backend implements.
+class StorageBackend:
+
+    # Short name of the backend ("sqlserver", "sqlite").
+    name = "base"
+
+    # Constructor used by every backend.
+    def __init__(self):
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    # Opens a brand-new DB-API connection (used by the connection pool only).
+    def connect(self):
+        raise NotImplementedError
+
+    # Brings the schema up to date and returns the migration versions applied.
+    def migrate(self, conn) -> list[int]:
+        applied = SchemaMigrator(self).migrate(conn)
+        self._schema_ready = True
+        return applied
+
+    # Starts an explicit transaction (DDL included) on a connection.
+    def begin(self, conn):
+        pass
+
+    # Configures a cursor for executemany() over large batches.
+    def prepare_bulk_cursor(self, cursor):
+        pass
+
+    # Returns the query plan of a query as lines of text.
+    def explain(self, conn, query: str, params: tuple = ()) -> list[str]:
+        raise NotImplementedError
+
+    # Returns True if a plan reads every table through an index seek rather than a scan.
+    def uses_index_seek(self, plan: list[str]) -> bool:
+        raise NotImplementedError
+
+    # Helper method that migrates the schema on the first connection only.
+    def _ensure_schema(self, conn):
+        with self._schema_lock:
+            if not self._schema_ready:
+                self.migrate(conn)
+
+
+# Azure SQL / SQL Server through pyodbc.
+class SqlServerBackend(StorageBackend):
+
+    name = "sqlserver"
+
+    # Constructs a new backend. Settings that are not passed in are read from config.py.
+    def __init__(self, server: str | None = None, database: str | None = None, user: str | None = None,
+                 password: str | None = None, driver: str | None = None):
+        super().__init__()
+        if None in (server, database, user, password, driver):
+            sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            import config
+            server = server or config.DB_SERVER
+            database = database or config.DB_NAME
+            user = user or config.DB_USER
+            password = password or config.DB_PASSWORD
+            driver = driver or config.DB_DRIVER
+        self.server = server
+        self.database = database
+        self.user = user
+        self.password = password
+        self.driver = driver
+
+    # Opens a new connection to the server.
+    def connect(self):
+        import pyodbc
+        connection_string = (
+            f"DRIVER={self.driver};"
+            f"SERVER={self.server};"
+            f"DATABASE={self.database};"
+            f"UID={self.user};"
+            f"PWD={self.password};"
+            f"Encrypt=yes;"
+            f"TrustServerCertificate=no;"
+            f"Connection Timeout=30;"
+        )
+        conn = pyodbc.connect(connection_string)
+        self._ensure_schema(conn)
+        return conn
+
+    # Sends each executemany() batch as one parameter array instead of one round trip per row.
+    def prepare_bulk_cursor(self, cursor):
+        cursor.fast_executemany = True
+
+    # Returns the estimated plan (SHOWPLAN_TEXT) of a query without running it.
+    def explain(self, conn, query: str, params: tuple = ()) -> list[str]:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SET SHOWPLAN_TEXT ON")
+            cursor.execute(query, params)
+            lines = []
+            while True:
+                if cursor.description is not None:
+                    lines.extend(str(row[0]).strip() for row in cursor.fetchall())
+                if not cursor.nextset():
+                    break
+            return lines
+        finally:
+            cursor.execute("SET SHOWPLAN_TEXT OFF")
+            cursor.close()
+
+    # Seeks only: no table scans and no full index scans.
+    def uses_index_seek(self, plan: list[str]) -> bool:
+        text = "\n".join(plan)
+        return "Seek(" in text and "Table Scan(" not in text and "Index Scan(" not in text
+
+
+# Embedded SQLite database holding the Users, Portfolios, Holdings, Positions and Watchlist tables
+# (created by the schema migrations).
+class SQLiteBackend(StorageBackend):
+
+    name = "sqlite"
+
+    DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".buddytrade", "buddytrade.db")
+
+    # Constructs a new backend. path ":memory:" gives a private in-memory database
+    # that is shared by every connection of this backend.
+    def __init__(self, path: str | None = None, busy_timeout: float = 5.0, cached_statements: int = 256):
+        super().__init__()
+        self.path = path or self.DEFAULT_PATH
+        self.busy_timeout = busy_timeout
+        # sqlite3 keeps this many prepared statements per connection.
+        self.cached_statements = cached_statements
+        self.in_memory = self.path == ":memory:"
+        if self.in_memory:
+            self.database = f"file:buddytrade-{uuid.uuid4().hex}?mode=memory&cache=shared"
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self.database = self.path
+
+    # Opens a new connection; the first one also creates the schema.
+    def connect(self):
+        # Pooled connections move between the GUI thread and workers, one thread at a time.
+        conn = sqlite3.connect(
+            self.database,
+            timeout=self.busy_timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+            uri=self.in_memory,
+        )
+        conn.execute("PRAGMA foreign_keys = ON")
+        if not self.in_memory:
+            # Readers no longer block the writer; NORMAL is durable enough with WAL.
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        self._ensure_schema(conn)
+        return conn
+
+    # Starts a transaction that also covers DDL statements.
+    def begin(self, conn):
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+
+    # Returns the EXPLAIN QUERY PLAN details of a query.
+    def explain(self, conn, query: str, params: tuple = ()) -> list[str]:
+        return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params).fetchall()]
+
+    # Every table is searched through an index or primary key; "SCAN" means a full pass.
+    def uses_index_seek(self, plan: list[str]) -> bool:
+        return any(line.startswith("SEARCH") for line in plan) and not any(
+            line.startswith("SCAN") and line != "SCAN CONSTANT ROW" for line in plan
+        )
+
+
+# Builds a backend from a spec: "sqlserver" (default), "sqlite" or "sqlite:<path>".
+def create_backend(spec: str | None = None) -> StorageBackend:
+    spec = spec or "sqlserver"
+    kind, _, path = spec.partition(":")
+    if kind == "sqlserver":
+        return SqlServerBackend()
+    if kind == "sqlite":
+        return SQLiteBackend(path or None)
+    raise ValueError(f"Unknown database backend '{spec}'.")
@@ -0,0 +1,402 @@
+#
+# Author: Robert Patel
+# These classes keep the recursive state of each technical indicator so that a
+# new bar costs O(1) work instead of recomputing the whole price history.
+#
+# The formulas follow pandas_ta, as the IndicatorEngine (batch) kernels do:
+#   EMA  - seeded with the SMA of the first `length` closes, then alpha = 2 / (length + 1).
+#   RMA  - pandas ewm(alpha=1/length, adjust=True, min_periods=length), used by RSI and ADX.
+#   SMA  - running sum over a ring buffer.
+# Gaps are handled as the batch engine handles them: missing High/Low/Close
+# values repeat the previous bar's, and a missing Volume leaves the volume SMA
+# undefined until it has left the window while the volume RSI skips it.
+# Streamed values match the batch series within STREAMING_TOLERANCE (1e-6),
+# measured as |streamed - batch| / max(|batch|, 1): a relative error for values
+# above 1 and an absolute one below it. The difference is floating point
+# rounding in the running sums. Warm-ups match exactly: a value is None while
+# the batch series is NaN. compare_with_batch() checks both on any OHLCV frame.
+#
+
+import math
+import numpy as np
+import pandas as pd
+
+STREAMING_TOLERANCE = 1e-6
+
+
+# Exponential moving average, optionally seeded with the SMA of the first `length` values.
+class StreamingEMA:
+
+    # Constructs a new EMA. seed_with_sma=False matches pandas ewm(span=length, adjust=False).
+    def __init__(self, length: int, seed_with_sma: bool = True):
+        self.length = length
+        self.seed_with_sma = seed_with_sma
+        self.alpha = 2.0 / (length + 1)
+        self.count = 0
+        self.seed_sum = 0.0
+        self.value = None
+
+    # Adds one value and returns the current EMA (None until it is defined).
+    def update(self, x: float) -> float | None:
+        self.count += 1
+        if self.value is None:
+            if not self.seed_with_sma:
+                self.value = x
+            else:
+                self.seed_sum += x
+                if self.count == self.length:
+                    self.value = self.seed_sum / self.length
+            return self.value
+        self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+    # Returns the state as a plain dictionary.
+    def snapshot(self) -> dict:
+        return {"length": self.length, "seed_with_sma": self.seed_with_sma, "count": self.count,
+                "seed_sum": self.seed_sum, "value": self.value}
+
+    # Rebuilds an EMA from a snapshot.
+    @classmethod
+    def restore(cls, state: dict):
+        ema = cls(state["length"], state["seed_with_sma"])
+        ema.count = state["count"]
+        ema.seed_sum = state["seed_sum"]
+        ema.value = state["value"]
+        return ema
+
+
+# Simple moving average over a fixed-size ring buffer.
+class StreamingSMA:
+
+    # Constructs a new SMA.
+    def __init__(self, length: int):
+        self.length = length
+        self.buffer = [0.0] * length
+        self.position = 0
+        self.count = 0
+        self.total = 0.0
+        # NaN values in the buffer; the SMA is undefined while any is in the window.
+        self.missing = 0
+
+    # Adds one value and returns the current SMA (None until `length` values were seen).
+    def update(self, x: float) -> float | None:
+        old = self.buffer[self.position]
+        if math.isnan(old):
+            self.missing -= 1
+        else:
+            self.total -= old
+        if math.isnan(x):
+            self.missing += 1
+        else:
+            self.total += x
+        self.buffer[self.position] = x
+        self.position = (self.position + 1) % self.length
+        self.count = min(self.count + 1, self.length)
+        return self.value
+
+    # Gets the current SMA.
+    @property
+    def value(self) -> float | None:
+        return self.total / self.length if self.count == self.length and not self.missing else None
+
+    # Returns the state as a plain dictionary.
+    def snapshot(self) -> dict:
+        return {"length": self.length, "buffer": list(self.buffer), "position": self.position,
+                "count": self.count, "total": self.total, "missing": self.missing}
+
+    # Rebuilds an SMA from a snapshot.
+    @classmethod
+    def restore(cls, state: dict):
+        sma = cls(state["length"])
+        sma.buffer = list(state["buffer"])
+        sma.position = state["position"]
+        sma.count = state["count"]
+        sma.total = state["total"]
+        sma.missing = state["missing"]
+        return sma
+
+
+# Wilder's moving average as pandas_ta computes it: ewm(alpha=1/length, adjust=True).
+class StreamingRMA:
+
+    # Constructs a new RMA.
+    def __init__(self, length: int):
+        self.length = length
+        self.decay = 1.0 - 1.0 / length
+        self.numerator = 0.0
+        self.denominator = 0.0
+        self.count = 0
+
+    # Adds one value (NaN decays the weights like pandas) and returns the current RMA.
+    def update(self, x: float) -> float | None:
+        if x is None or math.isnan(x):
+            if self.count:
+                self.numerator *= self.decay
+                self.denominator *= self.decay
+            return self.value
+        self.numerator = x + self.decay * self.numerator
+        self.denominator = 1.0 + self.decay * self.denominator
+        self.count += 1
+        return self.value
+
+    # Gets the current RMA.
+    @property
+    def value(self) -> float | None:
+        return self.numerator / self.denominator if self.count >= self.length else None
+
+    # Returns the state as a plain dictionary.
+    def snapshot(self) -> dict:
+        return {"length": self.length, "numerator": self.numerator, "denominator": self.denominator, "count": self.count}
+
+    # Rebuilds an RMA from a snapshot.
+    @classmethod
+    def restore(cls, state: dict):
+        rma = cls(state["length"])
+        rma.numerator = state["numerator"]
+        rma.denominator = state["denominator"]
+        rma.count = state["count"]
+        return rma
+
+
+# Relative strength index built from two RMAs of the gains and losses.
+class StreamingRSI:
+
+    # Constructs a new RSI.
+    def __init__(self, length: int = 14):
+        self.length = length
+        self.previous = None
+        self.gains = StreamingRMA(length)
+        self.losses = StreamingRMA(length)
+        self.value = None
+
+    # Adds one value and returns the current RSI. A change from or to a NaN value only ages the averages.
+    def update(self, x: float) -> float | None:
+        if self.previous is not None:
+            change = x - self.previous
+            if math.isnan(change):
+                self.gains.update(math.nan)
+                self.losses.update(math.nan)
+            else:
+                self.gains.update(max(change, 0.0))
+                self.losses.update(max(-change, 0.0))
+            gain, loss = self.gains.value, self.losses.value
+            if gain is not None and loss is not None and gain + loss != 0:
+                self.value = 100.0 * gain / (gain + loss)
+        self.previous = x
+        return self.value
+
+    # Returns the state as a plain dictionary.
+    def snapshot(self) -> dict:
+        return {"length": self.length, "previous": self.previous, "gains": self.gains.snapshot(),
+                "losses": self.losses.snapshot(), "value": self.value}
+
+    # Rebuilds an RSI from a snapshot.
+    @classmethod
+    def restore(cls, state: dict):
+        rsi = cls(state["length"])
+        rsi.previous = state["previous"]
+        rsi.gains = StreamingRMA.restore(state["gains"])
+        rsi.losses = StreamingRMA.restore(state["losses"])
+        rsi.value = state["value"]
+        return rsi
+
+
+# Average directional index with Wilder-smoothed true range and directional movement.
+class StreamingADX:
+
+    # Constructs a new ADX.
+    def __init__(self, length: int = 14, lensig: int = 10):
+        self.length = length
+        self.lensig = lensig
+        self.previous = None
+        self.true_range = StreamingRMA(length)
+        self.plus_dm = StreamingRMA(length)
+        self.minus_dm = StreamingRMA(length)
+        self.dx = StreamingRMA(lensig)
+
+    # Adds one (high, low, close) bar and returns the current ADX.
+    def update(self, high: float, low: float, close: float) -> float | None:
+        if self.previous is not None:
+            prev_high, prev_low, prev_close = self.previous
+            self.true_range.update(max(high - low, abs(high - prev_close), abs(prev_close - low)))
+
+            up = high - prev_high
+            down = prev_low - low
+            self.plus_dm.update(up if up > down and up > 0 else 0.0)
+            self.minus_dm.update(down if down > up and down > 0 else 0.0)
+
+            atr, plus, minus = self.true_range.value, self.plus_dm.value, self.minus_dm.value
+            if atr is not None and plus is not None and minus is not None and atr != 0:
+                dmp = 100.0 * plus / atr
+                dmn = 100.0 * minus / atr
+                self.dx.update(100.0 * abs(dmp - dmn) / (dmp + dmn) if dmp + dmn != 0 else math.nan)
+        self.previous = (high, low, close)
+        return self.value
+
+    # Gets the current ADX.
+    @property
+    def value(self) -> float | None:
+        return self.dx.value
+
+    # Returns the state as a plain dictionary.
+    def snapshot(self) -> dict:
+        return {"length": self.length, "lensig": self.lensig, "previous": self.previous,
+                "true_range": self.true_range.snapshot(), "plus_dm": self.plus_dm.snapshot(),
+                "minus_dm": self.minus_dm.snapshot(), "dx": self.dx.snapshot()}
+
+    # Rebuilds an ADX from a snapshot.
+    @classmethod
+    def restore(cls, state: dict):
+        adx = cls(state["length"], state["lensig"])
+        adx.previous = tuple(state["previous"]) if state["previous"] is not None else None
+        adx.true_range = StreamingRMA.restore(state["true_range"])
+        adx.plus_dm = StreamingRMA.restore(state["plus_dm"])
+        adx.minus_dm = StreamingRMA.restore(state["minus_dm"])
+        adx.dx = StreamingRMA.restore(state["dx"])
+        return adx
+
+
+# Every indicator of the IndicatorEngine, updated one bar at a time.
+class StreamingIndicatorSet:
+
+    EMA_LENGTHS = (10, 34, 50, 200)
+    SMA_LENGTHS = (20, 50, 100, 200)
+
+    # Version of the snapshot format; states saved by another version are rebuilt.
+    STATE_VERSION = 2
+
+    # Constructs a new, empty set of streaming indicators.
+    def __init__(self):
+        self.last_timestamp = None
+        # Last known (high, low, close), repeated over bars where they are missing.
+        self.last_prices = (math.nan, math.nan, math.nan)
+        self.close_indicators = {f"EMA_{n}": StreamingEMA(n) for n in self.EMA_LENGTHS}
+        self.close_indicators.update({f"SMA_{n}": StreamingSMA(n) for n in self.SMA_LENGTHS})
+        self.close_indicators["MOMENTUM_EMA_10"] = StreamingEMA(10, seed_with_sma=False)
+        self.close_indicators["MOMENTUM_EMA_20"] = StreamingEMA(20, seed_with_sma=False)
+        self.close_indicators["RSI"] = StreamingRSI(14)
+        self.volume_indicators = {"RSI_Volume": StreamingRSI(14), "VOLUME_SMA_20": StreamingSMA(20)}
+        self.adx = StreamingADX(14, 10)
+
+    # Adds one bar (mapping with High, Low, Close and Volume) and returns the latest values.
+    def update(self, bar, timestamp=None) -> dict[str, float | None]:
+        self._add(float(bar["High"]), float(bar["Low"]), float(bar["Close"]), float(bar["Volume"]))
+        if timestamp is not None:
+            self.last_timestamp = pd.Timestamp(timestamp)
+        return self.values()
+
+    # Adds every bar of a frame that is newer than the last bar seen.
+    def update_frame(self, price_data: pd.DataFrame) -> dict[str, float | None]:
+        if self.last_timestamp is not None:
+            price_data = price_data[price_data.index > self.last_timestamp]
+        if price_data.empty:
+            return self.values()
+        # Plain floats, so no pandas row is built per bar.
+        columns = (price_data[c].to_numpy(dtype=np.float64).tolist() for c in ("High", "Low", "Close", "Volume"))
+        for high, low, close, volume in zip(*columns):
+            self._add(high, low, close, volume)
+        self.last_timestamp = pd.Timestamp(price_data.index[-1])
+        return self.values()
+
+    # Returns the latest value of every indicator.
+    def values(self) -> dict[str, float | None]:
+        values = {name: indicator.value for name, indicator in self.close_indicators.items()}
+        values.update({name: indicator.value for name, indicator in self.volume_indicators.items()})
+        values["ADX"] = self.adx.value
+        return values
+
+    # Returns the state of every indicator as a JSON-serializable dictionary.
+    def snapshot(self) -> dict:
+        return {
+            "version": self.STATE_VERSION,
+            "last_timestamp": self.last_timestamp.isoformat() if self.last_timestamp is not None else None,
+            "last_prices": list(self.last_prices),
+            "close": {name: [type(ind).__name__, ind.snapshot()] for name, ind in self.close_indicators.items()},
+            "volume": {name: [type(ind).__name__, ind.snapshot()] for name, ind in self.volume_indicators.items()},
+            "adx": self.adx.snapshot(),
+        }
+
+    # Helper method that feeds one bar to every indicator. Missing prices are forward-filled like
+    # IndicatorEngine does; bars before the first price leave the price indicators untouched.
+    def _add(self, high: float, low: float, close: float, volume: float):
+        high, low, close = (previous if math.isnan(x) else x for x, previous in zip((high, low, close), self.last_prices))
+        self.last_prices = (high, low, close)
+        if not math.isnan(close):
+            for indicator in self.close_indicators.values():
+                indicator.update(close)
+        for indicator in self.volume_indicators.values():
+            indicator.update(volume)
+        if not (math.isnan(high) or math.isnan(low) or math.isnan(close)):
+            self.adx.update(high, low, close)
+
+    # Rebuilds a set from a snapshot.
+    @classmethod
+    def restore(cls, state: dict):
+        kinds = {"StreamingEMA": StreamingEMA, "StreamingSMA": StreamingSMA, "StreamingRSI": StreamingRSI}
+        indicators = cls()
+        indicators.last_timestamp = pd.Timestamp(state["last_timestamp"]) if state["last_timestamp"] else None
+        indicators.last_prices = tuple(state["last_prices"])
+        indicators.close_indicators = {name: kinds[kind].restore(s) for name, (kind, s) in state["close"].items()}
+        indicators.volume_indicators = {name: kinds[kind].restore(s) for name, (kind, s) in state["volume"].items()}
+        indicators.adx = StreamingADX.restore(state["adx"])
+        return indicators
+
+
+# Streams every bar of price_data and returns the worst error per indicator against the batch
+# IndicatorEngine series, as |streamed - batch| / max(|batch|, 1). Raises AssertionError when an
+# indicator is defined on different bars than the batch series, has no value to compare (use a
+# longer frame), or differs by more than the tolerance.
+def compare_with_batch(price_data: pd.DataFrame, tolerance: float = STREAMING_TOLERANCE) -> dict[str, float]:
+    from services.indicator_engine import IndicatorEngine
+
+    batch = IndicatorEngine().compute(price_data)
+    streaming = StreamingIndicatorSet()
+    streamed = {name: [] for name in streaming.values()}
+    for timestamp, bar in price_data.iterrows():
+        for name, value in streaming.update(bar, timestamp).items():
+            streamed[name].append(np.nan if value is None else value)
+
+    errors = {}
+    for name, values in streamed.items():
+        expected = batch.get_series(name)
+        actual = np.asarray(values, dtype=float)
+        defined = ~np.isnan(expected)
+        mismatched = np.flatnonzero(defined != ~np.isnan(actual))
+        if len(mismatched):
+            raise AssertionError(f"{name} is {'missing' if defined[mismatched[0]] else 'defined'} on bar "
+                                 f"{mismatched[0]}, unlike the batch series.")
+        if not defined.any():
+            raise AssertionError(f"{name} has no value to compare in {len(price_data)} bars.")
+        errors[name] = float(np.max(np.abs(actual[defined] - expected[defined]) / np.maximum(np.abs(expected[defined]), 1.0)))
+        if errors[name] > tolerance:
+            raise AssertionError(f"{name} drifted from the batch series by {errors[name]:.3e}.")
+    return errors
+
+
+# Builds a seeded random-walk OHLCV frame for compare_with_batch.
+def _synthetic_bars(count: int = 2000, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, count)))
+    spread = np.abs(rng.normal(0, 0.003, count)) * close
+    return pd.DataFrame({
+        "Open": close + rng.normal(0, 0.001, count) * close,
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(50_000, 5_000_000, count).astype(float),
+    }, index=pd.date_range("2024-01-02 09:30", periods=count, freq="h", tz="America/New_York"))
+
+
+# Helper function that blanks a Close and a Volume value of price_data, as a provider sometimes leaves them.
+def _with_gaps(price_data: pd.DataFrame) -> pd.DataFrame:
+    price_data = price_data.copy()
+    price_data.iloc[len(price_data) // 4, price_data.columns.get_loc("Close")] = np.nan
+    price_data.iloc[len(price_data) // 2, price_data.columns.get_loc("Volume")] = np.nan
+    return price_data
+
+
+if __name__ == "__main__":
+    for label, price_data in (("complete bars", _synthetic_bars()), ("bars with gaps", _with_gaps(_synthetic_bars()))):
+        print(label)
+        for name, error in compare_with_batch(price_data).items():
+            print(f"  {name:<16} max error {error:.3e}")
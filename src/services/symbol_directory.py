@@ -0,0 +1,128 @@
+#
+# Author: Robert Patel
+# This class keeps a cached list of listed ticker symbols so that large
+# batches of tickers can be validated without one network request each.
+# The list comes from the Nasdaq Trader symbol directory and is cached on disk.
+#
+
+import os
+import re
+import threading
+import time
+import urllib.request
+from services.api_service import APIService
+
+
+class SymbolDirectory:
+
+    # Pipe-delimited listings published daily by Nasdaq (Nasdaq, NYSE, NYSE American, Arca, BATS).
+    SOURCES = (
+        "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt",
+        "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt",
+    )
+
+    DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".buddytrade", "symbols.txt")
+
+    # Letters first, then letters, digits, "." or "-" (BRK.B, BF-B).
+    TICKER_PATTERN = re.compile(r"^[A-Z][A-Z0-9.\-]{0,9}$")
+
+    # Constructs a new directory. Tickers missing from the list are checked with api_service, if given.
+    def __init__(self, path: str | None = None, api_service: APIService | None = None, max_age: float = 7 * 24 * 60 * 60.0):
+        self.path = path or self.DEFAULT_PATH
+        self.api_service = api_service
+        self.max_age = max_age
+        self._symbols = None
+        # ticker -> bool for tickers that had to be looked up through the API.
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    # Returns True if the ticker is listed (or, when not in the list, the API can price it).
+    # Class shares are checked in the Yahoo form that to_yahoo returns (BRK.B as BRK-B).
+    def is_valid(self, ticker: str) -> bool:
+        ticker = APIService.normalize_ticker(ticker)
+        if not self.TICKER_PATTERN.match(ticker):
+            return False
+        ticker = self.to_yahoo(ticker)
+        if ticker in self.get_symbols():
+            return True
+        if self.api_service is None:
+            return False
+
+        with self._lock:
+            if ticker in self._checked:
+                return self._checked[ticker]
+        valid = self.api_service.validate_ticker(ticker)
+        with self._lock:
+            self._checked[ticker] = valid
+        return valid
+
+    # Returns the symbol Yahoo Finance prices a ticker under: normalized, with "-" for the class
+    # separator (BRK.B -> BRK-B). Store this form, not the one a file or user typed.
+    @staticmethod
+    def to_yahoo(ticker: str) -> str:
+        return APIService.normalize_ticker(ticker).replace(".", "-")
+
+    # Returns the set of listed symbols, loading or downloading it on first use.
+    def get_symbols(self) -> set[str]:
+        with self._lock:
+            if self._symbols is None:
+                self._symbols = self._load()
+            return self._symbols
+
+    # Downloads the listings again and rewrites the cache file.
+    def refresh(self) -> set[str]:
+        symbols = self._download()
+        with self._lock:
+            self._symbols = symbols
+        return symbols
+
+    # Helper method that reads the cache file, downloading a new one when it is missing or old.
+    def _load(self) -> set[str]:
+        fresh = os.path.exists(self.path) and time.time() - os.path.getmtime(self.path) < self.max_age
+        if not fresh:
+            try:
+                return self._download()
+            except Exception as e:
+                # An old list is better than none; no list means every ticker goes to the API.
+                print("Symbol list download failed:", e)
+
+        if not os.path.exists(self.path):
+            return set()
+        with open(self.path) as f:
+            return {line.strip() for line in f if line.strip()}
+
+    # Helper method that downloads every listing and rewrites the cache file.
+    def _download(self) -> set[str]:
+        symbols = set()
+        for url in self.SOURCES:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                symbols.update(self._parse_listing(response.read().decode("utf-8", "replace")))
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(sorted(symbols)))
+        os.replace(tmp_path, self.path)
+        return symbols
+
+    # Helper method that extracts the symbols from one listing file.
+    @staticmethod
+    def _parse_listing(text: str) -> set[str]:
+        symbols = set()
+        lines = text.splitlines()
+        if not lines:
+            return symbols
+        header = lines[0].split("|")
+        # nasdaqlisted.txt uses "Symbol", otherlisted.txt "ACT Symbol".
+        column = header.index("Symbol") if "Symbol" in header else header.index("ACT Symbol")
+        test_column = header.index("Test Issue") if "Test Issue" in header else None
+        for line in lines[1:]:
+            fields = line.split("|")
+            # The last line is "File Creation Time: ...".
+            if len(fields) <= column or line.startswith("File Creation Time"):
+                continue
+            if test_column is not None and len(fields) > test_column and fields[test_column] == "Y":
+                continue
+            # Yahoo writes class shares with "-" where the listings use "." (BRK.B -> BRK-B).
+            symbols.add(fields[column].strip().upper().replace(".", "-"))
+        return symbols
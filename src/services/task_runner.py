@@ -0,0 +1,224 @@
+#
+# Author: Robert Patel
+# This class runs network and database work on a QThreadPool so that button
+# slots never block the GUI thread. Results are delivered back on the GUI thread.
+#
+
+import itertools
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal, pyqtSlot
+from PyQt6.QtWidgets import QApplication
+
+
+# Handle for a submitted job.
+class Task:
+
+    # Constructs a new task handle.
+    def __init__(self, task_id: int, key: str | None):
+        self.task_id = task_id
+        self.key = key
+        self.cancelled = False
+
+    # Marks the task as cancelled; its result will be discarded.
+    def cancel(self):
+        self.cancelled = True
+
+    # Returns True if the task was cancelled or superseded.
+    def is_cancelled(self) -> bool:
+        return self.cancelled
+
+
+# Signals a worker emits from the pool thread. Receivers live on the GUI thread.
+class _WorkerSignals(QObject):
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, object)
+    item = pyqtSignal(int, object)
+
+
+# Runnable that executes one job on the thread pool.
+class _Worker(QRunnable):
+
+    # Constructs a new worker for fn(*args, **kwargs). Its queries are grouped in a monitor scope.
+    # With streaming, fn returns an iterator whose items are emitted one by one as they are produced.
+    def __init__(self, task: Task, fn, args, kwargs, monitor=None, streaming: bool = False):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.task = task
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.monitor = monitor
+        self.streaming = streaming
+        self.signals = _WorkerSignals()
+
+    # Runs the job and reports the result or the exception.
+    def run(self):
+        if self.task.is_cancelled():
+            self.signals.finished.emit(self.task.task_id, None)
+            return
+        try:
+            if self.monitor is not None:
+                with self.monitor.scope(self.task.key or getattr(self.fn, "__name__", "task")):
+                    result = self._call()
+            else:
+                result = self._call()
+        except Exception as e:
+            self.signals.failed.emit(self.task.task_id, e)
+            return
+        self.signals.finished.emit(self.task.task_id, result)
+
+    # Helper method that calls fn. A streamed iterator is drained here and closed early on cancel.
+    def _call(self):
+        result = self.fn(*self.args, **self.kwargs)
+        if not self.streaming:
+            return result
+        try:
+            for item in result:
+                if self.task.is_cancelled():
+                    break
+                self.signals.item.emit(self.task.task_id, item)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return None
+
+
+# Submits jobs to a thread pool and calls back on the GUI thread.
+class TaskRunner(QObject):
+
+    # Emitted with True when the first foreground job starts and False when the last one ends.
+    busy_changed = pyqtSignal(bool)
+
+    # Constructor used for the TaskRunner class. With a QueryMonitor, the queries of each job
+    # are reported under the job's key.
+    def __init__(self, max_threads: int | None = None, parent: QObject | None = None, monitor=None):
+        super().__init__(parent)
+        self.monitor = monitor
+        self.pool = QThreadPool()
+        if max_threads:
+            self.pool.setMaxThreadCount(max_threads)
+        self._ids = itertools.count(1)
+        # task_id -> (task, worker, on_success, on_error, on_item)
+        self._running = {}
+        # key -> latest task submitted under that key
+        self._latest = {}
+        # ids of the pending tasks that show the wait cursor
+        self._foreground = set()
+
+    # Runs fn(*args, **kwargs) on the pool. A new job with the same key supersedes the previous one.
+    # With on_item, fn must return an iterator; on_item is called with each item as soon as it is
+    # produced and on_success with None once the iterator is exhausted. Background jobs (e.g. timed
+    # refreshes) run without the wait cursor.
+    def submit(self, fn, *args, key: str | None = None, on_success=None, on_error=None, on_item=None,
+               background: bool = False, **kwargs) -> Task:
+        if key is not None and key in self._latest:
+            self.cancel(self._latest[key])
+
+        task = Task(next(self._ids), key)
+        worker = _Worker(task, fn, args, kwargs, self.monitor, streaming=on_item is not None)
+        worker.signals.finished.connect(self._on_finished)
+        worker.signals.failed.connect(self._on_failed)
+        worker.signals.item.connect(self._on_item)
+
+        was_busy = self.is_busy()
+        self._running[task.task_id] = (task, worker, on_success, on_error, on_item)
+        if not background:
+            self._foreground.add(task.task_id)
+        if key is not None:
+            self._latest[key] = task
+        self.pool.start(worker)
+        if not was_busy and self.is_busy():
+            self._set_busy(True)
+        return task
+
+    # Cancels a task. Queued tasks are removed from the pool; running ones have their result dropped.
+    def cancel(self, task: Task):
+        task.cancel()
+        entry = self._running.get(task.task_id)
+        if entry is not None and self.pool.tryTake(entry[1]):
+            self._finish(task.task_id)
+
+    # Cancels every pending task.
+    def cancel_all(self):
+        for task, *_ in list(self._running.values()):
+            self.cancel(task)
+
+    # Returns True while any task that is not a background job is pending.
+    def is_busy(self) -> bool:
+        return bool(self._foreground)
+
+    # Blocks until every running task is done (used on shutdown).
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        return self.pool.waitForDone(msecs)
+
+    # Delivers a result on the GUI thread unless the task was cancelled.
+    @pyqtSlot(int, object)
+    def _on_finished(self, task_id: int, result):
+        entry = self._finish(task_id)
+        if entry is None:
+            return
+        task, _, on_success, on_error, _ = entry
+        if not task.is_cancelled() and on_success is not None:
+            self._call_back(task_id, on_success, result, on_error)
+
+    # Delivers one streamed item on the GUI thread unless the task was cancelled.
+    @pyqtSlot(int, object)
+    def _on_item(self, task_id: int, item):
+        entry = self._running.get(task_id)
+        if entry is None:
+            return
+        task, _, _, on_error, on_item = entry
+        if not task.is_cancelled() and on_item is not None:
+            self._call_back(task_id, on_item, item, on_error)
+
+    # Delivers an exception on the GUI thread unless the task was cancelled.
+    @pyqtSlot(int, object)
+    def _on_failed(self, task_id: int, error):
+        entry = self._finish(task_id)
+        if entry is None:
+            return
+        task, _, _, on_error, _ = entry
+        if task.is_cancelled():
+            return
+        self._report(task_id, error, on_error)
+
+    # Helper method that calls a result callback. Slots must not raise (PyQt aborts the process),
+    # so an exception from the callback is reported like a failed task.
+    def _call_back(self, task_id: int, callback, value, on_error):
+        try:
+            callback(value)
+        except Exception as e:
+            self._report(task_id, e, on_error)
+
+    # Helper method that passes an exception to on_error, or prints it when there is none or it raises too.
+    @staticmethod
+    def _report(task_id: int, error, on_error):
+        if on_error is not None:
+            try:
+                on_error(error)
+                return
+            except Exception as e:
+                print(f"Error handler of background task {task_id} failed:", e)
+        print(f"Background task {task_id} failed:", error)
+
+    # Helper method that forgets a task and clears the busy indicator after the last foreground one.
+    def _finish(self, task_id: int):
+        entry = self._running.pop(task_id, None)
+        if entry is None:
+            return None
+        task = entry[0]
+        if task.key is not None and self._latest.get(task.key) is task:
+            del self._latest[task.key]
+        if task_id in self._foreground:
+            self._foreground.discard(task_id)
+            if not self._foreground:
+                self._set_busy(False)
+        return entry
+
+    # Helper method that shows or clears the wait cursor.
+    def _set_busy(self, busy: bool):
+        if QApplication.instance() is not None:
+            if busy:
+                QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+            else:
+                QApplication.restoreOverrideCursor()
+        self.busy_changed.emit(busy)
@@ -0,0 +1,295 @@
+#
+# Author: Robert Patel
+# This class imports a brokerage trade history into a portfolio.
+# CSV and OFX/QFX files are read as a stream, validated row by row and
+# written with DatabaseService.add_holdings_bulk, so files with tens of
+# thousands of lots never have to fit in memory. Sells are recorded the way
+# DatabaseService.sell_holding records them: a negative lot at average cost.
+#
+
+import csv
+import re
+import time
+from datetime import datetime
+from services.db_service import DatabaseService
+from services.symbol_directory import SymbolDirectory
+
+
+# Counters and errors of one import run.
+class ImportReport:
+
+    # Only the first errors are kept so that a bad file cannot fill memory.
+    MAX_ERRORS = 100
+
+    # Constructs a new, empty report.
+    def __init__(self, path: str):
+        self.path = path
+        self.rows_read = 0
+        self.rows_imported = 0
+        self.rows_skipped = 0
+        # (line or transaction number, reason)
+        self.errors = []
+        self.start = time.perf_counter()
+        self.end = None
+
+    # Records a row that was not imported.
+    def skip(self, line: int, reason: str):
+        self.rows_skipped += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append((line, reason))
+
+    # Marks the import as finished.
+    def finish(self):
+        self.end = time.perf_counter()
+
+    # Gets the seconds the import took (so far).
+    def get_elapsed(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    # Gets the number of rows written per second.
+    def get_rows_per_second(self) -> float:
+        elapsed = self.get_elapsed()
+        return self.rows_imported / elapsed if elapsed > 0 else 0.0
+
+    # Returns the report as one line of text.
+    def summary(self) -> str:
+        return (f"{self.path}: {self.rows_imported} imported, {self.rows_skipped} skipped "
+                f"of {self.rows_read} rows in {self.get_elapsed():.2f}s ({self.get_rows_per_second():,.0f} rows/s)")
+
+
+class TradeImporter:
+
+    # Accepted CSV headers (compared case-insensitively) for each field.
+    COLUMNS = {
+        "ticker": ("ticker", "symbol"),
+        "quantity": ("quantity", "qty", "shares", "units"),
+        "price": ("price", "buy_price", "purchase_price", "unit_price", "cost_per_share"),
+        "date": ("date", "date_added", "trade_date", "datetime", "date_time"),
+        "action": ("action", "side", "type", "transaction_type"),
+    }
+
+    # OFX transaction aggregates that buy or sell a security.
+    OFX_BUYS = ("BUYSTOCK", "BUYMF", "BUYOTHER", "BUYDEBT", "BUYOPT")
+    OFX_SELLS = ("SELLSTOCK", "SELLMF", "SELLOTHER", "SELLDEBT", "SELLOPT")
+
+    DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d", "%m/%d/%Y %H:%M:%S",
+                    "%m/%d/%Y %H:%M", "%m/%d/%Y", "%m/%d/%y", "%Y%m%d%H%M%S", "%Y%m%d")
+
+    # Constructs a new importer. Tickers are checked against symbol_directory.
+    def __init__(self, db_service: DatabaseService, symbol_directory: SymbolDirectory | None = None, batch_size: int = 1000):
+        self.db_service = db_service
+        self.symbol_directory = symbol_directory if symbol_directory is not None else SymbolDirectory(api_service=db_service.api_service)
+        self.batch_size = batch_size
+        # Trade files repeat the same few dates over and over; parsed text -> stored text.
+        self._dates = {}
+        self._date_format = self.DATE_FORMATS[0]
+        self._positions = {}
+
+    # Imports a CSV or OFX/QFX file into a portfolio. progress(report) is called after every batch.
+    # Trades are applied in file order, so a sell must come after the buys it sells.
+    def import_file(self, path: str, portfolio_id: int, progress=None) -> ImportReport:
+        report = ImportReport(path)
+        self._dates.clear()
+        positions = self.db_service.get_positions(portfolio_id)
+        if positions is None:
+            raise RuntimeError(f"Could not read the positions of portfolio {portfolio_id}.")
+        # ticker -> [quantity, cost basis], kept up to date as trades are read.
+        self._positions = {p["ticker"]: [p["quantity"], p["cost_basis"]] for p in positions}
+        records = self.read_ofx(path) if path.lower().endswith((".ofx", ".qfx")) else self.read_csv(path)
+
+        def on_batch(inserted: int, rows_per_second: float):
+            report.rows_imported = inserted
+            if progress is not None:
+                progress(report)
+
+        try:
+            self.db_service.add_holdings_bulk(portfolio_id, self._validate(records, report), self.batch_size, on_batch)
+        finally:
+            report.finish()
+        return report
+
+    # Reads a CSV file one row at a time. Yields (line number, {"ticker", "quantity", "price", "date", "action"}).
+    def read_csv(self, path: str):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            header = [h.strip().lower() for h in next(reader, [])]
+            positions = {}
+            for field, names in self.COLUMNS.items():
+                for name in names:
+                    if name in header:
+                        positions[field] = header.index(name)
+                        break
+            missing = [field for field in ("ticker", "quantity", "price", "date") if field not in positions]
+            if missing:
+                raise ValueError(f"CSV file is missing the column(s): {', '.join(missing)}.")
+
+            for row in reader:
+                if not any(cell.strip() for cell in row):
+                    continue
+                yield reader.line_num, {
+                    field: row[index].strip() if index < len(row) else ""
+                    for field, index in positions.items()
+                }
+
+    # Reads the investment transactions of an OFX/QFX file (SGML or XML) in chunks.
+    # Yields (transaction number, record). Trades that name their security by CUSIP
+    # are resolved through the file's security list, which comes after the trades.
+    def read_ofx(self, path: str, chunk_size: int = 64 * 1024):
+        token = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+        securities = {}
+        # Trades whose ticker is only known once SECLIST has been read.
+        pending = []
+        number = 0
+        trade = None
+        security = None
+        buffer = ""
+
+        with open(path, encoding="utf-8", errors="replace") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                buffer += chunk
+                # Keeps the last, possibly incomplete, tag for the next chunk.
+                cut = buffer.rfind("<") if chunk else len(buffer)
+                text, buffer = buffer[:cut], buffer[cut:]
+
+                for closing, tag, value in token.findall(text):
+                    tag = tag.upper()
+                    value = value.strip()
+                    if not closing and tag in self.OFX_BUYS + self.OFX_SELLS:
+                        trade = {"action": "BUY" if tag in self.OFX_BUYS else "SELL"}
+                    elif closing and tag in self.OFX_BUYS + self.OFX_SELLS and trade is not None:
+                        number += 1
+                        if trade.get("ticker"):
+                            yield number, trade
+                        else:
+                            pending.append((number, trade))
+                        trade = None
+                    elif not closing and tag in ("STOCKINFO", "MFINFO", "OTHERINFO", "DEBTINFO", "OPTINFO"):
+                        security = {}
+                    elif closing and tag in ("STOCKINFO", "MFINFO", "OTHERINFO", "DEBTINFO", "OPTINFO") and security is not None:
+                        if security.get("uniqueid") and security.get("ticker"):
+                            securities[security["uniqueid"]] = security["ticker"]
+                        security = None
+                    elif not closing and value:
+                        target = trade if trade is not None else security
+                        if target is None:
+                            continue
+                        if tag == "UNIQUEID":
+                            target["uniqueid"] = value
+                        elif tag == "UNIQUEIDTYPE" and value.upper() == "TICKER" and trade is not None:
+                            trade["ticker"] = trade.get("uniqueid", "")
+                        elif tag == "TICKER":
+                            target["ticker"] = value
+                        elif tag == "UNITS" and trade is not None:
+                            trade["quantity"] = value
+                        elif tag == "UNITPRICE" and trade is not None:
+                            trade["price"] = value
+                        elif tag == "DTTRADE" and trade is not None:
+                            trade["date"] = value
+
+                if not chunk:
+                    break
+
+        for number, trade in pending:
+            trade["ticker"] = securities.get(trade.get("uniqueid"), "")
+            yield number, trade
+
+    # Helper method that turns records into (ticker, price, quantity, date) rows, skipping invalid ones.
+    # A sell becomes a negative quantity at the position's average cost, like sell_holding.
+    def _validate(self, records, report: ImportReport):
+        for line, record in records:
+            report.rows_read += 1
+            try:
+                action = (record.get("action") or "BUY").upper()
+                selling = action.startswith("SELL") or action == "S"
+
+                ticker = (record.get("ticker") or "").strip().upper()
+                if not ticker or not self.symbol_directory.is_valid(ticker):
+                    report.skip(line, f"unknown ticker '{ticker}'")
+                    continue
+                # Stored the way it was validated, so quotes and bars can be fetched for it.
+                ticker = SymbolDirectory.to_yahoo(ticker)
+
+                # OFX writes sold units as negative numbers, some brokers bought ones as negative cash flow.
+                quantity = abs(self._parse_number(record.get("quantity")))
+                price = self._parse_number(record.get("price"))
+                if quantity <= 0 or price < 0:
+                    report.skip(line, "quantity must be positive and price not negative")
+                    continue
+                date = self._parse_date(record.get("date"))
+
+                position = self._positions.setdefault(ticker, [0.0, 0.0])
+                if selling:
+                    # Same tolerance as the Positions table, which drops positions below 1e-9 shares.
+                    if quantity > position[0] + 1e-9:
+                        report.skip(line, f"sells {quantity:g} {ticker} but only {position[0]:g} are held")
+                        continue
+                    price = position[1] / position[0]
+                    quantity = -quantity
+                position[0] += quantity
+                position[1] += quantity * price
+                yield ticker, price, quantity, date
+            except ValueError as e:
+                report.skip(line, str(e))
+
+    # Helper method that parses "1,234.50", "$12.00" or "(3)" into a float.
+    @staticmethod
+    def _parse_number(text: str | None) -> float:
+        text = (text or "").replace("$", "").replace(",", "").strip()
+        if text.startswith("(") and text.endswith(")"):
+            text = "-" + text[1:-1]
+        try:
+            return float(text)
+        except ValueError:
+            raise ValueError(f"'{text}' is not a number") from None
+
+    # Helper method that parses a trade date into the "YYYY-MM-DD HH:MM:SS" text stored in Holdings.
+    # The format that matched last is tried first, since a file uses one format throughout.
+    def _parse_date(self, text: str | None) -> str:
+        text = (text or "").strip()
+        parsed = self._dates.get(text)
+        if parsed is not None:
+            return parsed
+
+        # OFX dates look like 20240115093000.000[-5:EST]; only the digits matter.
+        digits = re.match(r"^\d{8}(\d{6})?", text)
+        value = digits.group(0) if digits else text
+        for fmt in (self._date_format,) + self.DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt).strftime("%Y-%m-%d %H:%M:%S")
+            except ValueError:
+                continue
+            self._date_format = fmt
+            self._dates[text] = parsed
+            return parsed
+        raise ValueError(f"'{text}' is not a date")
+
+
+# Imports a trade file from the command line:
+#   python -m services.trade_importer trades.csv user@example.com
+if __name__ == "__main__":
+    import os
+    import sys
+    from services.storage_backend import create_backend
+
+    if len(sys.argv) != 3:
+        print("Usage: python -m services.trade_importer <trades.csv|trades.ofx> <email>")
+        sys.exit(2)
+
+    db_service = DatabaseService(backend=create_backend(os.environ.get("BUDDYTRADE_DATABASE")))
+    portfolio_id = db_service.get_portfolio_id(db_service.get_user_id(sys.argv[2]))
+    if portfolio_id is None:
+        print(f"No portfolio found for {sys.argv[2]}.")
+        sys.exit(1)
+
+    importer = TradeImporter(db_service)
+    report = importer.import_file(
+        sys.argv[1], portfolio_id,
+        progress=lambda r: print(f"  {r.rows_imported:>10,} rows  {r.get_rows_per_second():>10,.0f} rows/s", end="\r"),
+    )
+    print()
+    print(report.summary())
+    for line, reason in report.errors:
+        print(f"  line {line}: {reason}")
+    db_service.get_query_monitor().print_report()
+    db_service.close()
@@ -0,0 +1,215 @@
+#
+# Author: Robert Patel
+# Price chart drawn with QPainter: close price with moving-average overlays,
+# a volume pane and an RSI pane. Only the visible bars are drawn, downsampled
+# to the pixel width of the chart each time the view is zoomed (mouse wheel)
+# or panned (drag), so years of bars stay as smooth as a few days.
+# Double-click shows every bar again.
+#
+
+import pandas as pd
+from PyQt6 import QtGui
+from PyQt6.QtCore import QPointF, QLineF, QRectF, Qt
+from PyQt6.QtWidgets import QWidget
+from services.chart_data import ChartData
+
+
+class PriceChart(QWidget):
+
+    # Line colours by name; lines not listed are drawn in grey.
+    COLORS = {"Close": "#000000", "EMA 50": "#1f77b4", "EMA 200": "#d62728", "SMA 50": "#2ca02c",
+              "SMA 200": "#ff7f0e", "RSI": "#7b4fa0"}
+    # Share of the plot height taken by the price, volume and RSI panes.
+    PANES = (0.6, 0.15, 0.25)
+    # Fewest bars a zoom can show.
+    MIN_BARS = 20
+
+    # Constructs a new, empty chart.
+    def __init__(self, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.data = None
+        self.title = ""
+        self._first = 0.0
+        self._last = 0.0
+        self._drag_x = None
+        self._drag_view = None
+        self._cache_key = None
+        self._cache = None
+        self.setMouseTracking(False)
+        self.setMinimumSize(200, 150)
+        self.setToolTip("Scroll to zoom, drag to pan, double-click to show every bar")
+
+    # Shows new data, zoomed out to every bar.
+    def set_data(self, data: ChartData | None, title: str = ""):
+        self.data = data
+        self.title = title
+        self._cache_key = None
+        self.reset_view()
+
+    # Gets the visible bar range as (first, last), last exclusive.
+    def get_view(self) -> tuple[int, int]:
+        return int(self._first), int(round(self._last))
+
+    # Shows the bars first..last (exclusive), clamped to the data.
+    def set_view(self, first: float, last: float):
+        length = self.data.get_length() if self.data is not None else 0
+        span = min(max(last - first, min(self.MIN_BARS, length)), length)
+        first = min(max(first, 0.0), length - span)
+        self._first, self._last = first, first + span
+        self.update()
+
+    # Shows every bar.
+    def reset_view(self):
+        self.set_view(0, self.data.get_length() if self.data is not None else 0)
+
+    # Zooms around the bar under the cursor.
+    def wheelEvent(self, event: QtGui.QWheelEvent):
+        if self.data is None:
+            return
+        factor = 0.8 if event.angleDelta().y() > 0 else 1.25
+        plot = self._plot_rect()
+        share = min(max((event.position().x() - plot.left()) / plot.width(), 0.0), 1.0)
+        anchor = self._first + share * (self._last - self._first)
+        span = (self._last - self._first) * factor
+        self.set_view(anchor - share * span, anchor + (1 - share) * span)
+        event.accept()
+
+    # Starts a pan.
+    def mousePressEvent(self, event: QtGui.QMouseEvent):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._drag_x = event.position().x()
+            self._drag_view = (self._first, self._last)
+
+    # Pans by the dragged distance.
+    def mouseMoveEvent(self, event: QtGui.QMouseEvent):
+        if self._drag_x is None or self.data is None:
+            return
+        first, last = self._drag_view
+        bars = (self._drag_x - event.position().x()) / self._plot_rect().width() * (last - first)
+        self.set_view(first + bars, last + bars)
+
+    # Ends a pan.
+    def mouseReleaseEvent(self, event: QtGui.QMouseEvent):
+        self._drag_x = None
+
+    # Shows every bar again.
+    def mouseDoubleClickEvent(self, event: QtGui.QMouseEvent):
+        self.reset_view()
+
+    # Draws the panes.
+    def paintEvent(self, event: QtGui.QPaintEvent):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtGui.QColor("white"))
+        painter.setPen(QtGui.QColor("black"))
+        plot = self._plot_rect()
+        if self.data is None or self.data.get_length() < 2 or plot.width() < 10:
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "No chart data")
+            return
+
+        first, last = self.get_view()
+        points = self._downsampled(first, last, int(plot.width()))
+        price, volume, rsi = self._pane_rects(plot)
+        names = self.data.get_names()
+        scale = (plot.left(), plot.width(), first, max(last - 1 - first, 1))
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+
+        # Price pane: every line but RSI shares one vertical scale.
+        price_rows = [i for i, name in enumerate(names) if name != "RSI"]
+        valid = points["y"][price_rows][points["valid"][price_rows]]
+        if valid.size == 0:
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "No chart data")
+            return
+        low, high = float(valid.min()), float(valid.max())
+        self._draw_frame(painter, price, low, high, "{:,.2f}".format)
+        for row in price_rows:
+            self._draw_line(painter, price, scale, points, row, low, high, names[row])
+
+        # Volume pane: one bar per pixel at the highest volume it covers.
+        peak = float(points["volume"].max()) or 1.0
+        self._draw_frame(painter, volume, 0.0, peak, self._compact)
+        painter.setPen(QtGui.QPen(QtGui.QColor("#9a9a9a"), 1))
+        xs = self._to_x(points["volume_x"], scale)
+        ys = volume.bottom() - points["volume"] / peak * volume.height()
+        painter.drawLines([QLineF(x, volume.bottom(), x, y) for x, y in zip(xs.tolist(), ys.tolist())])
+
+        # RSI pane with the overbought and oversold levels.
+        self._draw_frame(painter, rsi, 0.0, 100.0, "{:.0f}".format)
+        painter.setPen(QtGui.QPen(QtGui.QColor("#b0b0b0"), 1, Qt.PenStyle.DashLine))
+        for level in (30.0, 70.0):
+            y = rsi.bottom() - level / 100.0 * rsi.height()
+            painter.drawLine(QLineF(rsi.left(), y, rsi.right(), y))
+        if "RSI" in names:
+            self._draw_line(painter, rsi, scale, points, names.index("RSI"), 0.0, 100.0, "RSI")
+
+        self._draw_labels(painter, plot, first, last)
+
+    # Helper method that returns the downsampled view, reusing it until the view or width changes.
+    def _downsampled(self, first: int, last: int, width: int) -> dict:
+        key = (first, last, width)
+        if key != self._cache_key:
+            self._cache = self.data.downsample(first, last, width)
+            self._cache_key = key
+        return self._cache
+
+    # Helper method that returns the area the panes are drawn in (room is left for labels).
+    def _plot_rect(self) -> QRectF:
+        return QRectF(self.rect()).adjusted(6, 22, -62, -18)
+
+    # Helper method that splits the plot area into the price, volume and RSI panes.
+    def _pane_rects(self, plot: QRectF) -> list[QRectF]:
+        gap = 6.0
+        height = plot.height() - gap * (len(self.PANES) - 1)
+        rects, top = [], plot.top()
+        for share in self.PANES:
+            rects.append(QRectF(plot.left(), top, plot.width(), height * share))
+            top += height * share + gap
+        return rects
+
+    # Helper method that converts bar numbers into x coordinates.
+    @staticmethod
+    def _to_x(bars, scale):
+        left, width, first, span = scale
+        return left + (bars - first) / span * width
+
+    # Helper method that draws one downsampled line, skipping bars before it had a value.
+    def _draw_line(self, painter: QtGui.QPainter, rect: QRectF, scale, points: dict, row: int, low: float, high: float, name: str):
+        keep = points["valid"][row]
+        if keep.sum() < 2:
+            return
+        xs = self._to_x(points["x"][row][keep], scale)
+        ys = rect.bottom() - (points["y"][row][keep] - low) / ((high - low) or 1.0) * rect.height()
+        painter.setPen(QtGui.QPen(QtGui.QColor(self.COLORS.get(name, "#808080")), 1.4 if name == "Close" else 1.0))
+        painter.drawPolyline(QtGui.QPolygonF([QPointF(x, y) for x, y in zip(xs.tolist(), ys.tolist())]))
+
+    # Helper method that draws a pane's border and its top and bottom values on the right.
+    @staticmethod
+    def _draw_frame(painter: QtGui.QPainter, rect: QRectF, low: float, high: float, fmt):
+        painter.setPen(QtGui.QPen(QtGui.QColor("#cecece"), 1))
+        painter.drawRect(rect)
+        painter.setPen(QtGui.QColor("black"))
+        painter.drawText(QRectF(rect.right() + 4, rect.top(), 58, 14), Qt.AlignmentFlag.AlignLeft, fmt(high))
+        painter.drawText(QRectF(rect.right() + 4, rect.bottom() - 14, 58, 14), Qt.AlignmentFlag.AlignLeft, fmt(low))
+
+    # Helper method that formats a volume with a K, M or B suffix.
+    @staticmethod
+    def _compact(value: float) -> str:
+        for limit, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+            if value >= limit:
+                return f"{value / limit:.1f}{suffix}"
+        return f"{value:.0f}"
+
+    # Helper method that draws the title, the legend and the dates of the first and last visible bars.
+    def _draw_labels(self, painter: QtGui.QPainter, plot: QRectF, first: int, last: int):
+        index = self.data.get_index()
+        painter.setPen(QtGui.QColor("black"))
+        painter.drawText(QRectF(plot.left(), 2, 120, 16), Qt.AlignmentFlag.AlignLeft, self.title)
+        x = plot.left() + 60
+        for name in self.data.get_names():
+            painter.setPen(QtGui.QColor(self.COLORS.get(name, "#808080")))
+            painter.drawText(QRectF(x, 2, 70, 16), Qt.AlignmentFlag.AlignLeft, name)
+            x += painter.fontMetrics().horizontalAdvance(name) + 10
+        painter.setPen(QtGui.QColor("black"))
+        fmt = "%Y-%m-%d %H:%M" if index[last - 1] - index[first] < pd.Timedelta(days=5) else "%Y-%m-%d"
+        bottom = QRectF(plot.left(), plot.bottom() + 2, plot.width(), 16)
+        painter.drawText(bottom, Qt.AlignmentFlag.AlignLeft, index[first].strftime(fmt))
+        painter.drawText(bottom, Qt.AlignmentFlag.AlignRight, index[last - 1].strftime(fmt))